@@ -1,26 +1,102 @@
 import streamlit as st
 import pandas as pd
-import re
-import io
-import locale
+import os
+import time
+
+from planejador import formatacao, metricas
+from planejador.apresentacao import preparar_exibicao
+from planejador.cambio import carregar_cambio, fator_exibicao, moedas
+from planejador.catalogo import CHAVE_PASSAGEM, montar_catalogo
+from planejador.dados import id_passagem
+from planejador.exportacao import FORMATOS, Exportador, abas_lote, abas_plano, cenarios_sugestoes
+from planejador.cenarios import cenarios_atracoes, cenarios_dias_carro, cenarios_hoteis_voos, cenarios_viajantes
+from planejador.estilos import ESTILOS
+from planejador.historico import ler_agregados
+from planejador.motor import COLUNAS_ORCAMENTO, Selecao, custo_total, preco_carro, preco_hotel, preco_passagem, subtotal_atracao
+from planejador.otimizador import Restricoes, sugerir_viagens
+from planejador.paginacao import Filtro, Ordenacao, filtrar_e_ordenar, limites, opcoes, pagina, total_paginas
+from planejador.planos import ArmazemPlanos, totais_planos
+from planejador.snapshot import ler_problemas, ler_versao
+from planejador.viagens import PLANILHA_PADRAO, RegistroViagens
 
-try:
-    locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'pt_BR')  # Windows fallback
-    except:
-        st.warning("⚠️ Não foi possível definir o locale para pt_BR.")
-
-# Função para formatar moeda em pt_BR
-def formatar_moeda(valor):
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    
 # --- Configurações da Página ---
 st.set_page_config(layout="wide", page_title="Meu Planejador de Viagens Personalizado V20") # Updated version number
 
+# --- Estilos CSS personalizados (minificados uma vez por processo, em planejador/estilos.py) ---
+# Vão logo no início para valerem já na primeira pintura; fragmentos não os reenviam
+st.markdown(ESTILOS, unsafe_allow_html=True)
+
+# --- Instrumentação (opcional): PLANEJADOR_METRICAS=1 no ambiente; com ela, ?debug=1 na URL mostra o painel ---
+# A URL não liga a coleta: ela vale para o processo inteiro, e qualquer visitante poderia deixá-la ligada
+inicio_execucao = time.perf_counter()
+painel_depuracao = metricas.ativo() and st.query_params.get('debug') == '1'
+if 'tempos_execucao' not in st.session_state:
+    st.session_state.tempos_execucao = {} # último tempo (s) de cada intervalo nesta sessão
+    st.session_state.execucoes = 0
+st.session_state.execucoes += 1
+metricas.contar('execucoes')
+
+def tempos_sessao():
+    return st.session_state.tempos_execucao
+
 st.title("✈️ Planejador de Orçamento de Viagem Personalizado")
 
+# --- Viagens: Viagem.xlsx (ou VIAGEM_PLANILHA) mais as planilhas da pasta viagens/, carregadas só quando escolhidas ---
+@st.cache_resource
+def registro_viagens():
+    return RegistroViagens(planilhas=[os.environ.get('VIAGEM_PLANILHA', PLANILHA_PADRAO)])
+
+# Chaves do session_state que pertencem à viagem escolhida (seleções, quantidades, filtros e estado dos dados)
+PREFIXOS_CHAVES_VIAGEM = ('selected_', 'qty_', 'filtro_', 'ordem_', 'tamanho_', 'pagina_', 'sugestao_', 'cenario_')
+# Da exportação, só o arquivo em geração e as escolhas: chaves de botões não podem ser restauradas no session_state
+CHAVES_VIAGEM = ('versao_dados', 'nomes_atracoes', 'subtotais', 'selecoes_removidas', 'exportacao_tarefa', 'exportacao_conteudo', 'exportacao_formato')
+
+def trocar_viagem(id_viagem):
+    # Guarda as seleções da viagem anterior e restaura as da viagem escolhida (ou começa do zero)
+    atual = st.session_state.get('viagem_atual')
+    if atual == id_viagem:
+        return
+    guardadas = st.session_state.setdefault('selecoes_por_viagem', {})
+    if atual is not None:
+        guardadas[atual] = {
+            chave: st.session_state.pop(chave) for chave in list(st.session_state.keys())
+            if chave in CHAVES_VIAGEM or chave.startswith(PREFIXOS_CHAVES_VIAGEM)
+        }
+    for chave, valor in guardadas.pop(id_viagem, {}).items():
+        st.session_state[chave] = valor
+    st.session_state.viagem_atual = id_viagem
+
+registro = registro_viagens()
+viagens = registro.atualizar()
+if not viagens:
+    st.error(f"Nenhuma planilha de viagem encontrada ({PLANILHA_PADRAO} ou a pasta viagens/).")
+    st.stop()
+
+# --- Planos salvos (SQLite, um banco por processo): ?plano=<código> abre um plano com uma leitura pela chave ---
+@st.cache_resource
+def armazem_planos():
+    return ArmazemPlanos()
+
+# O plano do link é lido uma vez por sessão (ou quando o link muda), antes do seletor de viagem:
+# um plano de outra viagem troca a viagem escolhida
+plano_link = None
+codigo_link = st.query_params.get('plano')
+if codigo_link and st.session_state.get('plano_aberto') != codigo_link:
+    st.session_state.plano_aberto = codigo_link
+    plano_link = armazem_planos().carregar(codigo_link)
+    if plano_link is None:
+        st.warning(f"O plano \"{codigo_link}\" do link não foi encontrado.")
+    elif plano_link.viagem not in viagens:
+        st.warning(f"O plano \"{plano_link.nome}\" é da viagem \"{plano_link.viagem}\", que não está disponível.")
+        plano_link = None
+    elif len(viagens) > 1:
+        st.session_state.viagem_selecionada = plano_link.viagem
+if len(viagens) > 1:
+    id_viagem = st.sidebar.selectbox("🧳 Viagem", list(viagens), format_func=lambda id_viagem: viagens[id_viagem].nome, key='viagem_selecionada')
+else:
+    id_viagem = next(iter(viagens))
+trocar_viagem(id_viagem)
+
 # Inicializa variáveis de sessão para evitar erros de acesso e prevenir avisos
 if 'selected_hotel_name' not in st.session_state:
     st.session_state.selected_hotel_name = None
@@ -36,61 +112,148 @@ if 'selected_passagem_volta' not in st.session_state:
 
 st.markdown("Ajuste as opções para ver o custo total da sua viagem!")
 
-# --- Caminho para o arquivo Excel (apenas para referência, pois os dados estão embutidos) ---
-excel_file_path = 'Viagem.xlsx'
+# --- Caminho para o arquivo Excel da viagem escolhida (VIAGEM_PLANILHA permite trocar a planilha principal) ---
+excel_file_path = viagens[id_viagem].caminho
+
+# --- Observador da planilha: um por viagem e por processo, compartilhado por todas as sessões ---
+# Quando o arquivo muda, só as abas alteradas são relidas e a nova versão passa a valer para todos
 
 # --- Função para Carregar os Dados (com cache para performance) ---
-@st.cache_data
-def load_excel_data(file_path):
+# A chave do cache inclui a versão dos dados, então uma planilha alterada nunca serve preços antigos
+# cache_resource: todas as sessões recebem o mesmo catálogo imutável (sem a cópia serializada por chamada do cache_data)
+# Uma versão por viagem carregada, mais uma durante a troca de versão
+# A chave do câmbio (hash do cambio.json) também faz parte da chave; _cambio fica fora do hash do Streamlit
+@st.cache_resource(max_entries=registro.maximo_carregadas + 1)
+def load_excel_data(file_path, versao, chave_cambio, _cambio):
     try:
-        df_hoteis = pd.read_excel(file_path, sheet_name="Hotéis").iloc[:-2]
-        df_aluguel_carro = pd.read_excel(file_path, sheet_name="Aluguel de Carro").iloc[:-2]
-        df_atracoes = pd.read_excel(file_path, sheet_name="Atrações").iloc[:-2]
-        df_passagens = pd.read_excel(file_path, sheet_name="Passagens").iloc[:-5]
-
-        df_hoteis.fillna({
-            'Preço por Período (R$)': 0,
-            'Hóspedes': 1,
-            'Preço por Hóspede (R$)': 0,
-            'Distância do Centro (km)': 0,
-            'Chegada': pd.NaT,
-            'Partida': pd.NaT,
-            'Tipo do Preço': ''
-        }, inplace=True)
-        df_aluguel_carro.fillna({'Preço por Dia (R$)': 0, 'Dias': 1, 'Passageiros': 1, 'Preço por Período (R$)': 0, 'Preço por Passageiro (R$)': 0}, inplace=True)
-        df_atracoes.fillna({'Quantidade': 0, 'Valor (R$)': 0, 'Valor Total (R$)': 0}, inplace=True)
-        df_passagens.fillna({'Preço (R$)': 0, 'Preço da Bagagem (R$)': 0, 'Total (R$)': 0}, inplace=True)
-
-        df_hoteis['Preço por Período (R$)'] = df_hoteis['Preço por Período (R$)'].astype(float)
-        df_hoteis['Hóspedes'] = df_hoteis['Hóspedes'].astype(int)
-        df_hoteis['Preço por Hóspede (R$)'] = df_hoteis['Preço por Hóspede (R$)'].astype(float)
-        df_hoteis['Distância do Centro (km)'] = df_hoteis['Distância do Centro (km)'].astype(float)
-        df_hoteis['Chegada'] = pd.to_datetime(df_hoteis['Chegada'], errors='coerce')
-        df_hoteis['Partida'] = pd.to_datetime(df_hoteis['Partida'], errors='coerce')
-        df_hoteis['Tipo do Preço'] = df_hoteis['Tipo do Preço'].astype(str)
-
-        df_aluguel_carro['Preço por Dia (R$)'] = df_aluguel_carro['Preço por Dia (R$)'].astype(float)
-        df_aluguel_carro['Dias'] = df_aluguel_carro['Dias'].astype(int)
-        df_aluguel_carro['Passageiros'] = df_aluguel_carro['Passageiros'].astype(int)
-        df_aluguel_carro['Preço por Período (R$)'] = df_aluguel_carro['Preço por Período (R$)'].astype(float)
-        df_aluguel_carro['Preço por Passageiro (R$)'] = df_aluguel_carro['Preço por Passageiro (R$)'].astype(float)
-
-        df_atracoes['Quantidade'] = df_atracoes['Quantidade'].astype(int)
-        df_atracoes['Valor (R$)'] = df_atracoes['Valor (R$)'].astype(float)
-        df_atracoes['Valor Total (R$)'] = df_atracoes['Valor Total (R$)'].astype(float)
-
-        df_passagens['Preço (R$)'] = df_passagens['Preço (R$)'].astype(float)
-        df_passagens['Preço da Bagagem (R$)'] = df_passagens['Preço da Bagagem (R$)'].astype(float)
-        df_passagens['Total (R$)'] = df_passagens['Total (R$)'].astype(float)
-
-        return df_hoteis, df_aluguel_carro, df_atracoes, df_passagens
+        # O parse do XLSX só acontece quando o conteúdo da planilha muda; nos demais casos o snapshot é mapeado em memória
+        # Os índices de busca das seleções são montados aqui, uma vez por versão dos dados
+        metricas.contar('cache_misses', funcao='load_excel_data')
+        # Células inválidas não interrompem a carga: vêm no catálogo e são listadas em um aviso.
+        # Preços em outras moedas são convertidos para reais aqui, uma coluna inteira por vez
+        return montar_catalogo(*ler_versao(file_path, versao), problemas=ler_problemas(file_path, versao), cambio=_cambio)
 
     except Exception as e:
         st.error(f"Erro ao carregar os dados do Excel: {e}")
         st.stop()
 
+# --- Cartões prontos para exibição (preços formatados, datas por extenso, companhia/rota), uma vez por versão dos dados ---
+# Trocar a moeda de exibição só refaz os textos dos preços (uma multiplicação por coluna); o catálogo é o mesmo.
+# Cabem os reais e mais uma moeda por viagem carregada
+@st.cache_resource(max_entries=2 * (registro.maximo_carregadas + 1))
+def load_display_data(file_path, versao, chave_cambio, _cambio, moeda):
+    metricas.contar('cache_misses', funcao='load_display_data')
+    # Os agregados do histórico de preços são atualizados junto com o snapshot: uma leitura por versão
+    catalogo = load_excel_data(file_path, versao, chave_cambio, _cambio)
+    return preparar_exibicao(catalogo, ler_agregados(file_path), moeda, fator_exibicao(_cambio, moeda))
+
+try:
+    observador = registro.observador(id_viagem)
+except Exception as e:
+    st.error(f"Erro ao carregar os dados do Excel: {e}")
+    st.stop()
+
+# Versão dos dados usada em toda esta execução do script
+versao_dados = observador.versao
+
+# --- Câmbio (cambio.json ou VIAGEM_CAMBIO): relido só quando o arquivo muda ---
+try:
+    cambio = carregar_cambio()
+except (OSError, ValueError, TypeError) as e:
+    st.error(f"Erro ao carregar o arquivo de câmbio: {e}")
+    st.stop()
+
+# Moeda de exibição: os valores continuam em reais; só os textos são convertidos
+moedas_disponiveis = moedas(cambio)
+if st.session_state.get('moeda_exibicao') not in moedas_disponiveis:
+    st.session_state.moeda_exibicao = moedas_disponiveis[0]
+if len(moedas_disponiveis) > 1:
+    st.sidebar.selectbox("💱 Moeda de exibição", moedas_disponiveis, key='moeda_exibicao', help=f"Cotações do câmbio versão {cambio.versao or '—'}")
+moeda_exibicao = st.session_state.moeda_exibicao
+fator_moeda = fator_exibicao(cambio, moeda_exibicao)
+
+def formatar_moeda(valor):
+    # Valores do planejador (em reais) como texto na moeda de exibição
+    return formatacao.formatar_moeda(valor * fator_moeda, moeda_exibicao)
+
 # Carregar os DataFrames
-df_hoteis_original, df_aluguel_carro_original, df_atracoes_original, df_passagens_original = load_excel_data(excel_file_path)
+# (os contadores de chamadas e de misses dão a taxa de acerto dos caches)
+with metricas.medir('load_excel_data', st.session_state.tempos_execucao):
+    metricas.contar('cache_chamadas', funcao='load_excel_data')
+    catalogo = load_excel_data(excel_file_path, versao_dados, cambio.chave, cambio)
+with metricas.medir('load_display_data', st.session_state.tempos_execucao):
+    metricas.contar('cache_chamadas', funcao='load_display_data')
+    exibicao = load_display_data(excel_file_path, versao_dados, cambio.chave, cambio, moeda_exibicao)
+
+# --- Reconciliação das seleções quando a planilha é atualizada ---
+def reconciliar_selecoes(catalogo):
+    # Confere as seleções da sessão contra a nova versão dos dados; as que sumiram são sinalizadas e limpas
+    removidas = []
+    if st.session_state.selected_hotel_name and catalogo.posicao_hotel(st.session_state.selected_hotel_name) is None:
+        removidas.append(f"Hotel: {st.session_state.selected_hotel_name}")
+        st.session_state.selected_hotel_name = None
+    for sentido in ('ida', 'volta'):
+        chave = f"selected_passagem_{sentido}"
+        if st.session_state[chave] and catalogo.posicao_passagem(st.session_state[chave]) is None:
+            # A sessão guarda só o id compacto da passagem: a chave antiga não está mais no catálogo
+            removidas.append(f"Passagem de {sentido.upper()} selecionada anteriormente")
+            st.session_state[chave] = None
+    if st.session_state.selected_carro_type_locadora and catalogo.posicao_carro(st.session_state.selected_carro_type_locadora) is None:
+        removidas.append("Aluguel de Carro: {} ({})".format(*st.session_state.selected_carro_type_locadora))
+        st.session_state.selected_carro_type_locadora = None
+
+    # As quantidades das atrações são guardadas por posição (qty_{index}): remapeia pelo nome da atração
+    quantidades = {
+        nome: st.session_state.pop(f"qty_{index}")
+        for index, nome in enumerate(st.session_state.get('nomes_atracoes', []))
+        if f"qty_{index}" in st.session_state
+    }
+    novos_nomes = catalogo.atracoes['Atrações'].tolist()
+    for index, nome in enumerate(novos_nomes):
+        if nome in quantidades:
+            st.session_state[f"qty_{index}"] = quantidades.pop(nome)
+    removidas.extend(f"Atração: {nome}" for nome, quantidade in quantidades.items() if quantidade)
+
+    st.session_state.selecoes_removidas = removidas
+
+if 'versao_dados' not in st.session_state:
+    st.session_state.versao_dados = versao_dados
+    st.session_state.nomes_atracoes = catalogo.atracoes['Atrações'].tolist()
+elif st.session_state.versao_dados != versao_dados:
+    reconciliar_selecoes(catalogo)
+    st.session_state.versao_dados = versao_dados
+    st.session_state.nomes_atracoes = catalogo.atracoes['Atrações'].tolist()
+    st.toast("🔄 A planilha foi atualizada e os preços foram recarregados.")
+
+if st.session_state.get('selecoes_removidas'):
+    st.warning(
+        "Os dados da planilha foram atualizados e estas seleções não existem mais. Por favor, faça uma nova seleção:\n"
+        + "\n".join(f"- {item}" for item in st.session_state.selecoes_removidas)
+    )
+    st.session_state.selecoes_removidas = []
+
+def aplicar_plano(plano):
+    # Seleções e quantidades do plano na sessão (as passagens pelo id compacto, calculado da chave guardada)
+    selecao = plano.selecao
+    st.session_state.selected_hotel_name = selecao.hotel
+    st.session_state.selected_passagem_ida = id_passagem(selecao.passagem_ida) if selecao.passagem_ida else None
+    st.session_state.selected_passagem_volta = id_passagem(selecao.passagem_volta) if selecao.passagem_volta else None
+    st.session_state.selected_carro_type_locadora = tuple(selecao.carro) if selecao.carro else None
+    quantidades = selecao.quantidades or {}
+    for index, nome in enumerate(st.session_state.nomes_atracoes):
+        if nome in quantidades:
+            st.session_state[f"qty_{index}"] = int(quantidades[nome])
+
+if plano_link is not None:
+    aplicar_plano(plano_link)
+    st.toast(f"📂 Plano \"{plano_link.nome}\" aberto.")
+
+if catalogo.problemas:
+    with st.expander(f"⚠️ {len(catalogo.problemas)} problema(s) na leitura da planilha: veja na coluna Problema o que foi feito com cada um"):
+        st.dataframe(
+            [{'Aba': p.aba, 'Linha': p.linha, 'Coluna': p.coluna, 'Valor': p.valor, 'Problema': p.motivo} for p in catalogo.problemas],
+            hide_index=True,
+        )
 
 # --- Funções para lidar com a seleção e forçar rerun ---
 def select_hotel(hotel_name):
@@ -99,24 +262,105 @@ def select_hotel(hotel_name):
 def select_carro(carro_type, locadora):
     st.session_state.selected_carro_type_locadora = (carro_type, locadora)
 
-def select_passagem_ida(passagem_info):
-    st.session_state.selected_passagem_ida = passagem_info
+def select_passagem_ida(id_passagem):
+    st.session_state.selected_passagem_ida = id_passagem
+
+def select_passagem_volta(id_passagem):
+    st.session_state.selected_passagem_volta = id_passagem
+
+def companhia_passagem(id_passagem):
+    # Companhia da passagem selecionada (separada da chave na leitura); a chave inteira se não houver
+    posicao = catalogo.posicao_passagem(id_passagem)
+    companhia = catalogo.passagens['companhia'].iat[posicao]
+    return catalogo.passagens[CHAVE_PASSAGEM].iat[posicao] if pd.isna(companhia) else companhia
+
+# --- Catálogos paginados: filtros, ordenação e só os cartões da página visível ---
+TAMANHOS_PAGINA = [6, 9, 12, 24, 48]
+
+FILTROS_HOTEIS = [
+    Filtro('Preço por Período (R$)', 'faixa', "Preço p/ Período (R$)"),
+    Filtro('Distância do Centro (km)', 'maximo', "Distância máxima do centro (km)"),
+    Filtro('Hóspedes', 'minimo', "Hóspedes (mínimo)"),
+]
+ORDENACOES_HOTEIS = [
+    Ordenacao("Ordem da planilha", None),
+    Ordenacao("Menor preço", 'Preço por Período (R$)'),
+    Ordenacao("Maior preço", 'Preço por Período (R$)', crescente=False),
+    Ordenacao("Mais perto do centro", 'Distância do Centro (km)'),
+    Ordenacao("Nome", 'Nome do Hotel'),
+]
+FILTROS_PASSAGENS = [
+    Filtro('Total (R$)', 'faixa', "Total (R$)"),
+    Filtro('Companhia', 'opcoes', "Companhia"),
+]
+ORDENACOES_PASSAGENS = [
+    Ordenacao("Ordem da planilha", None),
+    Ordenacao("Menor preço", 'Total (R$)'),
+    Ordenacao("Maior preço", 'Total (R$)', crescente=False),
+    Ordenacao("Companhia", 'Companhia'),
+]
+FILTROS_CARROS = [
+    Filtro('Preço por Período (R$)', 'faixa', "Preço p/ Período (R$)"),
+    Filtro('Locadora', 'opcoes', "Locadora"),
+    Filtro('Passageiros', 'minimo', "Passageiros (mínimo)"),
+]
+ORDENACOES_CARROS = [
+    Ordenacao("Ordem da planilha", None),
+    Ordenacao("Menor preço", 'Preço por Período (R$)'),
+    Ordenacao("Maior preço", 'Preço por Período (R$)', crescente=False),
+    Ordenacao("Menor preço p/ dia", 'Preço por Dia (R$)'),
+]
+
+def catalogo_paginado(secao, secao_catalogo, filtros, ordenacoes, tamanho_padrao):
+    # Desenha os filtros e a paginação de uma seção e devolve apenas os cartões da página atual
+    df = secao_catalogo.df
+    chave_pagina = f"pagina_{secao}"
+
+    def voltar_primeira_pagina():
+        st.session_state[chave_pagina] = 1
+
+    valores = {}
+    with st.expander("🔎 Filtros e ordenação"):
+        for filtro in filtros:
+            chave = f"filtro_{secao}_{filtro.coluna}"
+            if filtro.tipo == 'opcoes':
+                valores[filtro.coluna] = st.multiselect(filtro.rotulo, opcoes(df, filtro.coluna), key=chave, on_change=voltar_primeira_pagina)
+                continue
+            minimo, maximo = limites(df, filtro.coluna)
+            if minimo == maximo:
+                continue # Nada a filtrar quando todos os itens têm o mesmo valor
+            if df[filtro.coluna].dtype.kind in 'iu':
+                minimo, maximo = int(minimo), int(maximo)
+            padrao = {'faixa': (minimo, maximo), 'maximo': maximo, 'minimo': minimo}[filtro.tipo]
+            valor = st.slider(filtro.rotulo, minimo, maximo, padrao, key=chave, on_change=voltar_primeira_pagina)
+            # No intervalo inteiro o slider não filtra nada, e os itens sem cotação continuam na lista
+            if valor != padrao:
+                valores[filtro.coluna] = valor
+
+        rotulo_ordem = st.selectbox("Ordenar por", [o.rotulo for o in ordenacoes], key=f"ordem_{secao}", on_change=voltar_primeira_pagina)
+        tamanho_pagina = st.selectbox(
+            "Itens por página",
+            TAMANHOS_PAGINA,
+            index=TAMANHOS_PAGINA.index(tamanho_padrao),
+            key=f"tamanho_{secao}",
+            on_change=voltar_primeira_pagina
+        )
 
-def select_passagem_volta(passagem_info):
-    st.session_state.selected_passagem_volta = passagem_info
+    ordenacao = next(o for o in ordenacoes if o.rotulo == rotulo_ordem)
+    posicoes = filtrar_e_ordenar(df, filtros, valores, ordenacao if ordenacao.coluna else None)
+    quantidade_paginas = total_paginas(len(posicoes), tamanho_pagina)
 
-# Dicionário para traduzir dias da semana
-weekday_ptbr = {
-    'Monday': 'segunda-feira',
-    'Tuesday': 'terça-feira',
-    'Wednesday': 'quarta-feira',
-    'Thursday': 'quinta-feira',
-    'Friday': 'sexta-feira',
-    'Saturday': 'sábado',
-    'Sunday': 'domingo'
-}
+    numero_pagina = 1
+    if quantidade_paginas > 1:
+        # Se os dados ou filtros reduziram o número de páginas, volta para a última página válida
+        if st.session_state.get(chave_pagina, 1) > quantidade_paginas:
+            st.session_state[chave_pagina] = quantidade_paginas
+        numero_pagina = st.number_input(f"Página (de {quantidade_paginas})", min_value=1, max_value=quantidade_paginas, step=1, key=chave_pagina)
+    posicoes_pagina = pagina(posicoes, numero_pagina, tamanho_pagina)
+    st.caption(f"Mostrando {len(posicoes_pagina)} de {len(posicoes)} itens filtrados ({len(df)} no total)")
+
+    return [secao_catalogo.cartoes[i] for i in posicoes_pagina]
 
-# --- O restante do script permanece exatamente o mesmo ---
 
 # --- Inicialização do Session State para seleções ---
 # st.session_state é usado para persistir dados através das reruns do Streamlit
@@ -127,17 +371,31 @@ if 'selected_carro_type_locadora' not in st.session_state:
     st.session_state.selected_carro_type_locadora = None # Armazenará (Tipo, Locadora)
 
 if 'selected_passagem_ida' not in st.session_state:
-    st.session_state.selected_passagem_ida = None # Armazenará o sentido + companhia + origem + destino da ida
+    st.session_state.selected_passagem_ida = None # Armazenará o id compacto (inteiro) da passagem de ida
 
 if 'selected_passagem_volta' not in st.session_state:
-    st.session_state.selected_passagem_volta = None # Armazenará o sentido + companhia + origem + destino da volta
+    st.session_state.selected_passagem_volta = None # Armazenará o id compacto (inteiro) da passagem de volta
+
+# Colunas por linha nos blocos de hotéis e carros
+cols_per_row = 3
+
+# Subtotais de cada seção, compartilhados entre os fragmentos: cada seção só regrava o seu
+if 'subtotais' not in st.session_state:
+    st.session_state.subtotais = {'hotel': 0.0, 'passagens': 0.0, 'atracoes': 0.0, 'carro': 0.0}
+
+# Total desenhado pela última execução completa; None enquanto ela não chega aos totais (no fim do script)
+st.session_state.total_exibido = None
+
+def calcular_custo_total():
+    return custo_total(**st.session_state.subtotais)
 
-# Variáveis para armazenar os preços atuais
-current_hotel_price = 0.0
-current_carro_price = 0.0
-total_atracoes_calculado = 0.0
-current_passagem_ida_price = 0.0
-current_passagem_volta_price = 0.0
+def atualizar_subtotal(secao, valor):
+    # Os totais ficam fora das seções: quando uma reexecução só desta seção muda o custo total, uma execução
+    # completa os redesenha. Ela também traz uma nova versão da planilha para esta sessão.
+    st.session_state.subtotais[secao] = float(valor)
+    total_exibido = st.session_state.total_exibido
+    if total_exibido is not None and (calcular_custo_total() != total_exibido or observador.versao != st.session_state.versao_dados):
+        st.rerun(scope="app")
 
 # --- Layout da Interface Streamlit ---
 
@@ -148,363 +406,642 @@ st.sidebar.markdown("- [Escolha o Hotel](#1-escolha-o-hotel)")
 st.sidebar.markdown("- [Escolha as Passagens Aéreas](#2-escolha-as-passagens-aéreas)") # New section in sidebar
 st.sidebar.markdown("- [Ajuste as Quantidades das Atrações](#3-ajuste-as-quantidades-das-atrações)")
 st.sidebar.markdown("- [Escolha o Aluguel de Carro](#4-escolha-o-aluguel-de-carro)")
+st.sidebar.markdown("- [Sugestão da Melhor Viagem](#5-sugestão-da-melhor-viagem)")
+st.sidebar.markdown("- [Cenários: e se...?](#6-cenários-e-se)")
+st.sidebar.markdown("- [Planos Salvos](#7-planos-salvos)")
+st.sidebar.markdown("- [Exportar Orçamento](#8-exportar-orçamento)")
 
 # --- 1. Seleção de Hotel (em blocos com botão de seleção) ---
-st.subheader("🏨 1. Escolha o Hotel")
-st.write("Selecione um hotel da lista abaixo:")
-
-# Criar colunas para os blocos de hotel
-cols_per_row = 3
-# Para garantir que as colunas sejam criadas corretamente, especialmente se o número de itens não for múltiplo de cols_per_row
-# podemos criar todas as colunas de uma vez e depois preenchê-las
-hotel_blocks_container = st.container() # Cria um container para as colunas de hotéis
-with hotel_blocks_container:
-    hotel_cols = st.columns(cols_per_row) # Cria uma lista de objetos de coluna
-
-# Itera sobre cada hotel para criar um bloco de seleção dentro de uma coluna
-for index, row in df_hoteis_original.iterrows():
-    hotel_name = row['Nome do Hotel']
-    is_selected = (st.session_state.selected_hotel_name == hotel_name)
-
-    # Usa o índice para determinar em qual coluna o bloco será colocado
-    with hotel_cols[index % cols_per_row]:
-        # st.container cria um bloco visualmente separado
-        with st.container(border=True):
-            # Título do hotel no bloco
-            st.markdown(f"**{row['Nome do Hotel']}**") # Título maior para o nome do hotel
-            st.write(f"- **Preço p/ Período:** {formatar_moeda(row['Preço por Período (R$)'])}")
-            st.write(f"- **Hóspedes:** {row['Hóspedes']}")
-            st.write(f"- **Preço p/ Hóspede:** {formatar_moeda(row['Preço por Hóspede (R$)'])}")
-            st.write(f"- **Distância Centro:** {row['Distância do Centro (km)']:.1f} km")
+# Cada seção é um fragmento: cliques e entradas dentro dela reexecutam só esta função
+@st.fragment
+@metricas.cronometrado('secao_hotel', tempos_sessao)
+def secao_hotel():
+    current_hotel_price = 0.0
+    st.subheader("🏨 1. Escolha o Hotel")
+    st.write("Selecione um hotel da lista abaixo:")
+
+    cartoes_hoteis = catalogo_paginado("hoteis", exibicao.hoteis, FILTROS_HOTEIS, ORDENACOES_HOTEIS, 9)
+
+    # Criar colunas para os blocos de hotel
+    # Para garantir que as colunas sejam criadas corretamente, especialmente se o número de itens não for múltiplo de cols_per_row
+    # podemos criar todas as colunas de uma vez e depois preenchê-las
+    hotel_blocks_container = st.container() # Cria um container para as colunas de hotéis
+    with hotel_blocks_container:
+        hotel_cols = st.columns(cols_per_row) # Cria uma lista de objetos de coluna
+
+    # Itera sobre cada hotel da página para criar um bloco de seleção dentro de uma coluna
+    for posicao_na_pagina, cartao in enumerate(cartoes_hoteis):
+        index = cartao.posicao
+        hotel_name = cartao.nome
+        is_selected = (st.session_state.selected_hotel_name == hotel_name)
+
+        # Usa a posição na página para determinar em qual coluna o bloco será colocado
+        with hotel_cols[posicao_na_pagina % cols_per_row]:
+            # st.container cria um bloco visualmente separado
+            with st.container(border=True):
+                # Título do hotel no bloco
+                st.markdown(f"**{cartao.nome}**") # Título maior para o nome do hotel
+                if cartao.selos:
+                    st.markdown(cartao.selos) # Variação na semana e menor preço já visto (histórico de preços)
+                st.write(f"- **Preço p/ Período:** {cartao.preco_periodo}")
+                st.write(f"- **Hóspedes:** {cartao.hospedes}")
+                st.write(f"- **Preço p/ Hóspede:** {cartao.preco_hospede}")
+                st.write(f"- **Distância Centro:** {cartao.distancia}")
             
-            if pd.notnull(row['Chegada']):
-                dia_semana = row['Chegada'].day_name()
-                dia_semana_pt = weekday_ptbr.get(dia_semana, '')
-                st.write(f"- **Chegada:** {dia_semana_pt}, {row['Chegada'].strftime('%d/%m/%Y')}")
-            else:
-                st.write("Chegada: -")
+                if cartao.chegada:
+                    st.write(f"- **Chegada:** {cartao.chegada}")
+                else:
+                    st.write("Chegada: -")
                 
-            if pd.notnull(row['Partida']):
-                dia_semana_partida = row['Partida'].day_name()
-                dia_partida_pt = weekday_ptbr.get(dia_semana_partida, '')
-                st.write(f"- **Partida:** {dia_partida_pt}, {row['Partida'].strftime('%d/%m/%Y')}")
-            else:
-                st.write("Partida: -")
+                if cartao.partida:
+                    st.write(f"- **Partida:** {cartao.partida}")
+                else:
+                    st.write("Partida: -")
                 
-            st.write(f"- **Tipo do Preço:** {row['Tipo do Preço']}")
-            st.markdown(f"- **Link:** [Booking]({row['Link do Booking']})")
-
-            # Botão de seleção: desabilitado se já selecionado
-            st.button(
-                f"Selecionar este Hotel",
-                key=f"select_hotel_btn_{hotel_name}_{index}", # Chave única para cada botão
-                on_click=select_hotel, # Chama a função ao clicar
-                args=(hotel_name,), # Argumento para a função
-                disabled=is_selected # Desabilita se for o selecionado
-            )
-
-# Garante que o preço do hotel selecionado seja usado no cálculo final
-if st.session_state.selected_hotel_name:
-    selected_hotel_data = df_hoteis_original[df_hoteis_original['Nome do Hotel'] == st.session_state.selected_hotel_name]
-    if not selected_hotel_data.empty:
-        current_hotel_price = selected_hotel_data['Preço por Período (R$)'].iloc[0]
-        st.success(f"✔️ **Hotel Selecionado:** {st.session_state.selected_hotel_name} ({formatar_moeda(current_hotel_price)})")
-    else:
-        # Caso o hotel selecionado não seja mais encontrado (e.g., dados mudaram)
-        current_hotel_price = 0.0
-        st.warning("Hotel selecionado anteriormente não encontrado nos dados atuais. Por favor, faça uma nova seleção.")
-        st.session_state.selected_hotel_name = None # Resetar seleção
+                st.write(f"- **Tipo do Preço:** {cartao.tipo_preco}")
+                st.markdown(f"- **Link:** [Booking]({cartao.link})")
+
+                # Botão de seleção: desabilitado se já selecionado
+                st.button(
+                    f"Selecionar este Hotel",
+                    key=f"select_hotel_btn_{hotel_name}_{index}", # Chave única para cada botão
+                    on_click=select_hotel, # Chama a função ao clicar
+                    args=(hotel_name,), # Argumento para a função
+                    disabled=is_selected or cartao.preco_periodo == formatacao.SEM_COTACAO # Desabilita se for o selecionado ou estiver sem preço
+                )
+
+    # Garante que o preço do hotel selecionado seja usado no cálculo final
+    if st.session_state.selected_hotel_name:
+        current_hotel_price = preco_hotel(catalogo, st.session_state.selected_hotel_name)
+        if current_hotel_price is not None:
+            st.success(f"✔️ **Hotel Selecionado:** {st.session_state.selected_hotel_name} ({formatar_moeda(current_hotel_price)})")
+        else:
+            # Caso o hotel selecionado não seja mais encontrado (e.g., dados mudaram)
+            current_hotel_price = 0.0
+            st.warning("Hotel selecionado anteriormente não encontrado nos dados atuais. Por favor, faça uma nova seleção.")
+            st.session_state.selected_hotel_name = None # Resetar seleção
+
+    atualizar_subtotal('hotel', current_hotel_price)
+
+secao_hotel()
 
 st.markdown("---")
 
 # --- 2. Seleção de Passagens Aéreas ---
-st.subheader("✈️ 2. Escolha as Passagens Aéreas")
+@st.fragment
+@metricas.cronometrado('secao_passagens', tempos_sessao)
+def secao_passagens():
+    current_passagem_ida_price = 0.0
+    current_passagem_volta_price = 0.0
+    st.subheader("✈️ 2. Escolha as Passagens Aéreas")
 
-st.write("Selecione uma passagem de **IDA** e uma de **VOLTA**:")
+    st.write("Selecione uma passagem de **IDA** e uma de **VOLTA**:")
 
-col_ida, col_volta = st.columns(2)
+    col_ida, col_volta = st.columns(2)
 
-# Passagens de IDA
-with col_ida:
-    st.markdown("#### Passagens de IDA")
-    passagens_ida = df_passagens_original[df_passagens_original['Sentido + Companhia + Origem + Destino'].str.contains('Ida')]
+    # Passagens de IDA
+    with col_ida:
+        st.markdown("#### Passagens de IDA")
     
-    for index, row in passagens_ida.iterrows():
-        passagem_info = row['Sentido + Companhia + Origem + Destino']
-        is_selected = (st.session_state.selected_passagem_ida == passagem_info)
+        cartoes_ida = catalogo_paginado("ida", exibicao.passagens_ida, FILTROS_PASSAGENS, ORDENACOES_PASSAGENS, 6)
+
+        for cartao in cartoes_ida:
+            is_selected = (st.session_state.selected_passagem_ida == cartao.id)
         
-        with st.container(border=True):
-            # Extrai Companhia e Rota para exibição mais limpa
-            match_info = re.match(r'Ida \| (.*?) \| (.*)', passagem_info)
-            if match_info:
-                companhia = match_info.group(1).strip()
-                rota = match_info.group(2).strip()
-                st.markdown(f"**{companhia}**")
-                st.write(f"- Rota: {rota}")
-            else:
-                st.markdown(f"**{passagem_info}**") # Fallback se o regex falhar
+            with st.container(border=True):
+                # Companhia e Rota já vêm extraídas da chave (pré-processamento por versão dos dados)
+                if cartao.companhia is not None:
+                    st.markdown(f"**{cartao.companhia}**")
+                    st.write(f"- Rota: {cartao.rota}")
+                else:
+                    st.markdown(f"**{cartao.chave}**") # Fallback se a chave não seguir o padrão
             
-            st.write(f"- Preço Voo: {formatar_moeda(row['Preço (R$)'])}")
-            st.write(f"- Preço Bagagem: {formatar_moeda(row['Preço da Bagagem (R$)'])}")
-            st.write(f"- **Total:** {formatar_moeda(row['Total (R$)'])}")
+                st.write(f"- Preço Voo: {cartao.preco}")
+                st.write(f"- Preço Bagagem: {cartao.preco_bagagem}")
+                st.write(f"- **Total:** {cartao.total}")
+                if cartao.selos:
+                    st.markdown(cartao.selos)
             
-            st.button(
-                f"Selecionar Ida",
-                key=f"select_ida_btn_{passagem_info}",
-                on_click=select_passagem_ida,
-                args=(passagem_info,),
-                disabled=is_selected
-            )
-
-# Passagens de VOLTA
-with col_volta:
-    st.markdown("#### Passagens de VOLTA")
-    passagens_volta = df_passagens_original[df_passagens_original['Sentido + Companhia + Origem + Destino'].str.contains('Volta')]
+                st.button(
+                    f"Selecionar Ida",
+                    key=f"select_ida_btn_{cartao.id}",
+                    on_click=select_passagem_ida,
+                    args=(cartao.id,),
+                    disabled=is_selected or cartao.total == formatacao.SEM_COTACAO
+                )
+
+    # Passagens de VOLTA
+    with col_volta:
+        st.markdown("#### Passagens de VOLTA")
     
-    for index, row in passagens_volta.iterrows():
-        passagem_info = row['Sentido + Companhia + Origem + Destino']
-        is_selected = (st.session_state.selected_passagem_volta == passagem_info)
+        cartoes_volta = catalogo_paginado("volta", exibicao.passagens_volta, FILTROS_PASSAGENS, ORDENACOES_PASSAGENS, 6)
+
+        for cartao in cartoes_volta:
+            is_selected = (st.session_state.selected_passagem_volta == cartao.id)
         
-        with st.container(border=True):
-            # Extrai Companhia e Rota para exibição mais limpa
-            match_info = re.match(r'Volta \| (.*?) \| (.*)', passagem_info)
-            if match_info:
-                companhia = match_info.group(1).strip()
-                rota = match_info.group(2).strip()
-                st.markdown(f"**{companhia}**")
-                st.write(f"- Rota: {rota}")
-            else:
-                st.markdown(f"**{passagem_info}**") # Fallback se o regex falhar
+            with st.container(border=True):
+                # Companhia e Rota já vêm extraídas da chave (pré-processamento por versão dos dados)
+                if cartao.companhia is not None:
+                    st.markdown(f"**{cartao.companhia}**")
+                    st.write(f"- Rota: {cartao.rota}")
+                else:
+                    st.markdown(f"**{cartao.chave}**") # Fallback se a chave não seguir o padrão
             
-            st.write(f"- Preço Voo: {formatar_moeda(row['Preço (R$)'])}")
-            st.write(f"- Preço Bagagem: {formatar_moeda(row['Preço da Bagagem (R$)'])}")
-            st.write(f"- **Total:** {formatar_moeda(row['Total (R$)'])}")
+                st.write(f"- Preço Voo: {cartao.preco}")
+                st.write(f"- Preço Bagagem: {cartao.preco_bagagem}")
+                st.write(f"- **Total:** {cartao.total}")
+                if cartao.selos:
+                    st.markdown(cartao.selos)
             
-            st.button(
-                f"Selecionar Volta",
-                key=f"select_volta_btn_{passagem_info}",
-                on_click=select_passagem_volta,
-                args=(passagem_info,),
-                disabled=is_selected
-            )
-
-# Calculate selected flight prices
-if st.session_state.selected_passagem_ida:
-    selected_ida_data = df_passagens_original[
-        df_passagens_original['Sentido + Companhia + Origem + Destino'] == st.session_state.selected_passagem_ida
-    ]
-    if not selected_ida_data.empty:
-        current_passagem_ida_price = selected_ida_data['Total (R$)'].iloc[0]
-        st.success(f"✔️ **Passagem de IDA Selecionada:** {st.session_state.selected_passagem_ida.split('|')[1].strip()} ({formatar_moeda(current_passagem_ida_price)})")
+                st.button(
+                    f"Selecionar Volta",
+                    key=f"select_volta_btn_{cartao.id}",
+                    on_click=select_passagem_volta,
+                    args=(cartao.id,),
+                    disabled=is_selected or cartao.total == formatacao.SEM_COTACAO
+                )
+
+    # Calculate selected flight prices
+    if st.session_state.selected_passagem_ida:
+        current_passagem_ida_price = preco_passagem(catalogo, st.session_state.selected_passagem_ida)
+        if current_passagem_ida_price is not None:
+            st.success(f"✔️ **Passagem de IDA Selecionada:** {companhia_passagem(st.session_state.selected_passagem_ida)} ({formatar_moeda(current_passagem_ida_price)})")
+        else:
+            current_passagem_ida_price = 0.0
+            st.warning("Passagem de IDA selecionada anteriormente não encontrada. Por favor, faça uma nova seleção.")
+            st.session_state.selected_passagem_ida = None
+
+    if st.session_state.selected_passagem_volta:
+        current_passagem_volta_price = preco_passagem(catalogo, st.session_state.selected_passagem_volta)
+        if current_passagem_volta_price is not None:
+            st.success(f"✔️ **Passagem de VOLTA Selecionada:** {companhia_passagem(st.session_state.selected_passagem_volta)} ({formatar_moeda(current_passagem_volta_price)})")
+        else:
+            current_passagem_volta_price = 0.0
+            st.warning("Passagem de VOLTA selecionada anteriormente não encontrada. Por favor, faça uma nova seleção.")
+            st.session_state.selected_passagem_volta = None
+
+    total_passagens_calculado = current_passagem_ida_price + current_passagem_volta_price
+    if total_passagens_calculado > 0:
+        st.info(f"**Total de Passagens Aéreas Selecionadas:** {formatar_moeda(total_passagens_calculado)}")
     else:
-        current_passagem_ida_price = 0.0
-        st.warning("Passagem de IDA selecionada anteriormente não encontrada. Por favor, faça uma nova seleção.")
-        st.session_state.selected_passagem_ida = None
-
-if st.session_state.selected_passagem_volta:
-    selected_volta_data = df_passagens_original[
-        df_passagens_original['Sentido + Companhia + Origem + Destino'] == st.session_state.selected_passagem_volta
-    ]
-    if not selected_volta_data.empty:
-        current_passagem_volta_price = selected_volta_data['Total (R$)'].iloc[0]
-        st.success(f"✔️ **Passagem de VOLTA Selecionada:** {st.session_state.selected_passagem_volta.split('|')[1].strip()} ({formatar_moeda(current_passagem_volta_price)})")
-    else:
-        current_passagem_volta_price = 0.0
-        st.warning("Passagem de VOLTA selecionada anteriormente não encontrada. Por favor, faça uma nova seleção.")
-        st.session_state.selected_passagem_volta = None
+        st.info("Por favor, selecione uma passagem de IDA e uma de VOLTA para calcular o custo total das passagens.")
 
-total_passagens_calculado = current_passagem_ida_price + current_passagem_volta_price
-if total_passagens_calculado > 0:
-    st.info(f"**Total de Passagens Aéreas Selecionadas:** {formatar_moeda(total_passagens_calculado)}")
-else:
-    st.info("Por favor, selecione uma passagem de IDA e uma de VOLTA para calcular o custo total das passagens.")
+    atualizar_subtotal('passagens', total_passagens_calculado)
 
+secao_passagens()
 
 st.markdown("---")
 
-
 # --- 3. Custos de Atrações (Fixos e Editáveis) ---
-st.subheader("💸 3. Ajuste as Quantidades das Atrações") # Renumbered to 3
+@st.fragment
+@metricas.cronometrado('secao_atracoes', tempos_sessao)
+def secao_atracoes():
+    st.subheader("💸 3. Ajuste as Quantidades das Atrações") # Renumbered to 3
+
+    total_atracoes_calculado = 0.0
+
+    # Cria as colunas para cada linha de atração
+    for cartao in exibicao.atracoes:
+        index = cartao.posicao
+        col1, col2, col3, col4 = st.columns([0.4, 0.2, 0.2, 0.2])
+
+        with col1:
+            st.write(f"**{cartao.nome}**")
+        with col2:
+            st.write(cartao.valor_formatado)
+        with col3:
+            # st.number_input para ajustar a quantidade
+            # O valor inicial vai para o session_state antes do widget existir, e o widget nunca recebe value=:
+            # assim os argumentos (e o ID do widget) são os mesmos em todas as execuções, inclusive depois
+            # que as quantidades são remapeadas por uma atualização da planilha
+            chave_quantidade = f"qty_{index}"
+            if chave_quantidade not in st.session_state:
+                st.session_state[chave_quantidade] = cartao.quantidade
+            quantity = st.number_input(
+                f"Qtd {cartao.nome}",
+                min_value=0,
+                step=1,
+                key=chave_quantidade,
+                label_visibility="collapsed" # Esconde o label acima do input
+            )
+        with col4:
+            subtotal = subtotal_atracao(cartao.valor, quantity)
+            st.write(f"{formatar_moeda(subtotal)}")
+            total_atracoes_calculado += subtotal
+
+    st.info(f"**Total de Custos de Atrações Fixos:** **{formatar_moeda(total_atracoes_calculado)}**")
+
+    atualizar_subtotal('atracoes', total_atracoes_calculado)
 
-total_atracoes_calculado = 0.0
+secao_atracoes()
 
-# Cria as colunas para cada linha de atração
-for index, row in df_atracoes_original.iterrows():
-    col1, col2, col3, col4 = st.columns([0.4, 0.2, 0.2, 0.2])
+st.markdown("---")
+
+# --- 4. Seleção de Aluguel de Carro (em blocos com botão de seleção) ---
+@st.fragment
+@metricas.cronometrado('secao_carro', tempos_sessao)
+def secao_carro():
+    current_carro_price = 0.0
+    st.subheader("🚗 4. Escolha o Aluguel de Carro") # Renumbered to 4
+    st.write("Selecione um aluguel de carro da lista abaixo:")
+
+    cartoes_carros = catalogo_paginado("carros", exibicao.carros, FILTROS_CARROS, ORDENACOES_CARROS, 9)
+
+    # Criar colunas para os blocos de aluguel de carro
+    carro_blocks_container = st.container() # Cria um container para as colunas de carros
+    with carro_blocks_container:
+        carro_cols = st.columns(cols_per_row) # Reutilizando o número de colunas
+
+    # Itera sobre cada carro da página para criar um bloco de seleção dentro de uma coluna
+    for posicao_na_pagina, cartao in enumerate(cartoes_carros):
+        index = cartao.posicao
+        carro_type = cartao.tipo
+        locadora = cartao.locadora
+        is_selected = (st.session_state.selected_carro_type_locadora == (carro_type, locadora))
+
+        # Usa o índice para determinar em qual coluna o bloco será colocado
+        with carro_cols[posicao_na_pagina % cols_per_row]:
+            # st.container para cada bloco de carro
+            with st.container(border=True):
+                st.markdown(f"**{cartao.tipo}** ({cartao.locadora})")
+                if cartao.selos:
+                    st.markdown(cartao.selos)
+                st.write(f"- **Preço p/ Período:** {cartao.preco_periodo}")
+                st.write(f"- **Preço p/ Dia:** {cartao.preco_dia}")
+                st.write(f"- **Dias:** {cartao.dias}")
+                st.write(f"- **Passageiros:** {cartao.passageiros}")
+                st.write(f"- **Preço p/ Passageiro:** {cartao.preco_passageiro}")
+
+                # Botão de seleção
+                st.button(
+                    f"Selecionar este Carro",
+                    key=f"select_carro_btn_{carro_type}_{locadora}", # Chave única
+                    on_click=select_carro, # Chama a função ao clicar
+                    args=(carro_type, locadora), # Argumentos para a função
+                    disabled=is_selected or cartao.preco_periodo == formatacao.SEM_COTACAO # Desabilita se for o selecionado ou estiver sem preço
+                )
+
+    # Garante que o preço do carro selecionado seja usado no cálculo final
+    if st.session_state.selected_carro_type_locadora:
+        current_carro_price = preco_carro(catalogo, st.session_state.selected_carro_type_locadora)
+        if current_carro_price is not None:
+            st.success(f"✔️ **Aluguel de Carro Selecionado:** {st.session_state.selected_carro_type_locadora[0]} ({st.session_state.selected_carro_type_locadora[1]}) ({formatar_moeda(current_carro_price)})")
+        else:
+            # Caso o carro selecionado não seja mais encontrado
+            current_carro_price = 0.0
+            st.warning("Aluguel de carro selecionado anteriormente não encontrado nos dados atuais. Por favor, faça uma nova seleção.")
+            st.session_state.selected_carro_type_locadora = None # Resetar seleção
+
+    atualizar_subtotal('carro', current_carro_price)
+
+secao_carro()
+
+st.markdown("---")
 
+# Tabelas com colunas em reais (sugestões, cenários e planos)
+def tabela_moeda(df, **kwargs):
+    # Valores em reais exibidos na moeda escolhida; os títulos "(R$)" passam a mostrar o símbolo dela
+    subset = [coluna for coluna in df.columns if str(coluna).endswith('(R$)')] if kwargs.pop('so_reais', False) else None
+    estilo = df.style.format(formatar_moeda, subset=subset)
+    if moeda_exibicao != 'BRL':
+        simbolo = formatacao.SIMBOLOS_MOEDA.get(moeda_exibicao, moeda_exibicao)
+        estilo = estilo.format_index(lambda coluna: str(coluna).replace('(R$)', f'({simbolo})'), axis=1)
+    st.dataframe(estilo, **kwargs)
+
+
+# --- 5. Sugestão da Melhor Viagem (busca das combinações mais baratas sob restrições) ---
+def aplicar_sugestao(sugestao):
+    st.session_state.selected_hotel_name = sugestao['Hotel']
+    ids_passagens = catalogo.passagens['id_passagem']
+    st.session_state.selected_passagem_ida = int(ids_passagens.iat[sugestao['posicao_ida']])
+    st.session_state.selected_passagem_volta = int(ids_passagens.iat[sugestao['posicao_volta']])
+    if sugestao['Tipo do Carro'] is not None:
+        st.session_state.selected_carro_type_locadora = (sugestao['Tipo do Carro'], sugestao['Locadora'])
+
+@st.fragment
+@metricas.cronometrado('secao_sugestao', tempos_sessao)
+def secao_sugestao():
+    st.subheader("💡 5. Sugestão da Melhor Viagem")
+    st.write("Encontre as combinações completas (hotel, ida, volta e carro) mais baratas que respeitam as restrições abaixo:")
+
+    col1, col2, col3 = st.columns(3)
     with col1:
-        st.write(f"**{row['Atrações']}**")
+        passageiros = st.number_input("Passageiros (0 = qualquer)", min_value=0, value=0, step=1, key="sugestao_passageiros")
+        quantidade = st.number_input("Quantidade de sugestões", min_value=1, max_value=50, value=5, step=1, key="sugestao_quantidade")
     with col2:
-        st.write(f"{formatar_moeda(row['Valor (R$)'])}")
+        distancia_maxima = st.number_input("Distância máxima do centro (km, 0 = sem limite)", min_value=0.0, value=0.0, step=0.1, key="sugestao_distancia")
+        peso_distancia = st.number_input("Penalidade por km do centro (R$)", min_value=0.0, value=0.0, step=50.0, key="sugestao_peso")
     with col3:
-        # st.number_input para ajustar a quantidade
-        quantity = st.number_input(
-            f"Qtd {row['Atrações']}",
-            min_value=0,
-            value=int(row['Quantidade']),
-            step=1,
-            key=f"qty_{index}",
-            label_visibility="collapsed" # Esconde o label acima do input
-        )
-    with col4:
-        subtotal = row['Valor (R$)'] * quantity
-        st.write(f"{formatar_moeda(subtotal)}")
-        total_atracoes_calculado += subtotal
-
-st.info(f"**Total de Custos de Atrações Fixos:** **{formatar_moeda(total_atracoes_calculado)}**")
+        orcamento_maximo = st.number_input("Orçamento máximo (R$, 0 = sem limite)", min_value=0.0, value=0.0, step=100.0, key="sugestao_orcamento")
+        incluir_carro = st.checkbox("Incluir aluguel de carro", value=True, key="sugestao_incluir_carro")
+
+    restricoes = Restricoes(
+        passageiros=int(passageiros),
+        distancia_maxima=distancia_maxima or None,
+        orcamento_maximo=orcamento_maximo or None,
+        incluir_carro=incluir_carro,
+        custo_atracoes=st.session_state.subtotais['atracoes'],
+        peso_distancia=peso_distancia,
+    )
+    sugestoes = sugerir_viagens(catalogo, restricoes, k=int(quantidade))
+    # Guardadas para a exportação em lote (seção 8)
+    st.session_state.sugestao_resultado = sugestoes
+
+    if sugestoes.empty:
+        st.warning("Nenhuma viagem completa atende a essas restrições.")
+        return
+
+    colunas_exibidas = ['Hotel', 'Passagem de Ida', 'Passagem de Volta', 'Tipo do Carro', 'Locadora', 'Hotel (R$)', 'Passagens (R$)', 'Atrações (R$)', 'Carro (R$)', 'Total (R$)']
+    tabela_moeda(sugestoes[colunas_exibidas], so_reais=True, hide_index=True)
+
+    escolha = st.selectbox(
+        "Sugestão a aplicar",
+        sugestoes.index,
+        format_func=lambda i: f"{i + 1}. {sugestoes.at[i, 'Hotel']} – {formatar_moeda(sugestoes.at[i, 'Total (R$)'])}",
+        key="sugestao_escolhida"
+    )
+    if st.button("Aplicar esta sugestão", key="aplicar_sugestao_btn"):
+        aplicar_sugestao(sugestoes.loc[escolha])
+        # As seleções pertencem às outras seções: reexecuta o app inteiro para atualizá-las
+        st.rerun()
+
+secao_sugestao()
 
 st.markdown("---")
 
-# --- 4. Seleção de Aluguel de Carro (em blocos com botão de seleção) ---
-st.subheader("🚗 4. Escolha o Aluguel de Carro") # Renumbered to 4
-st.write("Selecione um aluguel de carro da lista abaixo:")
-
-# Criar colunas para os blocos de aluguel de carro
-carro_blocks_container = st.container() # Cria um container para as colunas de carros
-with carro_blocks_container:
-    carro_cols = st.columns(cols_per_row) # Reutilizando o número de colunas
-
-# Itera sobre cada carro para criar um bloco de seleção dentro de uma coluna
-for index, row in df_aluguel_carro_original.iterrows():
-    carro_type = row['Tipo do Carro']
-    locadora = row['Locadora']
-    is_selected = (st.session_state.selected_carro_type_locadora == (carro_type, locadora))
-
-    # Usa o índice para determinar em qual coluna o bloco será colocado
-    with carro_cols[index % cols_per_row]:
-        # st.container para cada bloco de carro
-        with st.container(border=True):
-            st.markdown(f"**{row['Tipo do Carro']}** ({row['Locadora']})")
-            st.write(f"- **Preço p/ Período:** {formatar_moeda(row['Preço por Período (R$)'])}")
-            st.write(f"- **Preço p/ Dia:** {formatar_moeda(row['Preço por Dia (R$)'])}")
-            st.write(f"- **Dias:** {row['Dias']}")
-            st.write(f"- **Passageiros:** {row['Passageiros']}")
-            st.write(f"- **Preço p/ Passageiro:** {formatar_moeda(row['Preço por Passageiro (R$)'])}")
-
-            # Botão de seleção
-            st.button(
-                f"Selecionar este Carro",
-                key=f"select_carro_btn_{carro_type}_{locadora}", # Chave única
-                on_click=select_carro, # Chama a função ao clicar
-                args=(carro_type, locadora), # Argumentos para a função
-                disabled=is_selected # Desabilita se for o selecionado
+# --- 6. Cenários: grades de simulações calculadas de uma vez (sem uma reexecução por variação) ---
+@st.fragment
+@metricas.cronometrado('secao_cenarios', tempos_sessao)
+def secao_cenarios():
+    st.subheader("📊 6. Cenários: e se...?")
+    col_texto, col_botao = st.columns([0.8, 0.2])
+    with col_texto:
+        st.write("Compare muitas variações da viagem de uma vez, partindo das escolhas atuais:")
+    with col_botao:
+        # As outras seções são fragmentos independentes: o botão reexecuta esta seção com os subtotais mais recentes
+        st.button("🔄 Atualizar", key="atualizar_cenarios_btn")
+    subtotais = st.session_state.subtotais
+    aba_atracoes, aba_viajantes, aba_carro, aba_hoteis_voos = st.tabs(["Quantidades de atrações", "Número de viajantes", "Dias de carro", "Hotel × voos"])
+
+    with aba_atracoes:
+        escolhidas = st.multiselect(
+            "Atrações (até 3)",
+            range(len(exibicao.atracoes)),
+            format_func=lambda i: exibicao.atracoes[i].nome,
+            max_selections=3,
+            key="cenario_atracoes"
+        )
+        maximo = st.slider("Quantidade máxima de cada atração", min_value=1, max_value=10, value=4, key="cenario_maximo_atracoes")
+        if escolhidas:
+            cartoes = [exibicao.atracoes[i] for i in escolhidas]
+            # Custo da viagem sem as atrações escolhidas (as demais ficam com as quantidades atuais)
+            atuais = sum(subtotal_atracao(cartao.valor, st.session_state.get(f"qty_{cartao.posicao}", cartao.quantidade)) for cartao in cartoes)
+            df = cenarios_atracoes([cartao.nome for cartao in cartoes], [cartao.valor for cartao in cartoes], [maximo] * len(cartoes), calcular_custo_total() - atuais)
+            if len(cartoes) == 1:
+                st.line_chart(df, x=cartoes[0].nome, y='Total (R$)')
+            elif len(cartoes) == 2:
+                tabela_moeda(df.pivot(index=cartoes[0].nome, columns=cartoes[1].nome, values='Total (R$)'))
+                st.caption(f"Linhas: {cartoes[0].nome}; colunas: {cartoes[1].nome}.")
+            else:
+                tabela_moeda(df, so_reais=True, hide_index=True)
+            st.caption(f"{len(df)} cenários calculados.")
+        else:
+            st.info("Escolha uma ou mais atrações para ver o total da viagem em cada combinação de quantidades.")
+
+    with aba_viajantes:
+        hotel = catalogo.posicao_hotel(st.session_state.selected_hotel_name)
+        preco_ida = preco_passagem(catalogo, st.session_state.selected_passagem_ida)
+        preco_volta = preco_passagem(catalogo, st.session_state.selected_passagem_volta)
+        if hotel is None or preco_ida is None or preco_volta is None:
+            st.info("Selecione um hotel e as passagens de ida e volta para simular o número de viajantes.")
+        else:
+            maximo_viajantes = st.slider("Até quantos viajantes", min_value=1, max_value=20, value=6, key="cenario_viajantes")
+            carro = catalogo.posicao_carro(st.session_state.selected_carro_type_locadora or ())
+            df = cenarios_viajantes(
+                range(1, maximo_viajantes + 1),
+                preco_hospede=float(catalogo.hoteis['Preço por Hóspede (R$)'].iat[hotel]),
+                preco_passagens=preco_ida + preco_volta,
+                preco_carro=0.0 if carro is None else float(catalogo.aluguel_carro['Preço por Período (R$)'].iat[carro]),
+                capacidade_carro=1 if carro is None else int(catalogo.aluguel_carro['Passageiros'].iat[carro]),
+                custo_atracoes=subtotais['atracoes'],
             )
+            st.line_chart(df, x='Viajantes', y=['Total (R$)', 'Por pessoa (R$)'])
+            tabela_moeda(df, so_reais=True, hide_index=True)
+            st.caption("Hotel pelo Preço por Hóspede, passagens pelo preço por passageiro e um carro a mais a cada lotação; atrações com as quantidades atuais.")
+
+    with aba_carro:
+        dias = st.slider("Dias de aluguel", min_value=1, max_value=30, value=(3, 10), key="cenario_dias_carro")
+        df = cenarios_dias_carro(catalogo.aluguel_carro, range(dias[0], dias[1] + 1), calcular_custo_total() - subtotais['carro'])
+        tabela_moeda(df)
+        st.caption("Total da viagem com cada carro (os mais baratos por dia) alugado pelo número de dias da coluna.")
+
+    with aba_hoteis_voos:
+        df = cenarios_hoteis_voos(catalogo, subtotais['atracoes'] + subtotais['carro'])
+        if df.empty:
+            st.info("Não há hotéis ou pares de ida e volta na mesma rota para comparar.")
+        else:
+            tabela_moeda(df)
+            st.caption("Total da viagem para cada hotel (linhas) com cada par de voos de ida / volta (colunas), com o carro e as atrações atuais.")
+
+secao_cenarios()
+
+st.markdown("---")
+
+# --- 7. Planos Salvos: gravar, abrir por link, listar e comparar (totais calculados em lote pelo motor) ---
+def selecao_atual():
+    # Seleções da sessão com as chaves de texto da planilha (o formato guardado nos planos e aceito pelo motor)
+    chaves_passagens = catalogo.passagens[CHAVE_PASSAGEM]
+    passagens = []
+    for sentido in ('ida', 'volta'):
+        posicao = catalogo.posicao_passagem(st.session_state[f"selected_passagem_{sentido}"])
+        passagens.append(None if posicao is None else chaves_passagens.iat[posicao])
+    quantidades = {
+        nome: int(st.session_state.get(f"qty_{index}", padrao))
+        for index, (nome, padrao) in enumerate(zip(catalogo.atracoes['Atrações'].tolist(), catalogo.atracoes['Quantidade'].tolist()))
+    }
+    return Selecao(
+        hotel=st.session_state.selected_hotel_name,
+        passagem_ida=passagens[0],
+        passagem_volta=passagens[1],
+        carro=st.session_state.selected_carro_type_locadora,
+        quantidades=quantidades,
+    )
+
+ROTULOS_PLANO = {'hotel': 'Hotel', 'passagem_ida': 'Passagem de Ida', 'passagem_volta': 'Passagem de Volta', 'carro_tipo': 'Tipo do Carro', 'carro_locadora': 'Locadora'}
+
+def abrir_plano(codigo):
+    # O plano é aplicado no início da próxima execução completa, antes de os campos de quantidade existirem
+    st.query_params['plano'] = codigo
+    st.session_state.pop('plano_aberto', None)
+
+def excluir_plano(codigo):
+    armazem_planos().remover(codigo)
+    if st.query_params.get('plano') == codigo:
+        del st.query_params['plano']
+
+@st.fragment
+@metricas.cronometrado('secao_planos', tempos_sessao)
+def secao_planos():
+    st.subheader("💾 7. Planos Salvos")
+    armazem = armazem_planos()
+
+    col_nome, col_salvar = st.columns([0.7, 0.3], vertical_alignment="bottom")
+    with col_nome:
+        nome = st.text_input("Nome do plano", key="plano_nome", placeholder="Ex.: Gramado econômico")
+    with col_salvar:
+        if st.button("Salvar plano atual", key="salvar_plano_btn"):
+            codigo = armazem.salvar(id_viagem, nome.strip() or f"Plano de {time.strftime('%d/%m/%Y %H:%M')}", selecao_atual())
+            st.session_state.plano_aberto = codigo
+            st.query_params['plano'] = codigo
+            st.success(f"Plano salvo. Para reabri-lo, use o link desta página (?plano={codigo}).")
+
+    planos = armazem.listar(id_viagem)
+    if planos.empty:
+        st.info("Nenhum plano salvo para esta viagem ainda.")
+        return
+
+    # Totais de todos os planos com os preços atuais da planilha, em uma única chamada vetorizada
+    orcamentos = planos[['codigo', 'nome', 'criado_em']].join(totais_planos(catalogo, planos).drop(columns='id'))
+    nomes = dict(zip(orcamentos['codigo'], orcamentos['nome']))
+    tabela_moeda(
+        orcamentos.rename(columns={'codigo': 'Código', 'nome': 'Nome', 'criado_em': 'Criado em', 'nao_encontrados': 'Não encontrados'}),
+        so_reais=True,
+        hide_index=True,
+    )
+
+    comparados = st.multiselect("Comparar planos lado a lado", list(nomes), format_func=lambda codigo: f"{nomes[codigo]} ({codigo})", key="planos_comparados")
+    if comparados:
+        lado_a_lado = planos.set_index('codigo').loc[comparados, list(ROTULOS_PLANO)].rename(columns=ROTULOS_PLANO)
+        lado_a_lado = lado_a_lado.join(orcamentos.set_index('codigo')[COLUNAS_ORCAMENTO].map(formatar_moeda))
+        lado_a_lado.index = [f"{nomes[codigo]} ({codigo})" for codigo in comparados]
+        st.dataframe(lado_a_lado.T.astype(str).replace({'None': '—'}))
+
+    col_escolha, col_abrir, col_excluir = st.columns([0.6, 0.2, 0.2], vertical_alignment="bottom")
+    with col_escolha:
+        escolhido = st.selectbox("Plano", list(nomes), format_func=lambda codigo: f"{nomes[codigo]} ({codigo})", key="plano_escolhido")
+    with col_abrir:
+        if st.button("Abrir plano", key="abrir_plano_btn", on_click=abrir_plano, args=(escolhido,)):
+            # As seleções pertencem às outras seções: reexecuta o app inteiro para aplicá-las
+            st.rerun()
+    with col_excluir:
+        # Callback: a exclusão acontece antes de a lista ser desenhada de novo
+        st.button("Excluir plano", key="excluir_plano_btn", on_click=excluir_plano, args=(escolhido,))
+
+secao_planos()
+
+st.markdown("---")
 
-# Garante que o preço do carro selecionado seja usado no cálculo final
-if st.session_state.selected_carro_type_locadora:
-    selected_carro_data = df_aluguel_carro_original[
-        (df_aluguel_carro_original['Tipo do Carro'] == st.session_state.selected_carro_type_locadora[0]) &
-        (df_aluguel_carro_original['Locadora'] == st.session_state.selected_carro_type_locadora[1])
-    ]
-    if not selected_carro_data.empty:
-        current_carro_price = selected_carro_data['Preço por Período (R$)'].iloc[0]
-        st.success(f"✔️ **Aluguel de Carro Selecionado:** {st.session_state.selected_carro_type_locadora[0]} ({st.session_state.selected_carro_type_locadora[1]}) ({formatar_moeda(current_carro_price)})")
+# --- 8. Exportar Orçamento: arquivos gerados em uma thread de fundo, sem bloquear a execução ---
+@st.cache_resource
+def exportador():
+    return Exportador()
+
+ROTULOS_FORMATO = {'xlsx': "Excel (XLSX)", 'pdf': "PDF", 'csv': "CSV"}
+INTERVALO_EXPORTACAO = "1s"
+
+@st.fragment(run_every=INTERVALO_EXPORTACAO)
+def aguardar_exportacao():
+    # Só existe enquanto o arquivo é gerado: ao terminar, uma execução completa desenha o download sem este fragmento,
+    # e a verificação periódica acaba
+    tarefa, nome_arquivo, _ = st.session_state.exportacao_tarefa
+    if tarefa.done():
+        st.rerun()
+    st.info(f"⏳ Gerando {nome_arquivo}...")
+
+def download_exportacao():
+    tarefa, nome_arquivo, mime = st.session_state.exportacao_tarefa
+    if not tarefa.done():
+        aguardar_exportacao()
+    elif tarefa.exception() is not None:
+        st.error(f"Não foi possível gerar {nome_arquivo}: {tarefa.exception()}")
     else:
-        # Caso o carro selecionado não seja mais encontrado
-        current_carro_price = 0.0
-        st.warning("Aluguel de carro selecionado anteriormente não encontrado nos dados atuais. Por favor, faça uma nova seleção.")
-        st.session_state.selected_carro_type_locadora = None # Resetar seleção
+        st.download_button(f"⬇️ Baixar {nome_arquivo}", tarefa.result(), file_name=nome_arquivo, mime=mime, key="exportacao_download_btn")
+
+@st.fragment
+@metricas.cronometrado('secao_exportacao', tempos_sessao)
+def secao_exportacao():
+    st.subheader("📤 8. Exportar Orçamento")
+    col_conteudo, col_formato, col_gerar = st.columns([0.5, 0.3, 0.2], vertical_alignment="bottom")
+    with col_conteudo:
+        conteudo = st.radio(
+            "O que exportar",
+            ['plano', 'lote'],
+            format_func={'plano': "Plano atual (itens por seção)", 'lote': "Planos salvos e sugestões (uma aba por cenário)"}.get,
+            key="exportacao_conteudo",
+        )
+    with col_formato:
+        # CSV guarda uma tabela só: disponível para o plano atual
+        formatos = list(FORMATOS) if conteudo == 'plano' else ['xlsx', 'pdf']
+        formato = st.selectbox("Formato", formatos, format_func=ROTULOS_FORMATO.get, key="exportacao_formato")
+    with col_gerar:
+        gerar = st.button("Gerar arquivo", key="exportacao_gerar_btn")
+
+    if gerar:
+        # As linhas são produzidas na thread de fundo; aqui só se reúnem as escolhas (plano atual, planos salvos, sugestões)
+        selecao = selecao_atual()
+        if conteudo == 'plano':
+            abas = abas_plano(catalogo, selecao)
+        else:
+            cenarios = [armazem_planos().listar(id_viagem)]
+            sugestoes = st.session_state.get('sugestao_resultado')
+            if sugestoes is not None and not sugestoes.empty:
+                cenarios.append(cenarios_sugestoes(catalogo, sugestoes, selecao.quantidades))
+            abas = abas_lote(catalogo, pd.concat(cenarios, ignore_index=True))
+        _, extensao, mime = FORMATOS[formato]
+        nome_arquivo = f"orcamento_{id_viagem}{'_cenarios' if conteudo == 'lote' else ''}.{extensao}"
+        st.session_state.exportacao_tarefa = (exportador().enviar(formato, abas), nome_arquivo, mime)
+
+    if 'exportacao_tarefa' in st.session_state:
+        download_exportacao()
+
+secao_exportacao()
 
 st.markdown("---")
 
 # --- Cálculo e Exibição do Custo Total da Viagem ---
-# Aqui o cálculo é feito *antes* de exibir na sidebar e na tela principal
-final_total_cost = current_hotel_price + total_passagens_calculado + total_atracoes_calculado + current_carro_price
+# Desenhados só nas execuções completas: as seções pedem uma quando mudam o custo total (atualizar_subtotal)
+
+def total_sidebar():
+    st.markdown("### 💰 Custo Total Estimado da Viagem") # Texto atualizado aqui
+    st.markdown(f"**{formatar_moeda(calcular_custo_total())}**")
+
+def total_principal():
+    st.header("💰 Custo Total Estimado da Viagem")
+    st.success(f"**O Custo Total Estimado da Sua Viagem é: {formatar_moeda(calcular_custo_total())}**")
+    st.session_state.total_exibido = calcular_custo_total()
 
 # Exibe o custo total na sidebar
 st.sidebar.markdown("---") # Separador visual na sidebar
-st.sidebar.markdown("### 💰 Custo Total Estimado da Viagem") # Texto atualizado aqui
-st.sidebar.markdown(f"**{formatar_moeda(final_total_cost)}**")
+with st.sidebar:
+    total_sidebar()
 
 
 # Exibe o custo total na tela principal
-st.header("💰 Custo Total Estimado da Viagem")
-st.success(f"**O Custo Total Estimado da Sua Viagem é: {formatar_moeda(final_total_cost)}**")
-
-
-# --- Estilos CSS personalizados ---
-st.markdown("""
-<style>
-    p {
-        font-size: 1.05em;
-    }
-    .st-emotion-cache-nahz7x { /* Target st.info and st.success message boxes */
-        background-color: #e6f7ff;
-        border-left: 5px solid #007bff;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-        color: #000000;
-    }
-    .st-emotion-cache-nahz7x.stAlert-success {
-        background-color: #e6ffe6;
-        border-left: 5px solid #66cc66;
-        color: #338833;
-    }
-    .st-emotion-cache-nahz7x p {
-        font-size: 1.05em;
-        font-weight: normal;
-    }
-    .st-emotion-cache-nahz7x.stAlert-success p {
-        font-size: 1.3em;
-        font-weight: bold;
-    }
-    .dataframe {
-        font-size: 0.9em;
-    }
-    /* Ajustes para os botões de seleção e containers (os "blocos") */
-    div[data-testid="stContainer"] {
-        padding: 1rem;
-        margin-bottom: 0.75rem;
-        border: 1px solid #ccc; /* Borda padrão para o container */
-        border-radius: 0.5rem;
-        box-shadow: 2px 2px 8px rgba(0,0,0,0.1); /* Sombra suave para destacar o bloco */
-        height: 100%; /* Garante que os containers tenham a mesma altura em uma linha */
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between; /* Empurra o botão para baixo */
-    }
-    div[data-testid="stContainer"] button { /* Estilo para o botão DENTRO do container */
-        width: 100%; /* Botão ocupa toda a largura do bloco */
-        margin-top: auto; /* Empurra o botão para a parte inferior do container */
-    }
-    /* Estilo geral para todos os botões (incluindo os de seleção) */
-    .stButton > button {
-        background-color: #007bff; /* Azul primário */
-        color: white;
-        border-radius: 0.5rem;
-        padding: 0.5rem 1rem;
-        font-size: 1.1em;
-        border: none;
-        cursor: pointer;
-        transition: background-color 0.2s; /* Transição suave na cor */
-    }
-    .stButton > button:hover:enabled {
-        background-color: #0056b3; /* Azul mais escuro ao passar o mouse */
-        color: white !important;
-    }
-    .stButton > button:disabled { /* Estilo para o botão DESABILITADO (quando já selecionado) */
-        background-color: #cccccc; /* Cinza */
-        color: #666666; /* Texto cinza */
-        cursor: not-allowed;
-    }
-    h1, h2, h3, h4, h5, h6 {
-        color: #FF4B4B; /* Cor vermelha para títulos */
-    }
-    a { /* Estilo para links em geral */
-        color: #007bff;
-        text-decoration: none;
-    }
-    a:hover {
-        text-decoration: underline;
-    }
-    /* Ajusta o espaçamento entre as colunas - Este seletor pode variar entre versões do Streamlit */
-    /* Você pode precisar inspecionar o elemento para encontrar o correto para sua versão */
-    div[data-testid="column"] { /* Seletor comum para as colunas */
-        gap: 1rem; /* Espaço entre as colunas */
-    }
-    div[data-testid="stVerticalBlock"] > div[data-testid="stHorizontalBlock"] {
-        gap: 1rem; /* Outro possível seletor para ajustar o gap entre colunas */
-    }
-</style>
-""", unsafe_allow_html=True)
\ No newline at end of file
+total_principal()
+
+# --- Painel de depuração: tempos desta execução e acumulados do processo ---
+if metricas.ativo():
+    metricas.registrar('execucao_completa', time.perf_counter() - inicio_execucao, st.session_state.tempos_execucao)
+
+def painel_metricas():
+    st.caption(f"Execuções completas desta sessão: {st.session_state.execucoes}")
+    st.markdown("**Última execução (ms)**")
+    st.dataframe([
+        {'Intervalo': nome, 'ms': round(segundos * 1000, 2)}
+        for nome, segundos in st.session_state.tempos_execucao.items()
+    ], hide_index=True)
+    st.markdown("**Processo**")
+    st.dataframe([
+        {'Intervalo': nome, 'Vezes': e['quantidade'], 'Média (ms)': round(e['media_s'] * 1000, 2), 'Máx. (ms)': round(e['max_s'] * 1000, 2)}
+        for nome, e in sorted(metricas.intervalos().items())
+    ], hide_index=True)
+    contadores = metricas.contadores()
+    for funcao in ['load_excel_data', 'load_display_data']:
+        chamadas = contadores.get(('cache_chamadas', (('funcao', funcao),)), 0)
+        misses = contadores.get(('cache_misses', (('funcao', funcao),)), 0)
+        st.caption(f"Cache de {funcao}: {chamadas - misses} acertos, {misses} misses")
+    st.download_button("Exportar métricas (Prometheus)", metricas.texto_prometheus(), file_name="metricas.prom", mime="text/plain")
+
+if painel_depuracao:
+    with st.sidebar.expander("🐞 Depuração", expanded=True):
+        painel_metricas()
@@ -0,0 +1,218 @@
+"""Benchmarks do planejador com planilhas sintéticas de 10² a 10⁵ linhas.
+
+Para cada tamanho, gera uma planilha (gerar_planilha.py) e mede:
+- carga fria: leitura do XLSX, gravação do snapshot e montagem do catálogo
+  (o que load_excel_data faz quando a planilha muda);
+- carga do snapshot: o mesmo caminho com o snapshot já gravado (o caso comum
+  de load_excel_data em um processo novo);
+- execução completa do app pelo AppTest do Streamlit: a primeira (caches
+  vazios) e as reexecuções seguintes;
+- sessões concorrentes: várias sessões executando o app ao mesmo tempo, cada
+  uma em um processo Python novo (o AppTest não roda em várias threads de um
+  processo), com os caches do processo já preenchidos e liberadas juntas:
+  latência de cada execução sob carga (mediana, p95, máximo) e execuções por
+  segundo; numa segunda rodada, com o tracemalloc ligado (que deixaria as
+  latências mais lentas), as alocações Python/NumPy de cada sessão e o pico
+  de memória residente de cada processo.
+
+O resultado vai para um relatório JSON, para comparar execuções entre mudanças.
+
+Uso:
+    python benchmarks/executar.py --linhas 100 1000 10000 100000 -o relatorio.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# O AppTest não inclui a pasta do app no sys.path (o `streamlit run` inclui)
+sys.path.insert(0, RAIZ)
+
+import pandas as pd
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from gerar_planilha import gerar_planilha
+from planejador.catalogo import montar_catalogo
+from planejador.snapshot import atualizar_snapshot, ler_versao
+
+APP = os.path.join(RAIZ, 'app_orcamento.py')
+TAMANHOS = [100, 1_000, 10_000, 100_000]
+TEMPO_LIMITE_APP = 600
+
+# Uma sessão concorrente, em um processo novo. Sincroniza com o processo principal pela entrada e saída padrão:
+# avisa que está pronta (caches do processo preenchidos) e só começa cada rodada quando recebe uma linha
+_SESSAO_CONCORRENTE = """
+import json, resource, sys, time, tracemalloc
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+
+def executar():
+    at = AppTest.from_file({app!r}, default_timeout={limite}).run()
+    if at.exception:
+        raise SystemExit(at.exception[0].value)
+    return at
+
+def sessao():
+    inicio = time.perf_counter()
+    at = executar()
+    latencias = [time.perf_counter() - inicio]
+    for _ in range({reexecucoes}):
+        inicio = time.perf_counter()
+        at.run()
+        latencias.append(time.perf_counter() - inicio)
+    return at, latencias
+
+def aguardar(sinal):
+    print(sinal, flush=True)
+    sys.stdin.readline()
+
+executar()
+aguardar('pronta')
+_, latencias = sessao()
+aguardar('medida')
+tracemalloc.start()
+base, _ = tracemalloc.get_traced_memory()
+aberta, _ = sessao()
+atual, pico = tracemalloc.get_traced_memory()
+# ru_maxrss vem em KiB no Linux
+print(json.dumps({{'latencias': latencias, 'bytes_sessao': atual - base, 'pico_bytes': pico - base,
+                  'rss_pico_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}}), flush=True)
+"""
+
+
+def _cronometrar(funcao, repeticoes=1):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _resumo(tempos):
+    return {'mediana_s': statistics.median(tempos), 'min_s': min(tempos), 'max_s': max(tempos), 'repeticoes': len(tempos)}
+
+
+def _resumo_latencias(tempos):
+    p95 = statistics.quantiles(tempos, n=20)[-1] if len(tempos) > 1 else tempos[0]
+    return {**_resumo(tempos), 'p95_s': p95}
+
+
+def _executar_app():
+    at = AppTest.from_file(APP, default_timeout=TEMPO_LIMITE_APP).run()
+    if at.exception:
+        raise RuntimeError(f"O app falhou: {at.exception[0].value}")
+    return at
+
+
+def medir_carga(caminho, repeticoes):
+    [carga_fria] = _cronometrar(lambda: montar_catalogo(*ler_versao(caminho, atualizar_snapshot(caminho)[0])))
+    versao, _ = atualizar_snapshot(caminho)
+    carga_snapshot = _cronometrar(lambda: montar_catalogo(*ler_versao(caminho, versao)), repeticoes)
+    return {'carga_fria_s': carga_fria, 'carga_snapshot': _resumo(carga_snapshot)}
+
+
+def medir_app(repeticoes):
+    inicio = time.perf_counter()
+    at = _executar_app()
+    primeira = time.perf_counter() - inicio
+    reexecucoes = _cronometrar(lambda: at.run(), repeticoes)
+    return {'primeira_execucao_s': primeira, 'reexecucao': _resumo(reexecucoes)}
+
+
+def _esperar(processos, sinal):
+    for processo in processos:
+        linha = processo.stdout.readline().strip()
+        if linha != sinal:
+            raise RuntimeError(f"Sessão concorrente falhou (esperava {sinal!r}, recebeu {linha!r})")
+
+
+def _liberar(processos):
+    for processo in processos:
+        processo.stdin.write('\n')
+        processo.stdin.flush()
+
+
+def medir_sessoes_concorrentes(sessoes, reexecucoes):
+    # Cada processo herda o ambiente (VIAGEM_PLANILHA) e a pasta atual deste; o snapshot da planilha já está gravado
+    codigo = _SESSAO_CONCORRENTE.format(raiz=RAIZ, app=APP, limite=TEMPO_LIMITE_APP, reexecucoes=reexecucoes)
+    processos = [subprocess.Popen([sys.executable, '-c', codigo], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(sessoes)]
+    try:
+        _esperar(processos, 'pronta')
+        inicio = time.perf_counter()
+        _liberar(processos)
+        _esperar(processos, 'medida')
+        duracao = time.perf_counter() - inicio
+        _liberar(processos)
+        medidas = [json.loads(processo.stdout.readline()) for processo in processos]
+    finally:
+        for processo in processos:
+            processo.stdin.close()
+            processo.wait(TEMPO_LIMITE_APP)
+
+    latencias = [latencia for medida in medidas for latencia in medida['latencias']]
+    return {
+        'sessoes': sessoes,
+        'execucoes': len(latencias),
+        'duracao_s': duracao,
+        'execucoes_por_s': len(latencias) / duracao,
+        'latencia': _resumo_latencias(latencias),
+        'bytes_por_sessao': sum(medida['bytes_sessao'] for medida in medidas) // sessoes,
+        'pico_bytes_por_sessao': max(medida['pico_bytes'] for medida in medidas),
+        'rss_pico_por_processo_bytes': max(medida['rss_pico_bytes'] for medida in medidas),
+        'rss_pico_total_bytes': sum(medida['rss_pico_bytes'] for medida in medidas),
+    }
+
+
+def medir_tamanho(linhas, pasta, repeticoes, sessoes):
+    caminho = os.path.join(pasta, f"Viagem_{linhas}.xlsx")
+    [geracao] = _cronometrar(lambda: gerar_planilha(caminho, linhas))
+    resultado = {'linhas': linhas, 'arquivo_bytes': os.path.getsize(caminho), 'geracao_s': geracao}
+    resultado.update(medir_carga(caminho, repeticoes))
+
+    os.environ['VIAGEM_PLANILHA'] = caminho
+    resultado['app'] = medir_app(repeticoes)
+    resultado['sessoes_concorrentes'] = medir_sessoes_concorrentes(sessoes, repeticoes)
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do planejador com planilhas sintéticas.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=TAMANHOS, help="Tamanhos das planilhas (linhas de hotéis, passagens e carros)")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--sessoes', type=int, default=3, help="Sessões executando ao mesmo tempo na medição de carga")
+    parser.add_argument('--pasta', help="Onde gravar as planilhas geradas (padrão: pasta temporária)")
+    parser.add_argument('-o', '--saida', default='relatorio_benchmarks.json')
+    args = parser.parse_args(argv)
+
+    relatorio = {
+        'gerado_em': datetime.datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'pandas': pd.__version__,
+            'streamlit': streamlit.__version__,
+        },
+        'resultados': [],
+    }
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta = args.pasta or temporaria
+        for linhas in args.linhas:
+            print(f"{linhas} linhas...", file=sys.stderr)
+            relatorio['resultados'].append(medir_tamanho(linhas, pasta, args.repeticoes, args.sessoes))
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(args.saida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Gera planilhas sintéticas no formato da Viagem.xlsx para os benchmarks.
+
+As abas e colunas são as mesmas da planilha real (Hotéis, Passagens,
+Atrações, Aluguel de Carro, Alimentação e Total), com os mesmos rodapés no
+final de cada aba, para que o app e o pacote planejador as leiam sem
+nenhuma adaptação. Os valores são gravados já calculados (sem fórmulas), como
+o pandas os leria de uma planilha salva pelo Excel.
+
+Uso:
+    python benchmarks/gerar_planilha.py 10000 -o /tmp/Viagem_10000.xlsx
+"""
+import argparse
+import datetime
+
+import numpy as np
+from openpyxl import Workbook
+
+COMPANHIAS = ['Gol', 'Azul', 'Latam']
+ROTAS = [('GIG', 'POA'), ('GRU', 'POA'), ('CNF', 'POA'), ('BSB', 'POA')]
+LOCADORAS = ['Movida', 'Localiza', 'Unidas']
+TIPOS_CARRO = ['Sedan Economico Manual', 'Sedan Intermediário Manual', 'Sedan Intermediário Automático', 'SUV Automático']
+
+# A seção de atrações não é paginada (um campo de quantidade por linha): por padrão a aba fica menor que as demais
+MAXIMO_ATRACOES = 100
+
+
+def _hoteis(ws, linhas, rng):
+    ws.append(['Nome do Hotel', 'Link do Booking', 'Distância do Centro (km)', 'Chegada', 'Partida', 'Tipo do Preço', 'Preço por Período (R$)', 'Hóspedes', 'Preço por Hóspede (R$)'])
+    precos = np.round(rng.uniform(800, 9000, linhas), 2)
+    hospedes = rng.integers(1, 6, linhas)
+    distancias = np.round(rng.uniform(0.1, 15, linhas), 1)
+    noites = rng.integers(3, 9, linhas)
+    chegada = datetime.datetime(2026, 7, 25)
+    for i in range(linhas):
+        ws.append([
+            f"Hotel Sintético {i}",
+            f"https://www.booking.com/hotel/br/sintetico-{i}.pt-br.html",
+            float(distancias[i]),
+            chegada,
+            chegada + datetime.timedelta(days=int(noites[i])),
+            'Computador' if i % 2 else 'Celular',
+            float(precos[i]),
+            int(hospedes[i]),
+            round(float(precos[i]) / int(hospedes[i]), 2),
+        ])
+    ws.append([None] * 9)
+    ws.append(["Hotel Sintético 0", None, float(distancias[0]), chegada, None, None, float(precos[0]), int(hospedes[0]), None])
+
+
+def _passagens(ws, linhas, rng):
+    ws.append(['Sentido', 'Companhia', 'Origem', 'Destino', 'Sentido + Companhia + Origem + Destino', 'Preço (R$)', 'Preço da Bagagem (R$)', 'Total (R$)', 'Passageiros', 'Valor Total (R$)'])
+    precos = np.round(rng.uniform(300, 2500, linhas), 2)
+    bagagens = rng.choice([0.0, 109.0, 135.0], linhas)
+    minutos = rng.integers(0, 24 * 60, linhas)
+    for i in range(linhas):
+        sentido = 'Ida' if i % 2 == 0 else 'Volta'
+        companhia = COMPANHIAS[(i // 2) % len(COMPANHIAS)]
+        origem, destino = ROTAS[(i // 2) % len(ROTAS)]
+        if sentido == 'Volta':
+            origem, destino = destino, origem
+        partida = int(minutos[i])
+        chegada = (partida + 120) % (24 * 60)
+        origem = f"{origem} - {partida // 60:02d}:{partida % 60:02d}"
+        destino = f"{destino} - {chegada // 60:02d}:{chegada % 60:02d}"
+        total = round(float(precos[i]) + float(bagagens[i]), 2)
+        ws.append([sentido, companhia, origem, destino, f"{sentido} | {companhia} | {origem} → {destino}", float(precos[i]), float(bagagens[i]), total, 2, round(total * 2, 2)])
+    # Rodapé: linha em branco, ida e volta escolhidas, linha em branco e o total combinado (5 linhas)
+    ws.append([None] * 10)
+    ws.append([None, None, None, None, "Ida | Sintética", 0.0, 0.0, 0.0, 2, 0.0])
+    ws.append([None, None, None, None, "Volta | Sintética", 0.0, 0.0, 0.0, 2, 0.0])
+    ws.append([None] * 10)
+    ws.append([None, None, None, None, "Ida | Sintética\nVolta | Sintética", 0.0, 0.0, 0.0, 4, 0.0])
+
+
+def _atracoes(ws, linhas, rng):
+    ws.append(['Atrações', 'Valor (R$)', 'Quantidade', 'Valor Total (R$)'])
+    valores = np.round(rng.uniform(20, 600, linhas), 2)
+    quantidades = rng.integers(0, 3, linhas)
+    total = 0.0
+    for i in range(linhas):
+        subtotal = round(float(valores[i]) * int(quantidades[i]), 2)
+        total += subtotal
+        ws.append([f"Atração Sintética {i} ({'Adulto' if i % 2 == 0 else 'Criança'})", float(valores[i]), int(quantidades[i]), subtotal])
+    ws.append([None] * 4)
+    ws.append(['Total Atrações', None, None, round(total, 2)])
+
+
+def _aluguel_carro(ws, linhas, rng):
+    ws.append(['Tipo do Carro', 'Locadora', 'Preço por Dia (R$)', 'Dias', 'Passageiros', 'Preço por Período (R$)', 'Preço por Passageiro (R$)'])
+    precos_dia = np.round(rng.uniform(50, 300, linhas), 2)
+    dias = rng.integers(3, 10, linhas)
+    passageiros = rng.integers(2, 8, linhas)
+    for i in range(linhas):
+        periodo = round(float(precos_dia[i]) * int(dias[i]), 2)
+        # Tipo com sufixo numérico: a chave (Tipo do Carro, Locadora) precisa ser única
+        tipo = f"{TIPOS_CARRO[i % len(TIPOS_CARRO)]} {i}"
+        ws.append([tipo, LOCADORAS[i % len(LOCADORAS)], float(precos_dia[i]), int(dias[i]), int(passageiros[i]), periodo, round(periodo / int(passageiros[i]), 3)])
+    ws.append([None] * 7)
+    ws.append([f"{TIPOS_CARRO[0]} 0", LOCADORAS[0], float(precos_dia[0]), int(dias[0]), int(passageiros[0]), None, None])
+
+
+def _alimentacao(ws):
+    ws.append(['Alimentação', 'Refeição', 'Valor (R$)', 'Quantidade', 'Valor Total (R$)'])
+    ws.append(['Restaurante Sintético', 'Jantar', 100.0, 1, 100.0])
+    ws.append([None] * 5)
+    ws.append(['Total Alimentação', None, None, None, 100.0])
+
+
+def _total(ws):
+    ws.append(['Descrição', 'Valor Total (R$)'])
+    for descricao in ['Hotel', 'Passagens', 'Atrações', 'Aluguel de Carro']:
+        ws.append([descricao, 0.0])
+    ws.append([None, None])
+    ws.append(['Custo Total da Viagem', 0.0])
+
+
+def gerar_planilha(caminho, linhas, linhas_atracoes=None, semente=0):
+    # linhas vale para hotéis, passagens e carros; atrações usa no máximo MAXIMO_ATRACOES por padrão
+    if linhas_atracoes is None:
+        linhas_atracoes = min(linhas, MAXIMO_ATRACOES)
+    rng = np.random.default_rng(semente)
+    # write_only grava as linhas em streaming, sem manter a planilha inteira em memória
+    wb = Workbook(write_only=True)
+    _hoteis(wb.create_sheet('Hotéis'), linhas, rng)
+    _passagens(wb.create_sheet('Passagens'), linhas, rng)
+    _atracoes(wb.create_sheet('Atrações'), linhas_atracoes, rng)
+    _alimentacao(wb.create_sheet('Alimentação'))
+    _aluguel_carro(wb.create_sheet('Aluguel de Carro'), linhas, rng)
+    _total(wb.create_sheet('Total'))
+    wb.save(caminho)
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera uma planilha sintética no formato da Viagem.xlsx.")
+    parser.add_argument('linhas', type=int, help="Linhas de hotéis, passagens e carros")
+    parser.add_argument('-o', '--saida', default='Viagem_sintetica.xlsx')
+    parser.add_argument('--atracoes', type=int, help=f"Linhas de atrações (padrão: mínimo entre linhas e {MAXIMO_ATRACOES})")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+    print(gerar_planilha(args.saida, args.linhas, args.atracoes, args.semente))
+
+
+if __name__ == '__main__':
+    main()
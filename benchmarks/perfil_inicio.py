@@ -0,0 +1,142 @@
+"""Perfil de inicialização do app: importações e tempo até a primeira pintura.
+
+Cada medição roda em um processo Python novo (como um worker recém-iniciado):
+- importações: tempo de `import streamlit` e dos módulos do planejador que o
+  app importa, mais os módulos com maior tempo próprio segundo
+  `python -X importtime`;
+- primeira pintura: do início do processo até o fim da primeira execução
+  completa do app pelo AppTest (o AppTest não desenha no navegador; é o
+  momento em que todos os elementos da primeira tela foram enviados), com o
+  snapshot da planilha já gravado e com o cache vazio.
+
+Uso:
+    python benchmarks/perfil_inicio.py --repeticoes 5 -o perfil_inicio.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, 'app_orcamento.py')
+
+# Módulos do planejador importados pelo app, na ordem do app
+MODULOS_APP = [
+    'planejador.metricas', 'planejador.apresentacao', 'planejador.cambio', 'planejador.catalogo', 'planejador.dados', 'planejador.exportacao',
+    'planejador.cenarios', 'planejador.estilos', 'planejador.formatacao', 'planejador.historico', 'planejador.motor',
+    'planejador.otimizador', 'planejador.paginacao', 'planejador.planos', 'planejador.snapshot', 'planejador.viagens',
+]
+
+_IMPORTACOES = """
+import importlib, json, sys, time
+sys.path.insert(0, {raiz!r})
+tempos = {{}}
+inicio = time.perf_counter()
+import streamlit
+tempos['streamlit'] = time.perf_counter() - inicio
+meio = time.perf_counter()
+for modulo in {modulos!r}:
+    importlib.import_module(modulo)
+tempos['planejador'] = time.perf_counter() - meio
+tempos['total'] = time.perf_counter() - inicio
+tempos['openpyxl_carregado'] = 'openpyxl' in sys.modules
+print(json.dumps(tempos))
+"""
+
+_PRIMEIRA_PINTURA = """
+import json, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+importado = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=600).run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+fim = time.perf_counter()
+print(json.dumps({{'importacao_s': importado - inicio, 'primeira_execucao_s': fim - importado, 'total_s': fim - inicio}}))
+"""
+
+
+def _resumo(tempos):
+    return {'mediana_s': statistics.median(tempos), 'min_s': min(tempos), 'max_s': max(tempos), 'repeticoes': len(tempos)}
+
+
+def _processo(codigo, ambiente=None, pasta=RAIZ, argumentos=()):
+    # Roda o código em um interpretador novo; devolve (JSON da última linha da saída, stderr, tempo de relógio do processo)
+    inicio = time.perf_counter()
+    resultado = subprocess.run([sys.executable, *argumentos, '-c', codigo], cwd=pasta, env=ambiente, capture_output=True, text=True, check=True)
+    relogio = time.perf_counter() - inicio
+    return json.loads(resultado.stdout.strip().splitlines()[-1]), resultado.stderr, relogio
+
+
+def medir_importacoes(repeticoes):
+    codigo = _IMPORTACOES.format(raiz=RAIZ, modulos=MODULOS_APP)
+    medidas = [_processo(codigo)[0] for _ in range(repeticoes)]
+    return {
+        **{nome: _resumo([medida[nome] for medida in medidas]) for nome in ('streamlit', 'planejador', 'total')},
+        'openpyxl_carregado': medidas[-1]['openpyxl_carregado'],
+    }
+
+
+def maiores_importacoes(quantidade):
+    # Módulos com maior tempo próprio (µs) em uma importação fria dos módulos do app
+    _, erros, _ = _processo(_IMPORTACOES.format(raiz=RAIZ, modulos=MODULOS_APP), argumentos=('-X', 'importtime'))
+    tempos = []
+    for linha in erros.splitlines():
+        if linha.startswith('import time:') and '|' in linha and 'self' not in linha:
+            proprio, acumulado, modulo = linha[len('import time:'):].split('|')
+            tempos.append({'modulo': modulo.strip(), 'proprio_us': int(proprio), 'acumulado_us': int(acumulado)})
+    return sorted(tempos, key=lambda tempo: tempo['proprio_us'], reverse=True)[:quantidade]
+
+
+def medir_primeira_pintura(planilha, repeticoes):
+    # Planilha copiada para uma pasta temporária: o cache do snapshot e o banco de planos ficam fora do projeto
+    codigo = _PRIMEIRA_PINTURA.format(raiz=RAIZ, app=APP)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        copia = os.path.join(pasta, os.path.basename(planilha))
+        shutil.copy2(planilha, copia)
+        ambiente = dict(os.environ, VIAGEM_PLANILHA=copia, VIAGEM_PLANOS=os.path.join(pasta, 'planos.sqlite'))
+        for cenario in ('cache_vazio', 'snapshot_gravado'):
+            medidas = []
+            for _ in range(repeticoes):
+                if cenario == 'cache_vazio':
+                    shutil.rmtree(os.path.join(pasta, '.cache_viagem'), ignore_errors=True)
+                    shutil.rmtree(os.path.join(pasta, '.historico_precos'), ignore_errors=True)
+                medida, _, relogio = _processo(codigo, ambiente, pasta)
+                medidas.append({**medida, 'processo_s': relogio})
+            resultados[cenario] = {nome: _resumo([medida[nome] for medida in medidas]) for nome in ('processo_s', 'importacao_s', 'primeira_execucao_s')}
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil de inicialização do app (importações e primeira pintura).")
+    parser.add_argument('--planilha', default=os.path.join(RAIZ, 'Viagem.xlsx'))
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--maiores', type=int, default=15, help="Quantos módulos listar no perfil de -X importtime")
+    parser.add_argument('-o', '--saida', default='perfil_inicio.json')
+    args = parser.parse_args(argv)
+
+    import streamlit
+
+    relatorio = {
+        'gerado_em': datetime.datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(), 'streamlit': streamlit.__version__},
+        'importacoes': medir_importacoes(args.repeticoes),
+        'maiores_importacoes': maiores_importacoes(args.maiores),
+        'primeira_pintura': medir_primeira_pintura(args.planilha, args.repeticoes),
+    }
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(args.saida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Núcleo do planejador de orçamento de viagem (independente da interface Streamlit)."""
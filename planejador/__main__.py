@@ -0,0 +1,3 @@
+from planejador.cli import main
+
+main()
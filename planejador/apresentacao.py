@@ -0,0 +1,114 @@
+"""Pré-processamento dos cartões exibidos pelo app.
+
+Todas as colunas de exibição (preços formatados, datas por extenso) são
+calculadas aqui, uma vez por versão dos dados (e por moeda de exibição) e de
+forma vetorizada; companhia e rota das passagens já vêm separadas da leitura
+da planilha. Os laços de renderização só leem tuplas prontas.
+
+Os valores numéricos dos cartões (usados nos subtotais) ficam sempre em
+reais; só os textos saem na moeda de exibição, com cada coluna de preço
+multiplicada uma vez pelo fator de câmbio.
+"""
+from collections import namedtuple
+
+from planejador.catalogo import CHAVE_PASSAGEM
+from planejador.formatacao import formatar_data_serie, formatar_moeda_serie
+from planejador.historico import selos
+from planejador.metricas import cronometrado
+
+CartaoHotel = namedtuple('CartaoHotel', [
+    'posicao', 'nome', 'link', 'preco_periodo', 'hospedes', 'preco_hospede',
+    'distancia', 'chegada', 'partida', 'tipo_preco', 'selos',
+])
+CartaoPassagem = namedtuple('CartaoPassagem', [
+    'posicao', 'id', 'chave', 'companhia', 'rota', 'preco', 'preco_bagagem', 'total', 'selos',
+])
+CartaoAtracao = namedtuple('CartaoAtracao', ['posicao', 'nome', 'valor', 'valor_formatado', 'quantidade'])
+CartaoCarro = namedtuple('CartaoCarro', [
+    'posicao', 'tipo', 'locadora', 'preco_periodo', 'preco_dia', 'dias',
+    'passageiros', 'preco_passageiro', 'selos',
+])
+# DataFrame de uma seção do catálogo e os cartões alinhados às suas linhas (mesma ordem)
+SecaoCatalogo = namedtuple('SecaoCatalogo', ['df', 'cartoes'])
+Exibicao = namedtuple('Exibicao', ['hoteis', 'passagens_ida', 'passagens_volta', 'atracoes', 'carros'])
+
+
+def _textos(serie):
+    # Textos do catálogo (string[pyarrow] ou category) como str do Python, com None onde está vazio
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _cartoes(tipo, indice, colunas):
+    return [tipo(*valores) for valores in zip(indice, *colunas)]
+
+
+def _precos(serie, moeda, fator):
+    # Coluna em reais como textos na moeda de exibição: uma multiplicação para a coluna inteira
+    return formatar_moeda_serie(serie * fator if fator != 1.0 else serie, moeda).tolist()
+
+
+def cartoes_hoteis(df, agregados, moeda='BRL', fator=1.0):
+    return _cartoes(CartaoHotel, df.index.tolist(), [
+        _textos(df['Nome do Hotel']),
+        _textos(df['Link do Booking']),
+        _precos(df['Preço por Período (R$)'], moeda, fator),
+        df['Hóspedes'].tolist(),
+        _precos(df['Preço por Hóspede (R$)'], moeda, fator),
+        df['Distância do Centro (km)'].map('{:.1f} km'.format).tolist(),
+        formatar_data_serie(df['Chegada']).tolist(),
+        formatar_data_serie(df['Partida']).tolist(),
+        _textos(df['Tipo do Preço']),
+        selos(agregados, 'hotel', df, moeda, fator),
+    ])
+
+
+def cartoes_passagens(df, agregados, moeda='BRL', fator=1.0):
+    # Companhia e rota já foram separadas da chave na leitura da planilha
+    return _cartoes(CartaoPassagem, df.index.tolist(), [
+        df['id_passagem'].tolist(),
+        _textos(df[CHAVE_PASSAGEM]),
+        _textos(df['companhia']),
+        _textos(df['rota']),
+        _precos(df['Preço (R$)'], moeda, fator),
+        _precos(df['Preço da Bagagem (R$)'], moeda, fator),
+        _precos(df['Total (R$)'], moeda, fator),
+        selos(agregados, 'passagem', df, moeda, fator),
+    ])
+
+
+def cartoes_atracoes(df, moeda='BRL', fator=1.0):
+    return _cartoes(CartaoAtracao, df.index.tolist(), [
+        _textos(df['Atrações']),
+        df['Valor (R$)'].tolist(),
+        _precos(df['Valor (R$)'], moeda, fator),
+        df['Quantidade'].tolist(),
+    ])
+
+
+def cartoes_carros(df, agregados, moeda='BRL', fator=1.0):
+    return _cartoes(CartaoCarro, df.index.tolist(), [
+        _textos(df['Tipo do Carro']),
+        _textos(df['Locadora']),
+        _precos(df['Preço por Período (R$)'], moeda, fator),
+        _precos(df['Preço por Dia (R$)'], moeda, fator),
+        df['Dias'].tolist(),
+        df['Passageiros'].tolist(),
+        _precos(df['Preço por Passageiro (R$)'], moeda, fator),
+        selos(agregados, 'carro', df, moeda, fator),
+    ])
+
+
+@cronometrado('preparar_exibicao')
+def preparar_exibicao(catalogo, agregados, moeda='BRL', fator=1.0):
+    # agregados: historico.ler_agregados da planilha, para os selos de variação e menor preço
+    # moeda e fator: moeda de exibição dos textos e o multiplicador dos valores em reais (cambio.fator_exibicao)
+    # Partições de ida e volta já agrupadas no catálogo
+    df_ida = catalogo.passagens.iloc[catalogo.posicoes_passagens('Ida')]
+    df_volta = catalogo.passagens.iloc[catalogo.posicoes_passagens('Volta')]
+    return Exibicao(
+        hoteis=SecaoCatalogo(catalogo.hoteis, cartoes_hoteis(catalogo.hoteis, agregados, moeda, fator)),
+        passagens_ida=SecaoCatalogo(df_ida, cartoes_passagens(df_ida, agregados, moeda, fator)),
+        passagens_volta=SecaoCatalogo(df_volta, cartoes_passagens(df_volta, agregados, moeda, fator)),
+        atracoes=cartoes_atracoes(catalogo.atracoes, moeda, fator),
+        carros=SecaoCatalogo(catalogo.aluguel_carro, cartoes_carros(catalogo.aluguel_carro, agregados, moeda, fator)),
+    )
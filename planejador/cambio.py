@@ -0,0 +1,119 @@
+"""Câmbio: preços em outras moedas convertidos para reais na carga.
+
+Cada aba pode ter a coluna opcional "Moeda" (código ISO por linha: BRL, USD,
+EUR...; sem a coluna ou com a célula vazia, reais). Na montagem do catálogo,
+cada coluna de preço é multiplicada de uma vez pela cotação da moeda de cada
+linha, então motor, otimizador, cenários e cartões só trabalham em reais.
+Linhas numa moeda sem cotação ficam sem preço (NaN): não entram nas
+sugestões nem nos totais, e cada uma vira um Problema.
+
+As cotações vêm de um arquivo JSON local (cambio.json, ou VIAGEM_CAMBIO):
+
+    {"versao": "2026-10-18", "taxas": {"USD": 5.42, "EUR": 5.87}}
+
+em que cada taxa é o valor de uma unidade da moeda em reais. O arquivo só é
+relido quando muda (data de modificação e tamanho), e a chave do conteúdo
+entra na chave de cache do catálogo: cotações novas nunca se misturam com um
+catálogo montado com as antigas.
+
+Exibir em outra moeda é só multiplicar os valores em reais por um fator
+(fator_exibicao), sem reler a planilha nem remontar o catálogo.
+"""
+import functools
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from planejador.dados import ABAS, ESQUEMAS, MAXIMO_PROBLEMAS_POR_ABA, MOEDA, Problema
+
+ARQUIVO_CAMBIO = os.environ.get('VIAGEM_CAMBIO', 'cambio.json')
+
+MOEDA_BASE = 'BRL'
+
+# Cotação (reais por unidade da moeda da linha), guardada no catálogo ao lado dos preços convertidos
+COLUNA_COTACAO = 'cotacao'
+
+# versao: a declarada no arquivo; chave: hash do conteúdo (entra nas chaves de cache); taxas: moeda -> reais por unidade
+Cambio = namedtuple('Cambio', ['versao', 'chave', 'taxas'])
+
+# Sem arquivo de câmbio: tudo em reais
+CAMBIO_PADRAO = Cambio(None, MOEDA_BASE, {MOEDA_BASE: 1.0})
+
+# Colunas de preço de cada aba (as "(R$)" do esquema)
+COLUNAS_PRECO = {
+    chave: [coluna.nome for coluna in esquema if coluna.tipo == 'dinheiro' and coluna.nome.endswith('(R$)')]
+    for chave, esquema in ESQUEMAS.items()
+}
+
+
+def carregar_cambio(caminho=ARQUIVO_CAMBIO):
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return CAMBIO_PADRAO
+    return _ler_cambio(caminho, estado.st_mtime_ns, estado.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _ler_cambio(caminho, mtime_ns, tamanho):
+    # Uma leitura por versão do arquivo (data de modificação e tamanho fazem parte da chave do cache)
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    dados = json.loads(conteudo)
+    if not isinstance(dados, dict) or not isinstance(dados.get('taxas', {}), dict):
+        raise ValueError(f"{caminho}: esperado um objeto com 'versao' e 'taxas' (moeda -> valor em reais)")
+    taxas = {MOEDA_BASE: 1.0}
+    for moeda, taxa in dados.get('taxas', {}).items():
+        try:
+            taxa = float(taxa)
+        except (TypeError, ValueError):
+            raise ValueError(f"{caminho}: a taxa de {moeda} deve ser um número positivo") from None
+        if not taxa > 0:
+            raise ValueError(f"{caminho}: a taxa de {moeda} deve ser um número positivo")
+        taxas[moeda.strip().upper()] = taxa
+    taxas[MOEDA_BASE] = 1.0
+    return Cambio(dados.get('versao'), hashlib.sha1(conteudo).hexdigest()[:16], taxas)
+
+
+def moedas(cambio):
+    # Moedas disponíveis para exibição: reais primeiro, depois as do arquivo em ordem alfabética
+    return [MOEDA_BASE] + sorted(moeda for moeda in cambio.taxas if moeda != MOEDA_BASE)
+
+
+def fator_exibicao(cambio, moeda):
+    # Multiplicador dos valores em reais para a moeda de exibição
+    return 1.0 / cambio.taxas[moeda]
+
+
+def converter_para_reais(df, chave, cambio):
+    # Devolve (DataFrame com as colunas de preço em reais e a coluna de cotação, Problemas das linhas sem cotação).
+    # A cotação de cada linha sai das categorias da coluna Moeda: uma busca por moeda distinta, não por linha.
+    # Aba toda em reais (o caso comum): o DataFrame volta como veio, sem cópia nem coluna de cotação
+    if MOEDA.nome not in df.columns:
+        return df, []
+    moedas_linhas = df[MOEDA.nome]
+    categorias = [str(moeda).strip().upper() for moeda in moedas_linhas.cat.categories]
+    # Código -1 (célula sem moeda) usa a última posição: reais
+    taxas = np.array([cambio.taxas.get(moeda, np.nan) for moeda in categorias] + [1.0])
+    if (taxas == 1.0).all():
+        return df, []
+    cotacao = taxas[moedas_linhas.cat.codes.to_numpy()]
+
+    # Sem cotação, a cotação é NaN e os preços da linha também: a linha fica sem preço, não de graça
+    df = df.copy(deep=False)
+    df[COLUNA_COTACAO] = cotacao
+    for coluna in COLUNAS_PRECO[chave]:
+        df[coluna] = df[coluna].to_numpy() * cotacao
+    sem_cotacao = np.isnan(cotacao)
+    # Linha no Excel: os dados começam na linha 2 e não têm buracos (a primeira linha em branco encerra a leitura)
+    linhas = np.flatnonzero(sem_cotacao)
+    problemas = [
+        Problema(ABAS[chave], int(linha) + 2, MOEDA.nome, str(moedas_linhas.iat[linha]), "moeda sem cotação no arquivo de câmbio; linha sem preço, fora das sugestões e dos totais")
+        for linha in linhas[:MAXIMO_PROBLEMAS_POR_ABA]
+    ]
+    if len(linhas) > MAXIMO_PROBLEMAS_POR_ABA:
+        problemas.append(Problema(ABAS[chave], None, MOEDA.nome, None, f"mais {len(linhas) - MAXIMO_PROBLEMAS_POR_ABA} linhas sem cotação não listadas"))
+    return df, problemas
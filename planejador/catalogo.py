@@ -0,0 +1,126 @@
+"""Catálogo da viagem: os DataFrames limpos mais os índices de busca das seleções."""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from planejador.cambio import CAMBIO_PADRAO, converter_para_reais
+from planejador.dados import ABAS, Problema
+
+# Colunas que identificam cada item selecionável
+CHAVE_HOTEL = 'Nome do Hotel'
+CHAVE_PASSAGEM = 'Sentido + Companhia + Origem + Destino'
+CHAVE_CARRO = ['Tipo do Carro', 'Locadora']
+
+
+@dataclass(frozen=True)
+class Catalogo:
+    hoteis: pd.DataFrame
+    aluguel_carro: pd.DataFrame
+    atracoes: pd.DataFrame
+    passagens: pd.DataFrame
+    # Índices chave -> posição da linha (primeira ocorrência, como o antigo .iloc[0] da máscara)
+    indice_hoteis: dict
+    indice_passagens: dict
+    indice_carros: dict
+    # id compacto da passagem (dados.id_passagem) -> posição; é o que o app guarda como seleção
+    indice_ids_passagens: dict
+    # Partições das passagens (posições em ordem crescente): sentido; (sentido, companhia); (sentido, origem, destino)
+    passagens_por_sentido: dict
+    passagens_por_companhia: dict
+    passagens_por_rota: dict
+    # Células inválidas encontradas na leitura da planilha (dados.Problema), para avisar quem usa o catálogo
+    problemas: tuple = ()
+    # Câmbio (cambio.Cambio) usado para converter os preços em outras moedas para reais
+    cambio: object = None
+
+    def posicao_hotel(self, nome):
+        return self.indice_hoteis.get(nome)
+
+    def posicao_passagem(self, passagem):
+        # Aceita a chave completa (texto) ou o id compacto (inteiro)
+        if isinstance(passagem, (int, np.integer)):
+            return self.indice_ids_passagens.get(int(passagem))
+        return self.indice_passagens.get(passagem)
+
+    def posicoes_passagens(self, sentido, companhia=None, origem=None, destino=None):
+        # Posições das passagens de um sentido, opcionalmente de uma companhia e/ou rota (origem e destino)
+        if origem is not None or destino is not None:
+            posicoes = self.passagens_por_rota.get((sentido, origem, destino), _VAZIO)
+            if companhia is not None:
+                posicoes = np.intersect1d(posicoes, self.passagens_por_companhia.get((sentido, companhia), _VAZIO), assume_unique=True)
+            return posicoes
+        if companhia is not None:
+            return self.passagens_por_companhia.get((sentido, companhia), _VAZIO)
+        return self.passagens_por_sentido.get(sentido, _VAZIO)
+
+    def posicao_carro(self, carro_type_locadora):
+        return self.indice_carros.get(tuple(carro_type_locadora))
+
+
+_VAZIO = np.empty(0, dtype=np.int64)
+
+
+def indice_por_chave(df, colunas):
+    # Mapeia cada chave para a posição da sua primeira ocorrência; linhas com chave vazia ficam de fora
+    chaves = df[colunas]
+    validas = chaves.notna().all(axis=1) if isinstance(colunas, list) else chaves.notna()
+    chaves = chaves[validas.to_numpy()]
+    posicoes = pd.RangeIndex(len(df))[validas.to_numpy()]
+    primeiras = ~chaves.duplicated(keep='first').to_numpy()
+    if isinstance(colunas, list):
+        valores = zip(*(chaves[coluna].to_numpy()[primeiras] for coluna in colunas))
+    else:
+        valores = chaves.to_numpy()[primeiras]
+    return dict(zip(valores, posicoes[primeiras].tolist()))
+
+
+def indice_ids(df, indice, coluna, aba):
+    # id -> posição das linhas já indexadas por chave (mesmas primeiras ocorrências, na mesma ordem).
+    # Duas chaves com o mesmo id ficam com a primeira e a segunda vira um Problema, em vez de apontar para a linha errada.
+    # Devolve (índice, [Problema, ...])
+    ids = df[coluna].to_numpy()
+    resultado = {}
+    problemas = []
+    for chave, posicao in indice.items():
+        primeira = resultado.setdefault(int(ids[posicao]), posicao)
+        if primeira != posicao:
+            problemas.append(Problema(aba, posicao + 2, coluna, str(chave), f"mesmo id da linha {primeira + 2}; passagem não selecionável"))
+    return resultado, problemas
+
+
+def particoes(df, colunas):
+    # Valor (ou tupla de valores) -> posições das linhas, agrupadas uma vez; linhas com algum valor vazio ficam de fora
+    return df.groupby(colunas, observed=True, sort=False).indices
+
+
+def montar_catalogo(df_hoteis, df_aluguel_carro, df_atracoes, df_passagens, problemas=(), cambio=None):
+    # Monta os índices uma única vez por versão dos dados; as seleções passam a ser buscas O(1).
+    # Os preços em outras moedas são convertidos para reais aqui, coluna a coluna (sem cambio: CAMBIO_PADRAO)
+    cambio = CAMBIO_PADRAO if cambio is None else cambio
+    problemas = list(problemas)
+    convertidos = []
+    for chave, df in zip(ABAS, (df_hoteis, df_aluguel_carro, df_atracoes, df_passagens)):
+        df, sem_cotacao = converter_para_reais(df, chave, cambio)
+        convertidos.append(df)
+        problemas.extend(sem_cotacao)
+    df_hoteis, df_aluguel_carro, df_atracoes, df_passagens = convertidos
+
+    indice_passagens = indice_por_chave(df_passagens, CHAVE_PASSAGEM)
+    indice_ids_passagens, colisoes = indice_ids(df_passagens, indice_passagens, 'id_passagem', ABAS['passagens'])
+    problemas.extend(colisoes)
+    return Catalogo(
+        hoteis=df_hoteis,
+        aluguel_carro=df_aluguel_carro,
+        atracoes=df_atracoes,
+        passagens=df_passagens,
+        indice_hoteis=indice_por_chave(df_hoteis, CHAVE_HOTEL),
+        indice_passagens=indice_passagens,
+        indice_carros=indice_por_chave(df_aluguel_carro, CHAVE_CARRO),
+        indice_ids_passagens=indice_ids_passagens,
+        passagens_por_sentido=particoes(df_passagens, 'sentido'),
+        passagens_por_companhia=particoes(df_passagens, ['sentido', 'companhia']),
+        passagens_por_rota=particoes(df_passagens, ['sentido', 'origem', 'destino']),
+        problemas=tuple(problemas),
+        cambio=cambio,
+    )
@@ -0,0 +1,103 @@
+"""Simulações "e se...?": grades de cenários calculadas de uma vez com NumPy.
+
+Cada função monta todas as combinações de uma grade (quantidades de
+atrações, número de viajantes, dias de carro, pares hotel × voo) como
+matrizes e calcula os totais com broadcasting e produto matricial, em vez
+de uma reexecução do app por cenário.
+"""
+import numpy as np
+import pandas as pd
+
+from planejador.catalogo import CHAVE_HOTEL, CHAVE_PASSAGEM
+from planejador.otimizador import melhores_pares_voos
+
+# Limite de combinações de uma grade de atrações (evita montar matrizes gigantes por engano)
+MAXIMO_COMBINACOES = 1_000_000
+
+# Linhas (hotéis) e colunas (pares de voos) da grade hotel × voo: os mais baratos de cada lado
+MAXIMO_HOTEIS_GRADE = 30
+MAXIMO_VOOS_GRADE = 30
+MAXIMO_CARROS_GRADE = 30
+
+
+def grade_quantidades(valores, maximos):
+    # Todas as combinações de quantidades 0..maximo de cada atração.
+    # Devolve (matriz combinações x atrações, custo de cada combinação)
+    formato = tuple(int(maximo) + 1 for maximo in maximos)
+    if int(np.prod(formato, dtype=np.int64)) > MAXIMO_COMBINACOES:
+        raise ValueError(f"A grade teria mais de {MAXIMO_COMBINACOES} combinações; reduza as quantidades máximas.")
+    quantidades = np.indices(formato).reshape(len(formato), -1).T
+    # Atrações sem preço (NaN: moeda sem cotação) ficam fora do custo
+    return quantidades, quantidades @ np.nan_to_num(np.asarray(valores, dtype=float))
+
+
+def cenarios_atracoes(nomes, valores, maximos, custo_fixo):
+    # Total da viagem para cada combinação de quantidades das atrações escolhidas
+    quantidades, custos = grade_quantidades(valores, maximos)
+    df = pd.DataFrame(quantidades, columns=list(nomes))
+    df['Atrações escolhidas (R$)'] = custos
+    df['Total (R$)'] = custo_fixo + custos
+    return df
+
+
+def cenarios_viajantes(viajantes, preco_hospede, preco_passagens, preco_carro, capacidade_carro, custo_atracoes):
+    # Custo da viagem por número de viajantes, usando os preços por pessoa:
+    # hotel = Preço por Hóspede x viajantes; passagens (ida + volta) = Total por passageiro x viajantes;
+    # carro = Preço por Período x carros necessários (capacidade em Passageiros); atrações = quantidades atuais
+    viajantes = np.asarray(viajantes, dtype=np.int64)
+    hotel = preco_hospede * viajantes
+    passagens = preco_passagens * viajantes
+    carros = -(-viajantes // max(int(capacidade_carro), 1)) if preco_carro else np.zeros(len(viajantes), dtype=np.int64)
+    carro = preco_carro * carros
+    total = hotel + passagens + carro + custo_atracoes
+    return pd.DataFrame({
+        'Viajantes': viajantes,
+        'Hotel (R$)': hotel,
+        'Passagens (R$)': passagens,
+        'Carros': carros,
+        'Carro (R$)': carro,
+        'Atrações (R$)': float(custo_atracoes),
+        'Total (R$)': total,
+        'Por pessoa (R$)': total / viajantes,
+    })
+
+
+def cenarios_dias_carro(df_carros, dias, custo_fixo=0.0, maximo_carros=MAXIMO_CARROS_GRADE):
+    # Total da viagem (custo fixo + Preço por Dia x dias) para cada carro e cada quantidade de dias (carros mais baratos por dia)
+    dias = np.asarray(dias, dtype=np.int64)
+    precos_dia = df_carros['Preço por Dia (R$)'].to_numpy(dtype=float)
+    validos = np.flatnonzero(~np.isnan(precos_dia))
+    carros = validos[np.argsort(precos_dia[validos], kind='stable')[:maximo_carros]]
+    totais = custo_fixo + precos_dia[carros][:, None] * dias[None, :]
+    rotulos = (df_carros['Tipo do Carro'].astype(str) + ' (' + df_carros['Locadora'].astype(str) + ')').to_numpy()[carros]
+    return pd.DataFrame(totais, index=_unicos(rotulos), columns=[f"{d} dias" for d in dias])
+
+
+def cenarios_hoteis_voos(catalogo, custo_fixo=0.0, maximo_hoteis=MAXIMO_HOTEIS_GRADE, maximo_voos=MAXIMO_VOOS_GRADE):
+    # Total da viagem para cada hotel x par de voos (ida e volta na mesma rota), entre os mais baratos de cada lado
+    precos_hoteis = catalogo.hoteis['Preço por Período (R$)'].to_numpy(dtype=float)
+    validos = np.flatnonzero(catalogo.hoteis[CHAVE_HOTEL].notna().to_numpy() & ~np.isnan(precos_hoteis))
+    hoteis = validos[np.argsort(precos_hoteis[validos], kind='stable')[:maximo_hoteis]]
+    custos_voos, idas, voltas = melhores_pares_voos(catalogo, maximo_voos)
+
+    totais = custo_fixo + precos_hoteis[hoteis][:, None] + custos_voos[None, :]
+    resumos = _resumos_passagens(catalogo.passagens)
+    colunas = [f"{resumos[i]} / {resumos[v]}" for i, v in zip(idas, voltas)]
+    return pd.DataFrame(totais, index=_unicos(catalogo.hoteis[CHAVE_HOTEL].to_numpy()[hoteis]), columns=_unicos(colunas))
+
+
+def _unicos(rotulos):
+    # Rótulos repetidos ganham um sufixo (#2, #3...): a tabela formatada exige linhas e colunas únicas
+    vistos = {}
+    unicos = []
+    for rotulo in map(str, rotulos):
+        vistos[rotulo] = vistos.get(rotulo, 0) + 1
+        unicos.append(rotulo if vistos[rotulo] == 1 else f"{rotulo} #{vistos[rotulo]}")
+    return unicos
+
+
+def _resumos_passagens(df_passagens):
+    # Companhia e horário de partida, das colunas separadas na leitura: "Gol 06:00"; sem companhia, a chave inteira
+    horarios = df_passagens['rota'].str.split(' → ').str[0].str.split(' - ').str[-1]
+    resumos = df_passagens['companhia'].astype(object) + ' ' + horarios.astype(object)
+    return resumos.where(df_passagens['companhia'].notna() & horarios.notna(), df_passagens[CHAVE_PASSAGEM].astype(str)).to_numpy()
@@ -0,0 +1,103 @@
+"""Linha de comando do planejador: orçamentos em lote e servidor HTTP.
+
+Exemplos:
+    python -m planejador orcar cenarios.jsonl -o orcamentos.csv
+    python -m planejador servir --porta 8000
+    python -m planejador planos -o planos.csv
+"""
+import argparse
+import logging
+import os
+import sys
+
+import pandas as pd
+
+from planejador.motor import calcular_lote, carregar_catalogo
+
+# Cenários processados por vez: mantém a memória limitada em arquivos grandes
+TAMANHO_LOTE = 50_000
+
+
+def _formato(caminho, formato):
+    if formato:
+        return formato
+    return 'csv' if caminho and caminho.lower().endswith('.csv') else 'jsonl'
+
+
+def ler_cenarios(caminho, formato=None):
+    # Lê os cenários em blocos de TAMANHO_LOTE linhas (CSV ou JSON Lines; '-' = entrada padrão)
+    origem = sys.stdin if caminho == '-' else caminho
+    if _formato(caminho, formato) == 'csv':
+        yield from pd.read_csv(origem, chunksize=TAMANHO_LOTE, dtype=str, keep_default_na=False, na_values=[''])
+    else:
+        yield from pd.read_json(origem, lines=True, chunksize=TAMANHO_LOTE, dtype=False)
+
+
+def escrever_orcamentos(blocos, caminho, formato=None):
+    destino = sys.stdout if caminho in (None, '-') else open(caminho, 'w', encoding='utf-8', newline='')
+    try:
+        for numero, bloco in enumerate(blocos):
+            if _formato(caminho, formato) == 'csv':
+                bloco.to_csv(destino, index=False, header=(numero == 0))
+            else:
+                texto = bloco.to_json(orient='records', lines=True, force_ascii=False)
+                destino.write(texto if texto.endswith('\n') else texto + '\n')
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+
+
+def comando_orcar(args):
+    catalogo = carregar_catalogo(args.planilha)
+    blocos = (calcular_lote(catalogo, cenarios) for cenarios in ler_cenarios(args.cenarios, args.formato_entrada))
+    escrever_orcamentos(blocos, args.saida, args.formato_saida)
+
+
+def comando_planos(args):
+    # Planos salvos da viagem (id = nome da planilha sem extensão, como no app) com os totais calculados em lote
+    from planejador.planos import ArmazemPlanos, totais_planos
+    armazem = ArmazemPlanos(args.banco)
+    try:
+        planos = armazem.listar(os.path.splitext(os.path.basename(args.planilha))[0])
+    finally:
+        armazem.fechar()
+    totais = totais_planos(carregar_catalogo(args.planilha), planos)
+    saida = planos[['codigo', 'nome', 'criado_em']].join(totais.drop(columns='id'))
+    escrever_orcamentos([saida], args.saida, args.formato_saida)
+
+
+def comando_servir(args):
+    from planejador.servidor import servir
+    servir(args.planilha, args.host, args.porta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='planejador', description="Orçamentos da viagem sem a interface Streamlit.")
+    parser.add_argument('--planilha', default=os.environ.get('VIAGEM_PLANILHA', 'Viagem.xlsx'), help="Planilha com as abas da viagem (padrão: Viagem.xlsx)")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    orcar = subparsers.add_parser('orcar', help="Calcula o orçamento de cada cenário de um arquivo CSV ou JSON Lines")
+    orcar.add_argument('cenarios', help="Arquivo de cenários ('-' para a entrada padrão)")
+    orcar.add_argument('-o', '--saida', help="Arquivo de saída (padrão: saída padrão)")
+    orcar.add_argument('--formato-entrada', choices=['csv', 'jsonl'])
+    orcar.add_argument('--formato-saida', choices=['csv', 'jsonl'])
+    orcar.set_defaults(funcao=comando_orcar)
+
+    planos = subparsers.add_parser('planos', help="Lista os planos salvos pelo app com o orçamento de cada um")
+    planos.add_argument('--banco', default=os.environ.get('VIAGEM_PLANOS', 'planos.sqlite'), help="Banco SQLite dos planos (padrão: planos.sqlite)")
+    planos.add_argument('-o', '--saida', help="Arquivo de saída (padrão: saída padrão)")
+    planos.add_argument('--formato-saida', choices=['csv', 'jsonl'])
+    planos.set_defaults(funcao=comando_planos)
+
+    servir = subparsers.add_parser('servir', help="Sobe a API HTTP local de orçamentos")
+    servir.add_argument('--host', default='127.0.0.1')
+    servir.add_argument('--porta', type=int, default=8000)
+    servir.set_defaults(funcao=comando_servir)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    args.funcao(args)
+
+
+if __name__ == '__main__':
+    main()
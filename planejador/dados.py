@@ -0,0 +1,336 @@
+"""Leitura das abas da planilha de viagem em streaming, guiada por um esquema de colunas.
+
+Cada aba é percorrida linha a linha pelo openpyxl em modo read_only (sem
+montar a planilha inteira em memória) e cada célula vai direto para a
+coluna tipada do seu destino: arrays de float/int, datas em nanossegundos
+e listas de textos. O padrão das células vazias e o tipo de cada coluna vêm
+do esquema declarado em ESQUEMAS e são aplicados nessa mesma passada.
+
+O fim dos dados é reconhecido pelo conteúdo: a primeira linha em branco ou
+uma linha de resumo ("Total ..."), e não por um número fixo de linhas de
+rodapé. Os rodapés repetem itens já listados (o item escolhido, buscado com
+PROCV); uma linha depois desse ponto com um item novo é de dados perdidos
+(uma linha em branco esquecida no meio da aba) e vira um aviso. Células
+que não podem ser convertidas recebem o padrão da coluna e viram um
+Problema (aba, linha, coluna, valor, motivo) devolvido junto com os dados,
+para o app avisar em vez de interromper a carga.
+"""
+import datetime
+import hashlib
+import math
+import re
+from array import array
+from collections import namedtuple
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Abas usadas pelo planejador (chave interna -> nome da aba no Excel), na ordem devolvida ao app
+ABAS = {
+    'hoteis': 'Hotéis',
+    'aluguel_carro': 'Aluguel de Carro',
+    'atracoes': 'Atrações',
+    'passagens': 'Passagens',
+}
+
+# Tipos compactos do catálogo: textos de poucos valores distintos viram category (codificados por dicionário),
+# os demais textos ficam em buffers Arrow (string[pyarrow]) em vez de objetos Python, contagens em int32 e
+# medidas que não são dinheiro em float32. Valores em R$ continuam float64 para não perder centavos nas somas.
+TEXTO = 'string[pyarrow]'
+
+# Problemas guardados por aba; os demais só são contados (uma coluna inteira errada não deve gerar milhares de avisos)
+MAXIMO_PROBLEMAS_POR_ABA = 100
+
+
+@dataclass(frozen=True)
+class Coluna:
+    nome: str
+    # 'texto', 'categoria', 'dinheiro' (float64), 'medida' (float32), 'inteiro' (int32) ou 'data'
+    tipo: str
+    # Valor das células vazias ou inválidas; None deixa o valor ausente (NaN, NaT ou <NA>)
+    padrao: object = None
+    # Coluna que a planilha pode não ter: ausente, vale o padrão em todas as linhas, sem aviso
+    opcional: bool = False
+
+
+# Moeda dos preços da linha (código ISO: BRL, USD, EUR...); sem a coluna ou com a célula vazia, reais.
+# A conversão para reais é feita na montagem do catálogo (planejador.cambio)
+MOEDA = Coluna('Moeda', 'categoria', 'BRL', opcional=True)
+
+
+ESQUEMAS = {
+    'hoteis': [
+        Coluna('Nome do Hotel', 'texto'),
+        Coluna('Link do Booking', 'texto'),
+        Coluna('Distância do Centro (km)', 'medida', 0),
+        Coluna('Chegada', 'data'),
+        Coluna('Partida', 'data'),
+        Coluna('Tipo do Preço', 'categoria', ''),
+        Coluna('Preço por Período (R$)', 'dinheiro', 0),
+        Coluna('Hóspedes', 'inteiro', 1),
+        Coluna('Preço por Hóspede (R$)', 'dinheiro', 0),
+        MOEDA,
+    ],
+    'aluguel_carro': [
+        Coluna('Tipo do Carro', 'categoria'),
+        Coluna('Locadora', 'categoria'),
+        Coluna('Preço por Dia (R$)', 'dinheiro', 0),
+        Coluna('Dias', 'inteiro', 1),
+        Coluna('Passageiros', 'inteiro', 1),
+        Coluna('Preço por Período (R$)', 'dinheiro', 0),
+        Coluna('Preço por Passageiro (R$)', 'dinheiro', 0),
+        MOEDA,
+    ],
+    'atracoes': [
+        Coluna('Atrações', 'texto'),
+        Coluna('Valor (R$)', 'dinheiro', 0),
+        Coluna('Quantidade', 'inteiro', 0),
+        Coluna('Valor Total (R$)', 'dinheiro', 0),
+        MOEDA,
+    ],
+    'passagens': [
+        Coluna('Sentido', 'categoria'),
+        Coluna('Companhia', 'categoria'),
+        Coluna('Origem', 'texto'),
+        Coluna('Destino', 'texto'),
+        Coluna('Sentido + Companhia + Origem + Destino', 'texto'),
+        Coluna('Preço (R$)', 'dinheiro', 0),
+        Coluna('Preço da Bagagem (R$)', 'dinheiro', 0),
+        Coluna('Total (R$)', 'dinheiro', 0),
+        Coluna('Passageiros', 'inteiro', 1),
+        Coluna('Valor Total (R$)', 'dinheiro'),
+        MOEDA,
+    ],
+}
+
+# Coluna que identifica o item de cada aba, usada para separar os rodapés das linhas de dados perdidas
+COLUNAS_ITEM = {
+    'hoteis': 'Nome do Hotel',
+    'aluguel_carro': 'Tipo do Carro',
+    'atracoes': 'Atrações',
+    'passagens': 'Sentido + Companhia + Origem + Destino',
+}
+
+# linha: número da linha no Excel (1 = cabeçalho); None quando o problema é da aba ou da coluna inteira
+Problema = namedtuple('Problema', ['aba', 'linha', 'coluna', 'valor', 'motivo'])
+
+# Chave das passagens: "Ida | Companhia | GIG - 06:00 → POA - 08:00", separada uma única vez na leitura.
+# Uma chave só com o sentido reconhecível ainda entra na partição de ida ou volta (sem companhia e rota)
+PADRAO_CHAVE_PASSAGEM = re.compile(r'^\s*(?P<sentido>Ida|Volta)\b(?:\s*\|\s*(?P<companhia>[^|]*?)\s*\|\s*(?P<rota>.*?)\s*$)?')
+# Aeroportos (códigos IATA) de origem e destino dentro da rota
+PADRAO_ROTA = re.compile(r'^(?P<origem>[A-Z]{3})\b.*?→\s*(?P<destino>[A-Z]{3})\b')
+
+# Linhas de resumo no rodapé das abas ("Total Atrações", "Total (R$)", ...)
+_RESUMO = re.compile(r'total\b', re.IGNORECASE)
+
+_NAT = np.iinfo(np.int64).min
+_EPOCA = datetime.datetime(1970, 1, 1)
+_MICROSSEGUNDO = datetime.timedelta(microseconds=1)
+_FORMATOS_DATA = ('%d/%m/%Y', '%d/%m/%Y %H:%M', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S')
+
+# Tipo -> código do array onde a coluna é montada (texto e categoria usam listas)
+_ARRAYS = {'dinheiro': 'd', 'medida': 'f', 'inteiro': 'i', 'data': 'q'}
+
+
+def _vazia(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _numero(valor):
+    # Números do Excel passam direto; textos aceitam "R$ 1.234,56" e "1234.56"
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, str):
+        texto = valor.replace('R$', '').replace('\xa0', '').strip()
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+        try:
+            return float(texto)
+        except ValueError:
+            pass
+    raise ValueError("não é um número")
+
+
+def _inteiro(valor):
+    numero = _numero(valor)
+    if not math.isfinite(numero) or not numero.is_integer():
+        raise ValueError("não é um número inteiro")
+    return int(numero)
+
+
+def _data_ns(valor):
+    # Datas viram nanossegundos desde 1970, o formato interno de datetime64[ns]
+    if isinstance(valor, datetime.datetime):
+        data = valor.replace(tzinfo=None)
+    elif isinstance(valor, datetime.date):
+        data = datetime.datetime(valor.year, valor.month, valor.day)
+    elif isinstance(valor, str):
+        data = _data_texto(valor.strip())
+    else:
+        raise ValueError("não é uma data")
+    return (data - _EPOCA) // _MICROSSEGUNDO * 1000
+
+
+def _data_texto(texto):
+    for formato in _FORMATOS_DATA:
+        try:
+            return datetime.datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    raise ValueError("data em formato desconhecido")
+
+
+_CONVERSORES = {
+    'dinheiro': _numero,
+    'medida': _numero,
+    'inteiro': _inteiro,
+    'data': _data_ns,
+}
+
+
+def _padrao_armazenado(coluna):
+    # Padrão da coluna já no formato do array de destino
+    if coluna.tipo == 'data':
+        return _NAT if coluna.padrao is None else _data_ns(coluna.padrao)
+    if coluna.tipo in ('dinheiro', 'medida'):
+        return math.nan if coluna.padrao is None else float(coluna.padrao)
+    return coluna.padrao
+
+
+def _fim_dos_dados(linha):
+    # A primeira linha em branco ou de resumo encerra os dados; o que vem depois é rodapé
+    for valor in linha:
+        if not _vazia(valor):
+            return isinstance(valor, str) and _RESUMO.match(valor.strip()) is not None
+    return True
+
+
+def _serie(coluna, valores):
+    if coluna.tipo == 'texto':
+        return pd.array(valores, dtype=TEXTO)
+    if coluna.tipo == 'categoria':
+        return pd.Categorical(valores)
+    if coluna.tipo == 'data':
+        return np.frombuffer(valores, dtype=np.int64).view('datetime64[ns]')
+    return np.frombuffer(valores, dtype={'d': np.float64, 'f': np.float32, 'i': np.int32}[valores.typecode])
+
+
+def ler_aba(planilha, chave):
+    # Devolve (DataFrame tipado, lista de Problema) de uma aba de um workbook aberto em read_only
+    nome_aba = ABAS[chave]
+    esquema = ESQUEMAS[chave]
+    problemas = []
+    ignorados = 0
+
+    def registrar(linha, coluna, valor, motivo):
+        nonlocal ignorados
+        if len(problemas) < MAXIMO_PROBLEMAS_POR_ABA:
+            problemas.append(Problema(nome_aba, linha, coluna, None if valor is None else str(valor), motivo))
+        else:
+            ignorados += 1
+
+    colunas = {coluna.nome: array(_ARRAYS[coluna.tipo]) if coluna.tipo in _ARRAYS else [] for coluna in esquema}
+    if nome_aba not in planilha.sheetnames:
+        registrar(None, None, None, "aba não encontrada")
+        linhas = iter(())
+    else:
+        linhas = planilha[nome_aba].iter_rows(values_only=True)
+
+    cabecalho = next(linhas, ())
+    posicoes = {}
+    for posicao, titulo in enumerate(cabecalho):
+        if isinstance(titulo, str):
+            posicoes.setdefault(titulo.strip(), posicao)
+    for coluna in esquema:
+        if cabecalho and coluna.nome not in posicoes and not coluna.opcional:
+            registrar(1, coluna.nome, None, "coluna não encontrada; usando o valor padrão")
+
+    # (posição na linha, coluna, destino, conversor, padrão) de cada coluna do esquema, resolvidos uma vez
+    plano = [
+        (posicoes.get(coluna.nome), coluna, colunas[coluna.nome], _CONVERSORES.get(coluna.tipo), _padrao_armazenado(coluna))
+        for coluna in esquema
+    ]
+    fim = None
+    for numero_linha, linha in enumerate(linhas, start=2):
+        if _fim_dos_dados(linha):
+            fim = numero_linha
+            break
+        for posicao, coluna, destino, conversor, padrao in plano:
+            valor = linha[posicao] if posicao is not None and posicao < len(linha) else None
+            if _vazia(valor):
+                destino.append(padrao)
+                continue
+            if conversor is None:
+                destino.append(valor if isinstance(valor, str) else str(valor))
+                continue
+            try:
+                destino.append(conversor(valor))
+            except (ValueError, TypeError, OverflowError) as erro:
+                registrar(numero_linha, coluna.nome, valor, f"{erro}; usando o valor padrão")
+                destino.append(padrao)
+
+    posicao_item = posicoes.get(COLUNAS_ITEM[chave])
+    if fim is not None and posicao_item is not None:
+        # Depois do fim dos dados só deveria haver rodapé: linhas de resumo ou com itens já lidos (um por linha do texto)
+        itens = {str(item).strip() for item in colunas[COLUNAS_ITEM[chave]] if item is not None}
+        perdidas = [
+            numero_linha for numero_linha, linha in enumerate(linhas, start=fim + 1)
+            if not _fim_dos_dados(linha) and posicao_item < len(linha) and not _vazia(linha[posicao_item])
+            and not all(parte.strip() in itens for parte in str(linha[posicao_item]).splitlines() if parte.strip())
+        ]
+        if perdidas:
+            registrar(perdidas[0], COLUNAS_ITEM[chave], None, f"{len(perdidas)} linhas com itens depois do fim dos dados (linha {fim}) foram ignoradas")
+
+    if ignorados:
+        problemas.append(Problema(nome_aba, None, None, None, f"mais {ignorados} células inválidas não listadas"))
+
+    df = pd.DataFrame({coluna.nome: _serie(coluna, colunas[coluna.nome]) for coluna in esquema}, copy=False)
+    if chave == 'hoteis':
+        # Campo derivado, calculado uma vez: noites da estadia (NaN sem Chegada ou Partida)
+        df['Noites'] = (df['Partida'] - df['Chegada']).dt.days.astype('float32')
+    elif chave == 'passagens':
+        df = estruturar_passagens(df)
+    return df, problemas
+
+
+def id_passagem(chave):
+    # Identificador compacto (hash de 64 bits) da chave da passagem: estável entre versões da planilha enquanto a chave
+    # não muda. Com 64 bits, colisões são improváveis mesmo com milhões de passagens; o catálogo ainda as verifica
+    return int.from_bytes(hashlib.blake2b(chave.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def estruturar_passagens(df):
+    # Campos derivados da chave, calculados uma vez: sentido, companhia, rota, aeroportos e o id compacto (0 sem chave)
+    chaves = df['Sentido + Companhia + Origem + Destino']
+    partes = chaves.str.extract(PADRAO_CHAVE_PASSAGEM)
+    aeroportos = partes['rota'].str.extract(PADRAO_ROTA)
+    df['sentido'] = pd.Categorical(partes['sentido'], categories=['Ida', 'Volta'])
+    df['companhia'] = partes['companhia'].astype('category')
+    df['rota'] = partes['rota'].astype(TEXTO)
+    df['origem'] = aeroportos['origem'].astype('category')
+    df['destino'] = aeroportos['destino'].astype('category')
+    df['id_passagem'] = np.fromiter(
+        (0 if chave is None else id_passagem(chave) for chave in chaves.astype(object).where(chaves.notna(), None)),
+        dtype=np.uint64,
+        count=len(df),
+    )
+    return df
+
+
+def ler_planilha(file_path, chaves=None):
+    # Lê as abas pedidas (todas por padrão) abrindo o workbook uma única vez.
+    # Devolve ({chave: DataFrame}, {chave: [Problema, ...]})
+    chaves = list(ABAS) if chaves is None else list(chaves)
+    if not chaves:
+        return {}, {}
+    # Importado só aqui: com o snapshot em dia, o app nem chega a carregar o openpyxl
+    from openpyxl import load_workbook
+
+    # data_only: valores calculados das fórmulas (os gravados pelo Excel), não o texto da fórmula
+    planilha = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        lidas = {chave: ler_aba(planilha, chave) for chave in chaves}
+    finally:
+        planilha.close()
+    return {chave: df for chave, (df, _) in lidas.items()}, {chave: problemas for chave, (_, problemas) in lidas.items()}
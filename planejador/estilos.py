@@ -0,0 +1,102 @@
+"""Estilos CSS do app, preparados uma vez na importação.
+
+O CSS fica legível (com comentários) no código-fonte; a versão enviada ao
+navegador a cada execução completa é minificada uma única vez, quando o
+módulo é importado.
+"""
+import re
+
+_CSS = """
+p {
+    font-size: 1.05em;
+}
+.st-emotion-cache-nahz7x { /* Target st.info and st.success message boxes */
+    background-color: #e6f7ff;
+    border-left: 5px solid #007bff;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    margin-bottom: 1rem;
+    color: #000000;
+}
+.st-emotion-cache-nahz7x.stAlert-success {
+    background-color: #e6ffe6;
+    border-left: 5px solid #66cc66;
+    color: #338833;
+}
+.st-emotion-cache-nahz7x p {
+    font-size: 1.05em;
+    font-weight: normal;
+}
+.st-emotion-cache-nahz7x.stAlert-success p {
+    font-size: 1.3em;
+    font-weight: bold;
+}
+.dataframe {
+    font-size: 0.9em;
+}
+/* Ajustes para os botões de seleção e containers (os "blocos") */
+div[data-testid="stContainer"] {
+    padding: 1rem;
+    margin-bottom: 0.75rem;
+    border: 1px solid #ccc; /* Borda padrão para o container */
+    border-radius: 0.5rem;
+    box-shadow: 2px 2px 8px rgba(0,0,0,0.1); /* Sombra suave para destacar o bloco */
+    height: 100%; /* Garante que os containers tenham a mesma altura em uma linha */
+    display: flex;
+    flex-direction: column;
+    justify-content: space-between; /* Empurra o botão para baixo */
+}
+div[data-testid="stContainer"] button { /* Estilo para o botão DENTRO do container */
+    width: 100%; /* Botão ocupa toda a largura do bloco */
+    margin-top: auto; /* Empurra o botão para a parte inferior do container */
+}
+/* Estilo geral para todos os botões (incluindo os de seleção) */
+.stButton > button {
+    background-color: #007bff; /* Azul primário */
+    color: white;
+    border-radius: 0.5rem;
+    padding: 0.5rem 1rem;
+    font-size: 1.1em;
+    border: none;
+    cursor: pointer;
+    transition: background-color 0.2s; /* Transição suave na cor */
+}
+.stButton > button:hover:enabled {
+    background-color: #0056b3; /* Azul mais escuro ao passar o mouse */
+    color: white !important;
+}
+.stButton > button:disabled { /* Estilo para o botão DESABILITADO (quando já selecionado) */
+    background-color: #cccccc; /* Cinza */
+    color: #666666; /* Texto cinza */
+    cursor: not-allowed;
+}
+h1, h2, h3, h4, h5, h6 {
+    color: #FF4B4B; /* Cor vermelha para títulos */
+}
+a { /* Estilo para links em geral */
+    color: #007bff;
+    text-decoration: none;
+}
+a:hover {
+    text-decoration: underline;
+}
+/* Ajusta o espaçamento entre as colunas - Este seletor pode variar entre versões do Streamlit */
+/* Você pode precisar inspecionar o elemento para encontrar o correto para sua versão */
+div[data-testid="column"] { /* Seletor comum para as colunas */
+    gap: 1rem; /* Espaço entre as colunas */
+}
+div[data-testid="stVerticalBlock"] > div[data-testid="stHorizontalBlock"] {
+    gap: 1rem; /* Outro possível seletor para ajustar o gap entre colunas */
+}
+"""
+
+
+def _minificar(css):
+    # Remove comentários e espaços redundantes (o CSS não tem strings com esses caracteres)
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).replace(';}', '}').strip()
+
+
+# Bloco <style> pronto para st.markdown(..., unsafe_allow_html=True)
+ESTILOS = f"<style>{_minificar(_CSS)}</style>"
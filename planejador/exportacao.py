@@ -0,0 +1,327 @@
+"""Exportação do orçamento para XLSX, CSV e PDF, gerada em memória.
+
+Um relatório é uma lista de abas (nome, colunas e um iterável de linhas).
+As linhas são produzidas sob demanda e escritas uma a uma: o XLSX usa o
+modo write_only do openpyxl (cada linha vai direto para o XML da aba, sem
+guardar as células), o CSV escreve linha a linha e o PDF sai de um gerador
+mínimo de texto (Courier, página A4 deitada), página por página. A memória
+fica limitada ao arquivo gerado, mesmo com milhares de cenários.
+
+Exportador roda a geração em threads de fundo: o app recebe um Future e só
+oferece o download quando o arquivo está pronto.
+"""
+import csv
+import io
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from planejador.catalogo import CHAVE_PASSAGEM
+from planejador.formatacao import formatar_moeda
+from planejador.metricas import cronometrado
+from planejador.motor import COLUNAS_ORCAMENTO, Selecao, calcular_lote, calcular_orcamento, preco_carro, preco_hotel, preco_passagem, subtotal_atracao
+
+Aba = namedtuple('Aba', ['nome', 'colunas', 'linhas'])
+
+COLUNAS_RELATORIO = ['Seção', 'Item', 'Quantidade', 'Valor (R$)', 'Subtotal (R$)']
+COLUNAS_RESUMO = ['Código', 'Nome'] + COLUNAS_ORCAMENTO + ['Não encontrados']
+
+# Cenários calculados por vez no resumo de uma exportação em lote
+TAMANHO_BLOCO = 10_000
+
+# Abas de detalhe (uma por cenário) de uma exportação em lote; os demais cenários ficam só no resumo
+MAXIMO_ABAS_DETALHE = 200
+
+# Exportações geradas ao mesmo tempo (as demais esperam na fila)
+MAXIMO_EXPORTACOES = 2
+
+# Nome de aba do Excel: até 31 caracteres, sem []:*?/\
+_LIMITE_NOME_ABA = 31
+_PROIBIDOS_NOME_ABA = re.compile(r'[\[\]:*?/\\]')
+
+
+# --- Conteúdo dos relatórios ---
+
+def _item(secao, nome, quantidade, preco):
+    # Linha de um item escolhido; itens que não existem mais na planilha saem sem valores
+    if preco is None:
+        return (secao, f"{nome} (não encontrado)", quantidade, None, None)
+    return (secao, nome, quantidade, preco, preco * quantidade)
+
+
+def linhas_relatorio(catalogo, selecao):
+    # Itens do plano por seção (hotel, passagens, atrações com quantidade e carro), seguidos dos totais de cada seção
+    if selecao.hotel:
+        yield _item('Hotel', selecao.hotel, 1, preco_hotel(catalogo, selecao.hotel))
+    for sentido, passagem in (('Ida', selecao.passagem_ida), ('Volta', selecao.passagem_volta)):
+        if passagem:
+            yield _item('Passagens', f"{sentido}: {passagem}", 1, preco_passagem(catalogo, passagem))
+    quantidades = selecao.quantidades or {}
+    for nome, valor, padrao in zip(catalogo.atracoes['Atrações'].tolist(), catalogo.atracoes['Valor (R$)'].tolist(), catalogo.atracoes['Quantidade'].tolist()):
+        quantidade = quantidades.get(nome, padrao)
+        if quantidade:
+            yield ('Atrações', nome, quantidade, valor, subtotal_atracao(valor, quantidade))
+    if selecao.carro:
+        yield _item('Carro', "{} ({})".format(*selecao.carro), 1, preco_carro(catalogo, selecao.carro))
+
+    orcamento = calcular_orcamento(catalogo, selecao)
+    for secao, valor in (('Hotel', orcamento.hotel), ('Passagens', orcamento.passagens), ('Atrações', orcamento.atracoes), ('Carro', orcamento.carro)):
+        yield ('Total', secao, None, None, round(valor, 2))
+    yield ('Total', 'Viagem', None, None, round(orcamento.total, 2))
+
+
+def abas_plano(catalogo, selecao, nome='Orçamento'):
+    return [Aba(nome, COLUNAS_RELATORIO, linhas_relatorio(catalogo, selecao))]
+
+
+def selecao_cenario(cenario):
+    # Selecao a partir de uma linha de cenário no formato do motor (hotel, passagem_ida, passagem_volta, carro_tipo, carro_locadora, quantidades)
+    def valor(nome):
+        conteudo = cenario.get(nome)
+        return None if conteudo is None or (not isinstance(conteudo, dict) and pd.isna(conteudo)) else conteudo
+
+    return Selecao(
+        hotel=valor('hotel'),
+        passagem_ida=valor('passagem_ida'),
+        passagem_volta=valor('passagem_volta'),
+        carro=(valor('carro_tipo'), valor('carro_locadora')) if valor('carro_tipo') is not None else None,
+        quantidades=valor('quantidades'),
+    )
+
+
+def cenarios_sugestoes(catalogo, sugestoes, quantidades=None):
+    # Sugestões do otimizador (posições das passagens) no formato de cenários do motor, com as chaves de texto da planilha
+    chaves_passagens = catalogo.passagens[CHAVE_PASSAGEM].to_numpy()
+    return pd.DataFrame({
+        'codigo': [f"sugestao-{i + 1}" for i in range(len(sugestoes))],
+        'nome': [f"Sugestão {i + 1}" for i in range(len(sugestoes))],
+        'hotel': sugestoes['Hotel'].to_numpy(),
+        'passagem_ida': chaves_passagens[sugestoes['posicao_ida'].to_numpy(dtype=int)],
+        'passagem_volta': chaves_passagens[sugestoes['posicao_volta'].to_numpy(dtype=int)],
+        'carro_tipo': sugestoes['Tipo do Carro'].to_numpy(),
+        'carro_locadora': sugestoes['Locadora'].to_numpy(),
+        'quantidades': [quantidades] * len(sugestoes),
+    })
+
+
+def _linhas_resumo(catalogo, cenarios):
+    # Totais dos cenários calculados em blocos (motor.calcular_lote), para não montar o resultado inteiro de uma vez
+    for inicio in range(0, len(cenarios), TAMANHO_BLOCO):
+        bloco = cenarios.iloc[inicio:inicio + TAMANHO_BLOCO]
+        totais = calcular_lote(catalogo, bloco.rename(columns={'codigo': 'id'}))
+        yield from zip(bloco['codigo'], bloco['nome'], *(totais[coluna] for coluna in COLUNAS_ORCAMENTO), totais['nao_encontrados'])
+
+
+def abas_lote(catalogo, cenarios, maximo_detalhes=MAXIMO_ABAS_DETALHE):
+    # Aba "Resumo" com os totais de todos os cenários (codigo, nome e colunas de cenário do motor),
+    # seguida de uma aba de detalhe por cenário (até maximo_detalhes)
+    abas = [Aba('Resumo', COLUNAS_RESUMO, _linhas_resumo(catalogo, cenarios))]
+    # Só as linhas que ganham aba são convertidas em dicionários; as linhas de cada aba saem na thread de fundo
+    for cenario in cenarios.head(maximo_detalhes).to_dict('records'):
+        abas.append(Aba(f"{cenario['codigo']} {cenario['nome']}", COLUNAS_RELATORIO, linhas_relatorio(catalogo, selecao_cenario(cenario))))
+    return abas
+
+
+# --- Formatos ---
+
+def _nomes_abas(nomes):
+    # Nomes válidos e únicos no Excel (sem distinguir maiúsculas): "Plano: X" -> "Plano X", repetidos ganham " (2)"
+    usados = set()
+    for nome in nomes:
+        base = ' '.join(_PROIBIDOS_NOME_ABA.sub(' ', str(nome)).split())[:_LIMITE_NOME_ABA] or 'Aba'
+        candidato, numero = base, 1
+        while candidato.lower() in usados:
+            numero += 1
+            sufixo = f" ({numero})"
+            candidato = base[:_LIMITE_NOME_ABA - len(sufixo)] + sufixo
+        usados.add(candidato.lower())
+        yield candidato
+
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, float) and valor != valor)
+
+
+def escrever_xlsx(abas, destino):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    livro = Workbook(write_only=True)
+    negrito = Font(bold=True)
+    abas = list(abas)
+    for aba, nome in zip(abas, _nomes_abas(aba.nome for aba in abas)):
+        planilha = livro.create_sheet(nome)
+        cabecalho = []
+        for coluna in aba.colunas:
+            celula = WriteOnlyCell(planilha, value=coluna)
+            celula.font = negrito
+            cabecalho.append(celula)
+        planilha.append(cabecalho)
+        moeda = [coluna.endswith('(R$)') for coluna in aba.colunas]
+        for linha in aba.linhas:
+            valores = []
+            for valor, em_reais in zip(linha, moeda):
+                if _vazio(valor):
+                    valores.append(None)
+                elif em_reais:
+                    celula = WriteOnlyCell(planilha, value=float(valor))
+                    celula.number_format = '#,##0.00'
+                    valores.append(celula)
+                else:
+                    valores.append(valor)
+            planilha.append(valores)
+    livro.save(destino)
+
+
+def escrever_csv(abas, destino):
+    # Uma tabela por arquivo: em lote, só a aba de resumo vai para o CSV
+    aba = next(iter(abas))
+    texto = io.TextIOWrapper(destino, encoding='utf-8', newline='', write_through=True)
+    try:
+        escritor = csv.writer(texto)
+        escritor.writerow(aba.colunas)
+        escritor.writerows([None if _vazio(valor) else valor for valor in linha] for linha in aba.linhas)
+    finally:
+        # Solta o buffer sem fechá-lo (quem chamou ainda vai ler os bytes)
+        texto.detach()
+
+
+class _EscritorPdf:
+    # PDF 1.4 mínimo: só texto em Courier (fontes padrão, sem embutir), páginas gravadas assim que ficam cheias.
+    # Objetos fixos: 1 catálogo, 2 árvore de páginas, 3 e 4 fontes; cada página usa dois objetos (conteúdo e página)
+    LARGURA, ALTURA = 842, 595 # A4 deitada, em pontos
+    MARGEM = 36
+    CORPO = 8
+    ENTRELINHA = 10
+    COLUNAS = int((LARGURA - 2 * MARGEM) / (CORPO * 0.6)) # Courier: cada caractere tem 0,6 do corpo
+    LINHAS = int((ALTURA - 2 * MARGEM) / ENTRELINHA)
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.inicio = destino.tell()
+        self.posicoes = {}
+        self.paginas = []
+        self.linhas = []
+        self._escrever(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._objeto(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+        self._objeto(4, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>')
+
+    def _escrever(self, dados):
+        self.destino.write(dados)
+
+    def _objeto(self, numero, corpo):
+        self.posicoes[numero] = self.destino.tell() - self.inicio
+        self._escrever(b'%d 0 obj\n' % numero + corpo + b'\nendobj\n')
+
+    @staticmethod
+    def _texto(texto):
+        # Texto de um operador Tj: WinAnsi (o que não existir nela vira "?"), com \, ( e ) escapados
+        texto = texto.replace('→', '->').encode('cp1252', errors='replace')
+        return b'(' + texto.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+    def linha(self, texto='', negrito=False):
+        self.linhas.append((texto[:self.COLUNAS], negrito))
+        if len(self.linhas) == self.LINHAS:
+            self._gravar_pagina()
+
+    def _gravar_pagina(self):
+        conteudo = [b'BT', b'%d TL' % self.ENTRELINHA, b'%d %d Td' % (self.MARGEM, self.ALTURA - self.MARGEM)]
+        fonte_atual = None
+        for texto, negrito in self.linhas:
+            fonte = b'/F2' if negrito else b'/F1'
+            if fonte != fonte_atual:
+                conteudo.append(fonte + b' %d Tf' % self.CORPO)
+                fonte_atual = fonte
+            conteudo.append(b'T* ' + self._texto(texto) + b' Tj')
+        conteudo.append(b'ET')
+        fluxo = b'\n'.join(conteudo)
+
+        numero = 5 + 2 * len(self.paginas)
+        self._objeto(numero, b'<< /Length %d >>\nstream\n' % len(fluxo) + fluxo + b'\nendstream')
+        self._objeto(numero + 1, b'<< /Type /Page /Parent 2 0 R /Contents %d 0 R >>' % numero)
+        self.paginas.append(numero + 1)
+        self.linhas = []
+
+    def fechar(self):
+        if self.linhas or not self.paginas:
+            self._gravar_pagina()
+        filhos = b' '.join(b'%d 0 R' % pagina for pagina in self.paginas)
+        self._objeto(2, (
+            b'<< /Type /Pages /Kids [%s] /Count %d /MediaBox [0 0 %d %d]'
+            b' /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>'
+        ) % (filhos, len(self.paginas), self.LARGURA, self.ALTURA))
+        self._objeto(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+        inicio_xref = self.destino.tell() - self.inicio
+        total = max(self.posicoes) + 1
+        self._escrever(b'xref\n0 %d\n0000000000 65535 f \n' % total)
+        self._escrever(b''.join(b'%010d 00000 n \n' % self.posicoes[numero] for numero in range(1, total)))
+        self._escrever(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (total, inicio_xref))
+
+
+def _larguras(colunas, total):
+    # Colunas em reais têm largura fixa; as demais dividem o resto da linha
+    largura_moeda = 15
+    moeda = [coluna.endswith('(R$)') for coluna in colunas]
+    livre = total - largura_moeda * sum(moeda) - (len(colunas) - 1)
+    largura_texto = max(livre // max(len(colunas) - sum(moeda), 1), 8)
+    return [largura_moeda if em_reais else largura_texto for em_reais in moeda], moeda
+
+
+def _celula_pdf(valor, largura, em_reais):
+    if _vazio(valor):
+        return ' ' * largura
+    if em_reais:
+        return formatar_moeda(float(valor)).rjust(largura)[-largura:]
+    if isinstance(valor, (int, float)):
+        return f"{valor:g}".rjust(largura)
+    return str(valor)[:largura].ljust(largura)
+
+
+def escrever_pdf(abas, destino):
+    pdf = _EscritorPdf(destino)
+    for aba in abas:
+        larguras, moeda = _larguras(aba.colunas, pdf.COLUNAS)
+        pdf.linha(str(aba.nome), negrito=True)
+        pdf.linha(' '.join(coluna[:largura].rjust(largura) if em_reais else coluna[:largura].ljust(largura) for coluna, largura, em_reais in zip(aba.colunas, larguras, moeda)), negrito=True)
+        pdf.linha('-' * pdf.COLUNAS)
+        for linha in aba.linhas:
+            pdf.linha(' '.join(_celula_pdf(valor, largura, em_reais) for valor, largura, em_reais in zip(linha, larguras, moeda)))
+        pdf.linha()
+    pdf.fechar()
+
+
+# formato -> (função que escreve, extensão, tipo MIME)
+FORMATOS = {
+    'xlsx': (escrever_xlsx, 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'pdf': (escrever_pdf, 'pdf', 'application/pdf'),
+    'csv': (escrever_csv, 'csv', 'text/csv'),
+}
+
+
+@cronometrado('exportacao')
+def exportar(formato, abas, destino=None):
+    # Escreve as abas no formato pedido em destino (arquivo binário aberto) ou em um buffer novo, que é devolvido
+    destino = io.BytesIO() if destino is None else destino
+    FORMATOS[formato][0](abas, destino)
+    return destino
+
+
+def _exportar_em_memoria(formato, abas):
+    return exportar(formato, abas).getvalue()
+
+
+class Exportador:
+    # Gera os arquivos em threads de fundo, compartilhadas pelas sessões do app
+    def __init__(self, maximo=MAXIMO_EXPORTACOES):
+        self._executor = ThreadPoolExecutor(max_workers=maximo, thread_name_prefix='exportacao')
+
+    def enviar(self, formato, abas):
+        # Future com os bytes do arquivo; as linhas das abas são produzidas já na thread de fundo
+        return self._executor.submit(_exportar_em_memoria, formato, abas)
+
+    def parar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,44 @@
+"""Formatação de valores para exibição em pt_BR (moeda, datas e dias da semana)."""
+import pandas as pd
+
+# Símbolo de cada moeda (código ISO); as demais aparecem pelo código ("CLP 1.234,56")
+SIMBOLOS_MOEDA = {'BRL': 'R$', 'USD': 'US$', 'EUR': '€', 'GBP': '£', 'ARS': 'AR$', 'UYU': '$U', 'CLP': 'CLP$'}
+
+# Texto dos preços ausentes (NaN: linha numa moeda sem cotação)
+SEM_COTACAO = 'sem cotação'
+
+# Dicionário para traduzir dias da semana
+weekday_ptbr = {
+    'Monday': 'segunda-feira',
+    'Tuesday': 'terça-feira',
+    'Wednesday': 'quarta-feira',
+    'Thursday': 'quinta-feira',
+    'Friday': 'sexta-feira',
+    'Saturday': 'sábado',
+    'Sunday': 'domingo'
+}
+
+# Mesmos nomes, indexados por Series.dt.dayofweek (0 = segunda-feira)
+_DIAS_SEMANA = dict(enumerate(weekday_ptbr.values()))
+
+
+# Função para formatar moeda em pt_BR
+def formatar_moeda(valor, moeda='BRL'):
+    # Agrupa com "_" (independe do locale) e troca os separadores com dois replace, sem marcador intermediário
+    if valor != valor:
+        return SEM_COTACAO
+    return SIMBOLOS_MOEDA.get(moeda, moeda) + f" {valor:_.2f}".replace(".", ",").replace("_", ".")
+
+
+def formatar_moeda_serie(serie, moeda='BRL'):
+    # Formata uma coluna inteira de preços de uma vez (mesmo resultado de formatar_moeda)
+    numeros = serie.astype(float).map('{:_.2f}'.format).astype(str).str.replace('.', ',', regex=False).str.replace('_', '.', regex=False)
+    textos = SIMBOLOS_MOEDA.get(moeda, moeda) + ' ' + numeros
+    return textos.where(serie.notna(), SEM_COTACAO)
+
+
+def formatar_data_serie(serie):
+    # "sábado, 25/07/2026" para cada data da coluna; None onde a data está vazia
+    datas = pd.to_datetime(serie, errors='coerce')
+    textos = datas.dt.dayofweek.map(_DIAS_SEMANA) + ', ' + datas.dt.strftime('%d/%m/%Y')
+    return textos.astype(object).where(datas.notna(), None)
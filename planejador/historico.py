@@ -0,0 +1,245 @@
+"""Histórico de preços de hotéis, passagens e carros entre versões da planilha.
+
+Cada nova versão da planilha (gravada pelo snapshot) é comparada com o
+último preço conhecido de cada item, e só as linhas que mudaram (item novo,
+preço diferente ou item removido) são acrescentadas à série temporal: um
+arquivo Feather imutável por versão, nunca reescrito.
+
+Os agregados usados pelo app (preço atual, menor preço já visto e o preço
+de uma semana antes da versão mais recente) ficam em um arquivo à parte,
+atualizado de forma incremental a cada versão: o app só lê esse arquivo,
+sem percorrer a série. Para o preço de uma semana antes basta ler os
+segmentos dessa janela, porque cada mudança guarda também o preço anterior.
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from planejador.cambio import COLUNA_COTACAO
+from planejador.catalogo import CHAVE_CARRO, CHAVE_HOTEL, CHAVE_PASSAGEM
+from planejador.formatacao import formatar_moeda_serie
+
+# Diretório (ao lado da planilha) do histórico; não fica em .cache_viagem porque não pode ser refeito
+DIRETORIO_HISTORICO = '.historico_precos'
+
+# Janela da variação recente ("na semana")
+JANELA_VARIACAO = pd.Timedelta(days=7)
+
+# Item -> (aba, colunas da chave, coluna do preço)
+ITENS = {
+    'hotel': ('hoteis', [CHAVE_HOTEL], 'Preço por Período (R$)'),
+    'passagem': ('passagens', [CHAVE_PASSAGEM], 'Total (R$)'),
+    'carro': ('aluguel_carro', CHAVE_CARRO, 'Preço por Período (R$)'),
+}
+
+# Abas que entram no histórico
+ABAS_HISTORICO = [aba for aba, _, _ in ITENS.values()]
+
+# Chave de um carro no histórico: "Tipo do Carro | Locadora"
+SEPARADOR_CHAVE = ' | '
+
+_ARQUIVO_AGREGADOS = 'agregados.feather'
+_ARQUIVO_MANIFESTO = 'manifesto.json'
+_DIRETORIO_SEGMENTOS = 'mudancas'
+_COLUNAS_AGREGADOS = ['item', 'chave', 'preco', 'menor_preco', 'menor_em', 'primeiro_em', 'alterado_em', 'preco_semana']
+
+
+def diretorio_historico(file_path):
+    pasta, nome = os.path.split(os.path.abspath(file_path))
+    return os.path.join(pasta, DIRETORIO_HISTORICO, os.path.splitext(nome)[0])
+
+
+def chaves_itens(df, colunas):
+    # Chave de texto de cada linha (None quando alguma parte está vazia)
+    partes = [df[coluna].astype(object) for coluna in colunas]
+    chaves = partes[0].astype(str) if len(partes) == 1 else pd.Series(
+        [SEPARADOR_CHAVE.join(map(str, valores)) for valores in zip(*partes)], index=df.index
+    )
+    validas = np.logical_and.reduce([parte.notna().to_numpy() for parte in partes])
+    return chaves.where(validas, None)
+
+
+def precos_versao(abas):
+    # Preço de cada item das abas informadas ({chave da aba: DataFrame}); a primeira linha de cada chave vale
+    partes = []
+    for item, (aba, colunas, coluna_preco) in ITENS.items():
+        if aba not in abas:
+            continue
+        df = abas[aba]
+        precos = pd.DataFrame({'item': item, 'chave': chaves_itens(df, colunas), 'preco': df[coluna_preco].to_numpy(dtype=float)})
+        partes.append(precos.dropna(subset=['chave']).drop_duplicates('chave', keep='first'))
+    if not partes:
+        return pd.DataFrame({'item': pd.Series(dtype=object), 'chave': pd.Series(dtype=object), 'preco': pd.Series(dtype=float)})
+    return pd.concat(partes, ignore_index=True)
+
+
+def _ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, _ARQUIVO_MANIFESTO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_atomico(caminho, gravar):
+    fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    os.close(fd)
+    try:
+        gravar(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def ler_agregados(file_path):
+    # Agregados da versão mais recente registrada: item, chave, preço atual, menor preço (e quando), primeira
+    # aparição, última mudança e o preço de uma semana antes. DataFrame vazio se ainda não há histórico
+    caminho = os.path.join(diretorio_historico(file_path), _ARQUIVO_AGREGADOS)
+    if not os.path.isfile(caminho):
+        return _agregados_vazios()
+    return feather.read_feather(caminho)
+
+
+def _agregados_vazios():
+    tipos = {'item': object, 'chave': object, 'preco': float, 'menor_preco': float, 'preco_semana': float}
+    return pd.DataFrame({coluna: pd.Series(dtype=tipos.get(coluna, 'datetime64[ns]')) for coluna in _COLUNAS_AGREGADOS})
+
+
+def ler_mudancas(file_path, desde=None):
+    # Série de mudanças (momento, versao, item, chave, preco, preco_anterior), opcionalmente só depois de `desde`.
+    # Os segmentos têm o momento no nome: os anteriores à janela nem são abertos
+    pasta = os.path.join(diretorio_historico(file_path), _DIRETORIO_SEGMENTOS)
+    nomes = sorted(os.listdir(pasta)) if os.path.isdir(pasta) else []
+    if desde is not None:
+        limite = pd.Timestamp(desde).value
+        nomes = [nome for nome in nomes if int(nome.split('-', 1)[0]) > limite]
+    segmentos = [feather.read_feather(os.path.join(pasta, nome)) for nome in nomes if nome.endswith('.feather')]
+    if not segmentos:
+        return pd.DataFrame({
+            'momento': pd.Series(dtype='datetime64[ns]'), 'versao': pd.Series(dtype=object), 'item': pd.Series(dtype=object),
+            'chave': pd.Series(dtype=object), 'preco': pd.Series(dtype=float), 'preco_anterior': pd.Series(dtype=float),
+        })
+    return pd.concat(segmentos, ignore_index=True)
+
+
+def versao_registrada(file_path):
+    # Última versão da planilha registrada no histórico (None se ainda não há histórico)
+    manifesto = _ler_manifesto(diretorio_historico(file_path))
+    return manifesto['versao'] if manifesto else None
+
+
+def registrar_versao(file_path, versao, abas, momento):
+    # Acrescenta as mudanças de preço de uma nova versão e atualiza os agregados.
+    # abas: {chave da aba: DataFrame} só com as abas relidas (as demais não mudaram); momento: pd.Timestamp.
+    # Devolve o número de mudanças registradas (None se a versão já estava registrada)
+    pasta = diretorio_historico(file_path)
+    manifesto = _ler_manifesto(pasta)
+    if manifesto and manifesto['versao'] == versao:
+        return None
+    os.makedirs(os.path.join(pasta, _DIRETORIO_SEGMENTOS), exist_ok=True)
+    # O tempo do histórico nunca anda para trás (uma planilha antiga restaurada entra como a mais recente)
+    if manifesto:
+        momento = max(momento, pd.Timestamp(manifesto['momento_ns']))
+
+    agregados = ler_agregados(file_path) if manifesto else _agregados_vazios()
+    novos = precos_versao(abas)
+    itens_lidos = [item for item, (aba, _, _) in ITENS.items() if aba in abas]
+    atuais = agregados.loc[agregados['item'].isin(itens_lidos), ['item', 'chave', 'preco']]
+    juntos = novos.merge(atuais, on=['item', 'chave'], how='outer', suffixes=('', '_anterior'))
+    iguais = (juntos['preco'] == juntos['preco_anterior']) | (juntos['preco'].isna() & juntos['preco_anterior'].isna())
+    mudancas = juntos[~iguais.to_numpy()].reset_index(drop=True)
+    mudancas.insert(0, 'momento', momento)
+    mudancas.insert(1, 'versao', versao)
+
+    if len(mudancas):
+        nome = f"{momento.value:020d}-{versao}.feather"
+        _gravar_atomico(
+            os.path.join(pasta, _DIRETORIO_SEGMENTOS, nome),
+            lambda caminho: mudancas.to_feather(caminho, compression='uncompressed'),
+        )
+
+    agregados = _atualizar_agregados(file_path, agregados, mudancas, momento)
+    _gravar_atomico(os.path.join(pasta, _ARQUIVO_AGREGADOS), lambda caminho: agregados.to_feather(caminho, compression='uncompressed'))
+    _gravar_atomico(os.path.join(pasta, _ARQUIVO_MANIFESTO), lambda caminho: _gravar_json(caminho, {
+        'versao': versao,
+        'momento_ns': momento.value,
+        'itens': len(agregados),
+    }))
+    return len(mudancas)
+
+
+def _gravar_json(caminho, conteudo):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False, indent=2)
+
+
+def _atualizar_agregados(file_path, agregados, mudancas, momento):
+    # Aplica as mudanças da versão aos agregados (vetorizado) e recalcula o preço de uma semana antes
+    mudancas = mudancas.set_index(['item', 'chave'])
+    agregados = agregados.set_index(['item', 'chave'])
+    novas = mudancas.index.difference(agregados.index)
+    if len(novas):
+        agregados = pd.concat([agregados, pd.DataFrame(index=novas, columns=agregados.columns).astype(agregados.dtypes.to_dict())])
+        agregados.loc[novas, 'primeiro_em'] = momento
+
+    if len(mudancas):
+        preco = mudancas['preco']
+        agregados.loc[preco.index, 'preco'] = preco
+        agregados.loc[preco.index, 'alterado_em'] = momento
+        menor = agregados.loc[preco.index, 'menor_preco']
+        novo_menor = preco.notna() & (menor.isna() | (preco < menor))
+        agregados.loc[novo_menor[novo_menor].index, 'menor_preco'] = preco[novo_menor]
+        agregados.loc[novo_menor[novo_menor].index, 'menor_em'] = momento
+
+    # Preço uma semana antes da versão atual: o preço anterior da primeira mudança de cada item dentro da janela;
+    # itens sem mudança na janela mantêm o preço atual
+    agregados['preco_semana'] = agregados['preco']
+    janela = ler_mudancas(file_path, momento - JANELA_VARIACAO)
+    if len(mudancas):
+        janela = pd.concat([janela, mudancas.reset_index()], ignore_index=True)
+    if len(janela):
+        primeiras = janela.sort_values('momento', kind='stable').drop_duplicates(['item', 'chave'], keep='first').set_index(['item', 'chave'])
+        agregados.loc[primeiras.index, 'preco_semana'] = primeiras['preco_anterior']
+    return agregados.reset_index()[_COLUNAS_AGREGADOS]
+
+
+def selos(agregados, item, df, moeda='BRL', fator=1.0):
+    # Selos em Markdown (":green-badge[...]") para os cartões de um item, alinhados às linhas de df:
+    # variação na semana e menor preço já visto. None onde não há o que mostrar.
+    # O histórico guarda os preços como estão na planilha (na moeda de cada linha): a cotação do catálogo
+    # os leva para reais, então uma mudança de câmbio não aparece como variação de preço
+    _, colunas, coluna_preco = ITENS[item]
+    if len(df) == 0 or len(agregados) == 0:
+        return [None] * len(df)
+    do_item = agregados[agregados['item'] == item].drop_duplicates('chave').set_index('chave')
+    referencia = do_item.reindex(chaves_itens(df, colunas).to_numpy())
+    precos = df[coluna_preco].to_numpy(dtype=float)
+    cotacao = df[COLUNA_COTACAO].to_numpy(dtype=float) if COLUNA_COTACAO in df.columns else 1.0
+    semana = referencia['preco_semana'].to_numpy(dtype=float) * cotacao
+    menor = referencia['menor_preco'].to_numpy(dtype=float) * cotacao
+    alterado = referencia['alterado_em'].notna().to_numpy() & referencia['primeiro_em'].ne(referencia['alterado_em']).to_numpy()
+
+    variacao = precos - semana
+    textos_variacao = formatar_moeda_serie(pd.Series(np.abs(np.nan_to_num(variacao)) * fator), moeda).to_numpy()
+    textos_menor = formatar_moeda_serie(pd.Series(np.nan_to_num(menor) * fator), moeda).to_numpy()
+
+    resultado = []
+    for i in range(len(df)):
+        partes = []
+        if variacao[i] < 0:
+            partes.append(f":green-badge[▼ {textos_variacao[i]} na semana]")
+        elif variacao[i] > 0:
+            partes.append(f":red-badge[▲ {textos_variacao[i]} na semana]")
+        # "Menor preço" só faz sentido para itens cujo preço já mudou alguma vez
+        if alterado[i] and not np.isnan(menor[i]):
+            if precos[i] <= menor[i]:
+                partes.append(":blue-badge[Menor preço já visto]")
+            else:
+                partes.append(f":gray-badge[Menor já visto: {textos_menor[i]}]")
+        resultado.append(' '.join(partes) or None)
+    return resultado
@@ -0,0 +1,156 @@
+"""Instrumentação leve: intervalos cronometrados, contadores e exportação.
+
+Ativada pela variável de ambiente PLANEJADOR_METRICAS (ou por ativar(), em
+scripts e benchmarks):
+- "1" ou "prometheus": acumula os intervalos e contadores no processo, que
+  podem ser exportados em texto no formato do Prometheus (texto_prometheus);
+- "json": além disso, registra cada intervalo como uma linha JSON no logger
+  deste módulo.
+
+Desativada, medir() devolve um gerenciador de contexto vazio já pronto e
+contar() retorna na primeira linha, então pode ficar ligada nos pontos
+quentes do código em produção.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_MODO = os.environ.get('PLANEJADOR_METRICAS', '').strip().lower()
+_ativo = _MODO not in ('', '0')
+_linhas_json = _MODO == 'json'
+
+_lock = threading.Lock()
+# nome -> [quantidade, soma (s), máximo (s), último (s)]
+_intervalos = {}
+# (nome, rótulos ordenados) -> valor
+_contadores = {}
+
+_NULO = contextlib.nullcontext()
+
+
+def ativo():
+    return _ativo
+
+
+def ativar(linhas_json=False):
+    global _ativo, _linhas_json
+    _ativo = True
+    _linhas_json = _linhas_json or linhas_json
+
+
+def desativar():
+    global _ativo, _linhas_json
+    _ativo = _linhas_json = False
+
+
+def limpar():
+    with _lock:
+        _intervalos.clear()
+        _contadores.clear()
+
+
+def registrar(nome, segundos, destino=None):
+    # Acumula um intervalo já medido; destino (dict opcional) guarda o último valor, como os tempos de uma sessão
+    with _lock:
+        estatistica = _intervalos.get(nome)
+        if estatistica is None:
+            _intervalos[nome] = [1, segundos, segundos, segundos]
+        else:
+            estatistica[0] += 1
+            estatistica[1] += segundos
+            estatistica[2] = max(estatistica[2], segundos)
+            estatistica[3] = segundos
+    if destino is not None:
+        destino[nome] = segundos
+    if _linhas_json:
+        logger.info(json.dumps({'intervalo': nome, 'segundos': round(segundos, 6)}))
+
+
+@contextlib.contextmanager
+def _medir(nome, destino):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nome, time.perf_counter() - inicio, destino)
+
+
+def medir(nome, destino=None):
+    # Uso: with medir('secao_hotel'): ...
+    if not _ativo:
+        return _NULO
+    return _medir(nome, destino)
+
+
+def cronometrado(nome, destino=None):
+    # Decorador equivalente a medir(); destino pode ser um callable que devolve o dict, avaliado a cada chamada
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with _medir(nome, destino() if callable(destino) else destino):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def contar(nome, quantidade=1, **rotulos):
+    if not _ativo:
+        return
+    chave = (nome, tuple(sorted(rotulos.items())))
+    with _lock:
+        _contadores[chave] = _contadores.get(chave, 0) + quantidade
+
+
+def intervalos():
+    # Cópia das estatísticas: nome -> dict com quantidade, soma, média, máximo e último (segundos)
+    with _lock:
+        copia = {nome: list(valores) for nome, valores in _intervalos.items()}
+    return {
+        nome: {'quantidade': quantidade, 'soma_s': soma, 'media_s': soma / quantidade, 'max_s': maximo, 'ultimo_s': ultimo}
+        for nome, (quantidade, soma, maximo, ultimo) in copia.items()
+    }
+
+
+def contadores():
+    with _lock:
+        return dict(_contadores)
+
+
+def _rotulos(pares):
+    if not pares:
+        return ''
+    texto = ','.join('{}="{}"'.format(chave, str(valor).replace('\\', '\\\\').replace('"', '\\"')) for chave, valor in pares)
+    return '{' + texto + '}'
+
+
+def texto_prometheus(prefixo='planejador'):
+    # Exportação no formato de texto do Prometheus (intervalos como summary sem quantis, mais o máximo)
+    linhas = [
+        f"# HELP {prefixo}_intervalo_segundos Duração dos intervalos cronometrados.",
+        f"# TYPE {prefixo}_intervalo_segundos summary",
+    ]
+    estatisticas = intervalos()
+    for nome, estatistica in sorted(estatisticas.items()):
+        rotulo = _rotulos([('nome', nome)])
+        linhas.append(f"{prefixo}_intervalo_segundos_count{rotulo} {estatistica['quantidade']}")
+        linhas.append(f"{prefixo}_intervalo_segundos_sum{rotulo} {estatistica['soma_s']:.9f}")
+    linhas.append(f"# TYPE {prefixo}_intervalo_segundos_max gauge")
+    for nome, estatistica in sorted(estatisticas.items()):
+        linhas.append(f"{prefixo}_intervalo_segundos_max{_rotulos([('nome', nome)])} {estatistica['max_s']:.9f}")
+
+    por_nome = {}
+    for (nome, pares), valor in contadores().items():
+        por_nome.setdefault(nome, []).append((pares, valor))
+    for nome, series in sorted(por_nome.items()):
+        linhas.append(f"# TYPE {prefixo}_{nome}_total counter")
+        for pares, valor in sorted(series):
+            linhas.append(f"{prefixo}_{nome}_total{_rotulos(pares)} {valor}")
+    return '\n'.join(linhas) + '\n'
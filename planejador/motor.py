@@ -0,0 +1,226 @@
+"""Motor de cálculo do orçamento, sem dependência da interface.
+
+Concentra as regras de preço usadas pelo app (preço do hotel, soma das
+passagens de ida e volta, subtotais das atrações, preço do carro e custo
+total) para que possam ser usadas também em lote (CLI) e por HTTP.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from planejador.cambio import carregar_cambio
+from planejador.catalogo import montar_catalogo
+from planejador.snapshot import carregar_planilha
+
+# Colunas aceitas em um cenário (linha de CSV ou objeto JSON)
+COLUNAS_CENARIO = ['hotel', 'passagem_ida', 'passagem_volta', 'carro_tipo', 'carro_locadora']
+
+# Prefixo das colunas de quantidade de atração em CSV (ex.: "qtd:Snowland (Adulto)")
+PREFIXO_QUANTIDADE = 'qtd:'
+
+COLUNAS_ORCAMENTO = ['Hotel (R$)', 'Passagens (R$)', 'Atrações (R$)', 'Carro (R$)', 'Total (R$)']
+
+
+@dataclass
+class Selecao:
+    hotel: str = None
+    passagem_ida: str = None
+    passagem_volta: str = None
+    carro: tuple = None # (Tipo do Carro, Locadora)
+    quantidades: dict = None # nome da atração -> quantidade; None = quantidades da planilha
+
+
+@dataclass
+class Orcamento:
+    hotel: float = 0.0
+    passagens: float = 0.0
+    atracoes: float = 0.0
+    carro: float = 0.0
+    nao_encontrados: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        return custo_total(self.hotel, self.passagens, self.atracoes, self.carro)
+
+
+def carregar_catalogo(file_path):
+    return montar_catalogo(*carregar_planilha(file_path), cambio=carregar_cambio())
+
+
+# --- Regras de preço (compartilhadas com o app) ---
+
+def _preco(df, coluna, posicao):
+    # Preço da linha; None se a linha não existir ou estiver sem preço (NaN: moeda sem cotação)
+    if posicao is None:
+        return None
+    preco = float(df[coluna].iat[posicao])
+    return None if np.isnan(preco) else preco
+
+
+def preco_hotel(catalogo, hotel_name):
+    # Preço por Período do hotel; None se o hotel não existir nos dados atuais (ou estiver sem preço)
+    return _preco(catalogo.hoteis, 'Preço por Período (R$)', catalogo.posicao_hotel(hotel_name))
+
+
+def preco_passagem(catalogo, passagem_info):
+    # Total (R$) da passagem (voo + bagagem); None se a passagem não existir nos dados atuais (ou estiver sem preço)
+    return _preco(catalogo.passagens, 'Total (R$)', catalogo.posicao_passagem(passagem_info))
+
+
+def preco_carro(catalogo, carro_type_locadora):
+    # Preço por Período do aluguel; None se o carro não existir nos dados atuais (ou estiver sem preço)
+    return _preco(catalogo.aluguel_carro, 'Preço por Período (R$)', catalogo.posicao_carro(carro_type_locadora))
+
+
+def subtotal_atracao(valor, quantidade):
+    # Atração sem preço (NaN: moeda sem cotação) fica fora do total
+    return 0.0 if valor != valor else valor * quantidade
+
+
+def custo_total(hotel, passagens, atracoes, carro):
+    return hotel + passagens + atracoes + carro
+
+
+def calcular_orcamento(catalogo, selecao):
+    orcamento = Orcamento()
+
+    if selecao.hotel:
+        preco = preco_hotel(catalogo, selecao.hotel)
+        if preco is None:
+            orcamento.nao_encontrados.append(f"hotel: {selecao.hotel}")
+        else:
+            orcamento.hotel = preco
+
+    for passagem_info in (selecao.passagem_ida, selecao.passagem_volta):
+        if passagem_info:
+            preco = preco_passagem(catalogo, passagem_info)
+            if preco is None:
+                orcamento.nao_encontrados.append(f"passagem: {passagem_info}")
+            else:
+                orcamento.passagens += preco
+
+    if selecao.carro:
+        preco = preco_carro(catalogo, selecao.carro)
+        if preco is None:
+            orcamento.nao_encontrados.append("carro: {} ({})".format(*selecao.carro))
+        else:
+            orcamento.carro = preco
+
+    nomes = catalogo.atracoes['Atrações'].tolist()
+    valores = catalogo.atracoes['Valor (R$)'].tolist()
+    quantidades = dict(zip(nomes, catalogo.atracoes['Quantidade'].tolist()))
+    # Mesmas regras do lote (_matriz_quantidades): vazio usa a quantidade da planilha, texto que não é número é inválido
+    for nome, quantidade in (selecao.quantidades or {}).items():
+        if quantidade is None or quantidade != quantidade:
+            continue
+        numero = float(pd.to_numeric(quantidade, errors='coerce'))
+        if nome not in quantidades:
+            orcamento.nao_encontrados.append(f"atração: {nome}")
+        elif numero != numero:
+            orcamento.nao_encontrados.append(f"quantidade inválida: {nome}")
+        else:
+            quantidades[nome] = numero
+    orcamento.atracoes = sum(subtotal_atracao(valor, quantidades[nome]) for nome, valor in zip(nomes, valores))
+
+    return orcamento
+
+
+# --- Cálculo em lote (vetorizado) ---
+
+def _posicoes(chaves, indice):
+    # Posição de cada chave no catálogo (-1 quando a chave é vazia ou não existe)
+    posicoes = pd.Series(chaves, dtype=object).map(indice)
+    return posicoes.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _com_preco(posicoes, coluna):
+    # Linhas sem preço (NaN: moeda sem cotação) contam como não encontradas: ficam fora do total
+    precos = coluna.to_numpy(dtype=float)
+    sem_preco = posicoes >= 0
+    sem_preco[sem_preco] = np.isnan(precos[posicoes[sem_preco]])
+    return np.where(sem_preco, -1, posicoes)
+
+
+def _precos(posicoes, coluna):
+    precos = np.zeros(len(posicoes))
+    encontrados = posicoes >= 0
+    precos[encontrados] = coluna.to_numpy(dtype=float)[posicoes[encontrados]]
+    return precos
+
+
+def _nao_encontrados(rotulo, chaves, posicoes):
+    informados = pd.Series(chaves, dtype=object).notna().to_numpy() & (posicoes < 0)
+    return np.where(informados, rotulo, '')
+
+
+def _matriz_quantidades(catalogo, cenarios):
+    # Quantidades (cenários x atrações): colunas "qtd:<nome>" ou coluna 'quantidades' com dicts;
+    # o que não for informado usa a quantidade da planilha. Devolve também, por cenário, as atrações desconhecidas e as
+    # quantidades que não são números (no formato de nao_encontrados)
+    nomes = catalogo.atracoes['Atrações'].tolist()
+    padrao = catalogo.atracoes['Quantidade'].to_numpy(dtype=float)
+    quantidades = np.broadcast_to(padrao, (len(cenarios), len(nomes))).copy()
+    desconhecidas = np.full(len(cenarios), '', dtype=object)
+
+    informadas = pd.DataFrame(index=cenarios.index)
+    colunas_qtd = [coluna for coluna in cenarios.columns if str(coluna).startswith(PREFIXO_QUANTIDADE)]
+    if colunas_qtd:
+        informadas = cenarios[colunas_qtd].rename(columns=lambda coluna: coluna[len(PREFIXO_QUANTIDADE):])
+    if 'quantidades' in cenarios.columns and len(cenarios):
+        registros = [q if isinstance(q, dict) else {} for q in cenarios['quantidades']]
+        informadas = informadas.combine_first(pd.DataFrame.from_records(registros, index=cenarios.index))
+
+    if not informadas.empty:
+        posicao_atracao = {nome: i for i, nome in enumerate(nomes)}
+        for nome in informadas.columns:
+            informados = informadas[nome].notna().to_numpy()
+            valores = pd.to_numeric(informadas[nome], errors='coerce').to_numpy(dtype=float)
+            presentes = ~np.isnan(valores)
+            if nome in posicao_atracao:
+                quantidades[presentes, posicao_atracao[nome]] = valores[presentes]
+                desconhecidas[informados & ~presentes] += f"quantidade inválida: {nome};"
+            else:
+                desconhecidas[informados] += f"atração: {nome};"
+    return quantidades, desconhecidas
+
+
+def calcular_lote(catalogo, cenarios):
+    # Calcula o orçamento de muitos cenários de uma vez (um DataFrame com COLUNAS_CENARIO)
+    cenarios = cenarios.reset_index(drop=True)
+
+    def coluna(nome):
+        if nome in cenarios.columns:
+            return cenarios[nome]
+        return pd.Series(None, index=cenarios.index, dtype=object)
+
+    hotel = _com_preco(_posicoes(coluna('hotel'), catalogo.indice_hoteis), catalogo.hoteis['Preço por Período (R$)'])
+    ida = _com_preco(_posicoes(coluna('passagem_ida'), catalogo.indice_passagens), catalogo.passagens['Total (R$)'])
+    volta = _com_preco(_posicoes(coluna('passagem_volta'), catalogo.indice_passagens), catalogo.passagens['Total (R$)'])
+    chaves_carro = pd.Series(list(zip(coluna('carro_tipo'), coluna('carro_locadora'))), dtype=object)
+    carro = _com_preco(_posicoes(chaves_carro.where(coluna('carro_tipo').notna(), None), catalogo.indice_carros), catalogo.aluguel_carro['Preço por Período (R$)'])
+
+    quantidades, atracoes_desconhecidas = _matriz_quantidades(catalogo, cenarios)
+
+    resultado = pd.DataFrame({
+        'Hotel (R$)': _precos(hotel, catalogo.hoteis['Preço por Período (R$)']),
+        'Passagens (R$)': _precos(ida, catalogo.passagens['Total (R$)']) + _precos(volta, catalogo.passagens['Total (R$)']),
+        'Atrações (R$)': quantidades @ np.nan_to_num(catalogo.atracoes['Valor (R$)'].to_numpy(dtype=float)),
+        'Carro (R$)': _precos(carro, catalogo.aluguel_carro['Preço por Período (R$)']),
+    })
+    resultado['Total (R$)'] = custo_total(resultado['Hotel (R$)'], resultado['Passagens (R$)'], resultado['Atrações (R$)'], resultado['Carro (R$)'])
+    # Valores em reais: arredonda para centavos (evita 550.5500000000001 na saída)
+    resultado = resultado.round(2)
+
+    nao_encontrados = (
+        pd.Series(_nao_encontrados('hotel;', coluna('hotel'), hotel))
+        + _nao_encontrados('passagem_ida;', coluna('passagem_ida'), ida)
+        + _nao_encontrados('passagem_volta;', coluna('passagem_volta'), volta)
+        + _nao_encontrados('carro;', coluna('carro_tipo'), carro)
+        + atracoes_desconhecidas
+    )
+    resultado['nao_encontrados'] = nao_encontrados.str.rstrip(';')
+
+    if 'id' in cenarios.columns:
+        resultado.insert(0, 'id', cenarios['id'])
+    return resultado
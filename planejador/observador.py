@@ -0,0 +1,71 @@
+"""Observador da planilha: detecta alterações e publica a nova versão dos dados.
+
+Uma thread por processo consulta periodicamente o mtime e o tamanho da
+planilha (polling via os.stat, sem dependências extras). Quando o arquivo
+muda, o snapshot é atualizado incrementalmente (só as abas alteradas são
+relidas) e a nova versão é publicada em uma única atribuição, de modo que
+todas as sessões passam a enxergá-la ao mesmo tempo.
+"""
+import logging
+import os
+import threading
+
+from planejador.snapshot import atualizar_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Intervalo padrão (segundos) entre duas verificações da planilha
+INTERVALO_VERIFICACAO = 2.0
+
+
+class ObservadorPlanilha:
+    def __init__(self, file_path, intervalo=INTERVALO_VERIFICACAO):
+        self.file_path = file_path
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+        self._assinatura = self._assinatura_arquivo()
+        # Versão publicada: lida pelas sessões sem lock (a troca é uma única atribuição)
+        self.versao, self.abas_alteradas = atualizar_snapshot(file_path)
+
+    def _assinatura_arquivo(self):
+        try:
+            estado = os.stat(self.file_path)
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def verificar(self):
+        # Confere a planilha uma vez; devolve True se uma nova versão foi publicada
+        assinatura = self._assinatura_arquivo()
+        if assinatura is None or assinatura == self._assinatura:
+            return False
+        try:
+            versao, alteradas = atualizar_snapshot(self.file_path)
+        except Exception:
+            # Arquivo ainda sendo gravado (zip incompleto, por exemplo): tenta de novo na próxima volta
+            logger.exception("Falha ao atualizar o snapshot de %s", self.file_path)
+            return False
+        self._assinatura = assinatura
+        if versao == self.versao:
+            return False
+        self.abas_alteradas = alteradas
+        self.versao = versao
+        logger.info("Planilha %s atualizada (versão %s, abas relidas: %s)", self.file_path, versao, alteradas or 'nenhuma')
+        return True
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self.verificar()
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name=f"observador-{os.path.basename(self.file_path)}", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,183 @@
+"""Busca das viagens completas mais baratas (hotel + ida + volta + carro).
+
+Em vez de laços aninhados sobre todas as combinações, cada componente é
+reduzido aos seus K melhores candidatos (ordenados por custo) dentro de cada
+grupo compatível, e as combinações são feitas por broadcasting NumPy de K x K.
+Como uma combinação entre as K melhores do total só pode usar componentes que
+estão entre os K melhores do seu grupo, o resultado é exato.
+
+Restrições consideradas:
+- hotel com Chegada e Partida preenchidas (Partida depois da Chegada);
+- ida e volta no sentido certo e na mesma rota invertida (ida GIG → POA
+  combina com volta POA → GIG);
+- dias de aluguel do carro entre o número de noites e noites + folga;
+- distância máxima do centro, número de passageiros (Hóspedes do hotel,
+  Passageiros do carro e Passageiros das passagens de ida e volta) e
+  orçamento máximo.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from planejador.catalogo import CHAVE_CARRO, CHAVE_HOTEL, CHAVE_PASSAGEM
+
+# Limite de candidatos por componente ao ampliar a busca quando o orçamento descarta combinações
+MAXIMO_CANDIDATOS = 4096
+
+
+@dataclass(frozen=True)
+class Restricoes:
+    passageiros: int = 0 # 0 = não filtra por capacidade
+    distancia_maxima: float = None # km do centro; None = sem limite
+    orcamento_maximo: float = None # R$; None = sem limite
+    folga_dias_carro: int = 1 # carro pode ter até noites + folga dias (retirada na chegada, devolução na partida)
+    incluir_carro: bool = True
+    custo_atracoes: float = 0.0 # somado a todas as viagens (não depende da combinação)
+    peso_distancia: float = 0.0 # R$ por km do centro somados à pontuação (0 = só o custo)
+
+
+def _menores_somas(custos_a, custos_b, k):
+    # Índices (i, j) dos k menores custos_a[i] + custos_b[j], sem montar a matriz completa
+    if len(custos_a) == 0 or len(custos_b) == 0:
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio, np.empty(0)
+    melhores_a = np.argsort(custos_a, kind='stable')[:k]
+    melhores_b = np.argsort(custos_b, kind='stable')[:k]
+    somas = custos_a[melhores_a][:, None] + custos_b[melhores_b][None, :]
+    planas = somas.ravel()
+    ordem = np.argsort(planas, kind='stable')[:k]
+    linhas, colunas = np.divmod(ordem, len(melhores_b))
+    return melhores_a[linhas], melhores_b[colunas], planas[ordem]
+
+
+def _top_k(custos, k, *arrays):
+    ordem = np.argsort(custos, kind='stable')[:k]
+    return (custos[ordem],) + tuple(array[ordem] for array in arrays)
+
+
+def candidatos_hoteis(df_hoteis, restricoes):
+    noites = df_hoteis['Noites'] # calculado na limpeza da aba
+    # Hotéis sem preço (moeda sem cotação) não entram nas sugestões
+    validos = df_hoteis[CHAVE_HOTEL].notna() & noites.notna() & (noites > 0) & df_hoteis['Preço por Período (R$)'].notna()
+    if restricoes.distancia_maxima is not None:
+        validos &= df_hoteis['Distância do Centro (km)'] <= restricoes.distancia_maxima
+    if restricoes.passageiros:
+        validos &= df_hoteis['Hóspedes'] >= restricoes.passageiros
+    posicoes = np.flatnonzero(validos.to_numpy())
+    return posicoes, noites.to_numpy()[posicoes].astype(np.int64)
+
+
+def candidatos_carros(df_carros, restricoes):
+    validos = df_carros[CHAVE_CARRO].notna().all(axis=1) & df_carros['Preço por Período (R$)'].notna()
+    if restricoes.passageiros:
+        validos &= df_carros['Passageiros'] >= restricoes.passageiros
+    return np.flatnonzero(validos.to_numpy())
+
+
+def _melhores_hospedagens(catalogo, restricoes, k):
+    # Pares (hotel, carro) compatíveis em dias, agrupados pelo número de noites
+    precos_hoteis = catalogo.hoteis['Preço por Período (R$)'].to_numpy(dtype=float)
+    distancias = catalogo.hoteis['Distância do Centro (km)'].to_numpy(dtype=float)
+    posicoes_hoteis, noites = candidatos_hoteis(catalogo.hoteis, restricoes)
+    pontuacao_hoteis = precos_hoteis[posicoes_hoteis] + restricoes.peso_distancia * distancias[posicoes_hoteis]
+
+    if not restricoes.incluir_carro:
+        pontuacao, hoteis = _top_k(pontuacao_hoteis, k, posicoes_hoteis)
+        return pontuacao, hoteis, np.full(len(hoteis), -1)
+
+    precos_carros = catalogo.aluguel_carro['Preço por Período (R$)'].to_numpy(dtype=float)
+    dias_carros = catalogo.aluguel_carro['Dias'].to_numpy()
+    posicoes_carros = candidatos_carros(catalogo.aluguel_carro, restricoes)
+
+    pontuacoes, hoteis, carros = [], [], []
+    for quantidade_noites in np.unique(noites):
+        do_grupo = posicoes_hoteis[noites == quantidade_noites]
+        dias = dias_carros[posicoes_carros]
+        compativeis = posicoes_carros[(dias >= quantidade_noites) & (dias <= quantidade_noites + restricoes.folga_dias_carro)]
+        i, j, soma = _menores_somas(pontuacao_hoteis[noites == quantidade_noites], precos_carros[compativeis], k)
+        pontuacoes.append(soma)
+        hoteis.append(do_grupo[i])
+        carros.append(compativeis[j])
+
+    if not pontuacoes:
+        return np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return _top_k(np.concatenate(pontuacoes), k, np.concatenate(hoteis), np.concatenate(carros))
+
+
+def melhores_pares_voos(catalogo, k, passageiros=0):
+    # Pares (ida, volta) na mesma rota invertida; passageiros > 0 descarta passagens para menos pessoas
+    # As partições por rota do catálogo dão, para cada rota de ida, as voltas da rota invertida em uma busca
+    totais = catalogo.passagens['Total (R$)'].to_numpy(dtype=float)
+    # Passagens sem preço (moeda sem cotação) ficam de fora
+    validas = ~np.isnan(totais)
+    if passageiros:
+        validas &= catalogo.passagens['Passageiros'].to_numpy() >= passageiros
+
+    custos, posicoes_ida, posicoes_volta = [], [], []
+    for (sentido, origem, destino), ida in sorted(catalogo.passagens_por_rota.items()):
+        if sentido != 'Ida':
+            continue
+        volta = catalogo.posicoes_passagens('Volta', origem=destino, destino=origem)
+        ida, volta = ida[validas[ida]], volta[validas[volta]]
+        i, j, soma = _menores_somas(totais[ida], totais[volta], k)
+        custos.append(soma)
+        posicoes_ida.append(ida[i])
+        posicoes_volta.append(volta[j])
+
+    if not custos:
+        return np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return _top_k(np.concatenate(custos), k, np.concatenate(posicoes_ida), np.concatenate(posicoes_volta))
+
+
+def _combinar(catalogo, restricoes, k):
+    pontuacao_hospedagem, hoteis, carros = _melhores_hospedagens(catalogo, restricoes, k)
+    custo_voos, idas, voltas = melhores_pares_voos(catalogo, k, restricoes.passageiros)
+    i, j, pontuacao = _menores_somas(pontuacao_hospedagem, custo_voos, k)
+
+    precos_hoteis = catalogo.hoteis['Preço por Período (R$)'].to_numpy(dtype=float)
+    precos_carros = catalogo.aluguel_carro['Preço por Período (R$)'].to_numpy(dtype=float)
+    totais_passagens = catalogo.passagens['Total (R$)'].to_numpy(dtype=float)
+
+    hotel, carro, ida, volta = hoteis[i], carros[i], idas[j], voltas[j]
+    custo_carro = np.zeros(len(carro))
+    com_carro = carro >= 0
+    custo_carro[com_carro] = precos_carros[carro[com_carro]]
+    return pd.DataFrame({
+        'posicao_hotel': hotel,
+        'posicao_ida': ida,
+        'posicao_volta': volta,
+        'posicao_carro': carro,
+        'Hotel (R$)': precos_hoteis[hotel],
+        'Passagens (R$)': totais_passagens[ida] + totais_passagens[volta],
+        'Atrações (R$)': restricoes.custo_atracoes,
+        'Carro (R$)': custo_carro,
+        'Pontuação': pontuacao + restricoes.custo_atracoes,
+    })
+
+
+def sugerir_viagens(catalogo, restricoes=Restricoes(), k=5):
+    # Devolve as k melhores viagens completas (menor pontuação; sem peso de distância, menor custo)
+    tentativa = k
+    while True:
+        viagens = _combinar(catalogo, restricoes, tentativa)
+        viagens['Total (R$)'] = viagens[['Hotel (R$)', 'Passagens (R$)', 'Atrações (R$)', 'Carro (R$)']].sum(axis=1)
+        if restricoes.orcamento_maximo is not None:
+            dentro = viagens['Total (R$)'] <= restricoes.orcamento_maximo
+            # Com peso de distância, as melhores pontuações podem estourar o orçamento: amplia a busca
+            if restricoes.peso_distancia and dentro.sum() < k and not dentro.all() and tentativa < MAXIMO_CANDIDATOS:
+                tentativa *= 4
+                continue
+            viagens = viagens[dentro]
+        break
+
+    viagens = viagens.head(k).reset_index(drop=True)
+    viagens.insert(0, 'Hotel', catalogo.hoteis[CHAVE_HOTEL].to_numpy()[viagens['posicao_hotel']])
+    viagens.insert(1, 'Passagem de Ida', catalogo.passagens[CHAVE_PASSAGEM].to_numpy()[viagens['posicao_ida']])
+    viagens.insert(2, 'Passagem de Volta', catalogo.passagens[CHAVE_PASSAGEM].to_numpy()[viagens['posicao_volta']])
+    tem_carro = viagens['posicao_carro'].to_numpy() >= 0
+    for coluna in CHAVE_CARRO:
+        valores = np.full(len(viagens), None, dtype=object)
+        valores[tem_carro] = catalogo.aluguel_carro[coluna].to_numpy()[viagens['posicao_carro'].to_numpy()[tem_carro]]
+        viagens.insert(viagens.columns.get_loc('posicao_hotel'), coluna, valores)
+    return viagens
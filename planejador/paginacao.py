@@ -0,0 +1,79 @@
+"""Filtragem, ordenação e paginação dos catálogos (hotéis, passagens e carros).
+
+Os filtros são avaliados de forma vetorizada sobre as colunas do DataFrame em
+cache e devolvem apenas as posições da página visível; o app só emite os
+cartões dessa página, então o custo de renderização não cresce com o catálogo.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Filtro:
+    coluna: str
+    # 'faixa' (mínimo e máximo), 'maximo', 'minimo' ou 'opcoes' (lista de valores aceitos)
+    tipo: str
+    rotulo: str
+
+
+@dataclass(frozen=True)
+class Ordenacao:
+    rotulo: str
+    coluna: str
+    crescente: bool = True
+
+
+def limites(df, coluna):
+    # Menor e maior valor numérico da coluna, para montar os sliders de filtro
+    # (0.0, 0.0) quando não há nenhum valor, o que o app trata como "nada a filtrar"
+    valores = df[coluna].to_numpy(dtype=float)
+    valores = valores[~np.isnan(valores)]
+    if len(valores) == 0:
+        return 0.0, 0.0
+    return float(valores.min()), float(valores.max())
+
+
+def opcoes(df, coluna):
+    return sorted(df[coluna].dropna().unique().tolist())
+
+
+def filtrar_e_ordenar(df, filtros, valores, ordenacao=None):
+    # Devolve as posições (0..len(df)-1) das linhas que passam nos filtros, já na ordem pedida.
+    # Linhas sem valor (NaN) não passam em filtros numéricos; o app só envia os sliders que o usuário estreitou
+    mascara = np.ones(len(df), dtype=bool)
+    for filtro in filtros:
+        valor = valores.get(filtro.coluna)
+        if valor is None:
+            continue
+        coluna = df[filtro.coluna].to_numpy()
+        if filtro.tipo == 'faixa':
+            minimo, maximo = valor
+            mascara &= (coluna >= minimo) & (coluna <= maximo)
+        elif filtro.tipo == 'maximo':
+            mascara &= coluna <= valor
+        elif filtro.tipo == 'minimo':
+            mascara &= coluna >= valor
+        elif filtro.tipo == 'opcoes':
+            if valor:
+                mascara &= np.isin(coluna, list(valor))
+        else:
+            raise ValueError(f"Tipo de filtro desconhecido: {filtro.tipo}")
+
+    posicoes = np.flatnonzero(mascara)
+    if ordenacao is not None and len(posicoes):
+        chaves = df[ordenacao.coluna].iloc[posicoes].reset_index(drop=True)
+        ordem = chaves.sort_values(ascending=ordenacao.crescente, kind='stable', na_position='last').index.to_numpy()
+        posicoes = posicoes[ordem]
+    return posicoes
+
+
+def total_paginas(quantidade, tamanho_pagina):
+    return max(1, -(-quantidade // tamanho_pagina))
+
+
+def pagina(posicoes, numero_pagina, tamanho_pagina):
+    # numero_pagina começa em 1; valores fora do intervalo são ajustados para a última página válida
+    numero_pagina = min(max(1, numero_pagina), total_paginas(len(posicoes), tamanho_pagina))
+    inicio = (numero_pagina - 1) * tamanho_pagina
+    return posicoes[inicio:inicio + tamanho_pagina]
@@ -0,0 +1,139 @@
+"""Planos salvos: seleções completas de uma viagem guardadas em SQLite.
+
+Cada plano é uma linha da tabela planos (hotel, passagens de ida e volta,
+carro e as quantidades das atrações) com um código aleatório para links
+(?plano=Xq3...; secrets.token_urlsafe): quem não recebeu o link não tem como
+adivinhar os planos dos outros. O rowid fica interno (ordem de criação).
+Abrir um link é uma única leitura pelo índice do código (UNIQUE). O banco usa
+WAL: leituras de outras sessões não esperam as gravações.
+
+As seleções são guardadas pelas chaves de texto da planilha (as mesmas que
+a CLI e a API aceitam), então os totais de muitos planos saem de uma única
+chamada a motor.calcular_lote.
+"""
+import datetime
+import json
+import os
+import secrets
+import sqlite3
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+from planejador.motor import Selecao, calcular_lote
+
+# Banco dos planos (na raiz do projeto, fora de .cache_viagem: não é um cache que pode ser apagado)
+ARQUIVO_PLANOS = os.environ.get('VIAGEM_PLANOS', 'planos.sqlite')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS planos (
+    id INTEGER PRIMARY KEY,
+    codigo TEXT NOT NULL UNIQUE,
+    viagem TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    criado_em TEXT NOT NULL,
+    hotel TEXT,
+    passagem_ida TEXT,
+    passagem_volta TEXT,
+    carro_tipo TEXT,
+    carro_locadora TEXT,
+    quantidades TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS planos_viagem ON planos (viagem, id);
+"""
+
+# Bytes aleatórios do código (11 caracteres em base64 para URL)
+BYTES_CODIGO = 8
+
+_COLUNAS = ['codigo', 'viagem', 'nome', 'criado_em', 'hotel', 'passagem_ida', 'passagem_volta', 'carro_tipo', 'carro_locadora', 'quantidades']
+
+Plano = namedtuple('Plano', ['codigo', 'viagem', 'nome', 'criado_em', 'selecao'])
+
+
+def _plano(linha):
+    codigo, viagem, nome, criado_em, hotel, ida, volta, carro_tipo, carro_locadora, quantidades = linha
+    selecao = Selecao(
+        hotel=hotel,
+        passagem_ida=ida,
+        passagem_volta=volta,
+        carro=(carro_tipo, carro_locadora) if carro_tipo is not None else None,
+        quantidades=json.loads(quantidades),
+    )
+    return Plano(codigo, viagem, nome, criado_em, selecao)
+
+
+class ArmazemPlanos:
+    def __init__(self, caminho=ARQUIVO_PLANOS):
+        self.caminho = caminho
+        # Uma conexão por processo, compartilhada pelas sessões (threads) do app e protegida pelo lock
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        with self._lock:
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            # Com WAL, NORMAL só sincroniza no checkpoint: um plano salvo sobrevive a uma queda do app
+            self._conexao.execute('PRAGMA synchronous=NORMAL')
+            self._conexao.executescript(_ESQUEMA)
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+    def salvar(self, viagem, nome, selecao):
+        # Grava um novo plano e devolve o seu código
+        carro_tipo, carro_locadora = selecao.carro if selecao.carro else (None, None)
+        while True:
+            codigo = secrets.token_urlsafe(BYTES_CODIGO)
+            try:
+                self._inserir(codigo, viagem, nome, selecao, carro_tipo, carro_locadora)
+                return codigo
+            except sqlite3.IntegrityError as erro:
+                # Código já usado (improvável com 64 bits): sorteia outro
+                if 'planos.codigo' not in str(erro):
+                    raise
+
+    def _inserir(self, codigo, viagem, nome, selecao, carro_tipo, carro_locadora):
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                'INSERT INTO planos (codigo, viagem, nome, criado_em, hotel, passagem_ida, passagem_volta, carro_tipo, carro_locadora, quantidades)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    codigo,
+                    viagem,
+                    nome,
+                    datetime.datetime.now().isoformat(timespec='seconds'),
+                    selecao.hotel,
+                    selecao.passagem_ida,
+                    selecao.passagem_volta,
+                    carro_tipo,
+                    carro_locadora,
+                    json.dumps(selecao.quantidades or {}, ensure_ascii=False),
+                ),
+            )
+
+    def carregar(self, codigo):
+        # Plano pelo código (busca pelo índice único); None se não existir
+        with self._lock:
+            linha = self._conexao.execute(f'SELECT {", ".join(_COLUNAS)} FROM planos WHERE codigo = ?', (str(codigo).strip(),)).fetchone()
+        return None if linha is None else _plano(linha)
+
+    def remover(self, codigo):
+        with self._lock, self._conexao:
+            return self._conexao.execute('DELETE FROM planos WHERE codigo = ?', (str(codigo).strip(),)).rowcount > 0
+
+    def listar(self, viagem):
+        # Planos da viagem (mais recentes primeiro) como um DataFrame no formato de cenários do motor:
+        # codigo, nome, criado_em, hotel, passagem_ida, passagem_volta, carro_tipo, carro_locadora e quantidades (dict)
+        with self._lock:
+            linhas = self._conexao.execute(
+                f'SELECT {", ".join(_COLUNAS)} FROM planos WHERE viagem = ? ORDER BY id DESC', (viagem,)
+            ).fetchall()
+        planos = pd.DataFrame(linhas, columns=_COLUNAS)
+        planos['quantidades'] = planos['quantidades'].map(json.loads)
+        return planos.drop(columns='viagem')
+
+
+def totais_planos(catalogo, planos):
+    # Orçamento de todos os planos listados de uma vez (motor.calcular_lote), com o código como id
+    cenarios = planos.rename(columns={'codigo': 'id'})
+    return calcular_lote(catalogo, cenarios)
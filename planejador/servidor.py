@@ -0,0 +1,154 @@
+"""API HTTP local (JSON) para calcular orçamentos sem o navegador.
+
+Usa só a biblioteca padrão (http.server). O catálogo é carregado uma vez e
+compartilhado por todas as requisições; um ObservadorPlanilha troca a
+versão dos dados quando a planilha muda.
+
+Rotas:
+- GET  /saude      -> {"versao": "..."}
+- GET  /metricas   -> métricas no formato de texto do Prometheus (com PLANEJADOR_METRICAS ativo)
+- POST /orcamento  -> um cenário (objeto) ou vários (lista); mesmas chaves do CLI
+"""
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from planejador import metricas
+from planejador.cambio import carregar_cambio
+from planejador.catalogo import montar_catalogo
+from planejador.motor import COLUNAS_CENARIO, PREFIXO_QUANTIDADE, calcular_lote
+from planejador.observador import ObservadorPlanilha
+from planejador.snapshot import ler_versao
+
+logger = logging.getLogger(__name__)
+
+# Limite do corpo de uma requisição (bytes)
+TAMANHO_MAXIMO_CORPO = 32 * 1024 * 1024
+
+
+class CatalogoCompartilhado:
+    # Catálogo único do processo, recarregado só quando o observador publica uma nova versão
+    # (ou quando o arquivo de câmbio muda)
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.observador = ObservadorPlanilha(file_path).iniciar()
+        self._lock = threading.Lock()
+        self._versao = None
+        self._catalogo = None
+
+    def atual(self):
+        cambio = carregar_cambio()
+        versao = (self.observador.versao, cambio.chave)
+        if versao != self._versao:
+            with self._lock:
+                if versao != self._versao:
+                    self._catalogo = montar_catalogo(*ler_versao(self.file_path, versao[0]), cambio=cambio)
+                    self._versao = versao
+        return self._versao[0], self._catalogo
+
+
+def _erro_cenario(cenario):
+    # Mensagem do primeiro campo com tipo inválido no cenário (objeto JSON); None se estiver tudo certo
+    for nome in COLUNAS_CENARIO:
+        if not isinstance(cenario.get(nome), (str, type(None))):
+            return f"'{nome}' deve ser um texto"
+    quantidades = cenario.get('quantidades')
+    if quantidades is not None and not isinstance(quantidades, dict):
+        return "'quantidades' deve ser um objeto {atração: quantidade}"
+    for nome, valor in (quantidades or {}).items():
+        if not isinstance(valor, (int, float, str, type(None))) or isinstance(valor, bool):
+            return f"quantidade de '{nome}' deve ser um número"
+    for nome, valor in cenario.items():
+        if nome.startswith(PREFIXO_QUANTIDADE) and (not isinstance(valor, (int, float, str, type(None))) or isinstance(valor, bool)):
+            return f"'{nome}' deve ser um número"
+    if isinstance(cenario.get('id'), (dict, list)):
+        return "'id' deve ser um texto ou número"
+    return None
+
+
+def _criar_handler(catalogo_compartilhado):
+    class Handler(BaseHTTPRequestHandler):
+        def _responder(self, status, conteudo):
+            corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            if self.path == '/metricas':
+                corpo = metricas.texto_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+                return
+            if self.path != '/saude':
+                self._responder(404, {'erro': 'rota não encontrada'})
+                return
+            versao, _ = catalogo_compartilhado.atual()
+            self._responder(200, {'versao': versao})
+
+        def do_POST(self):
+            if self.path != '/orcamento':
+                self._responder(404, {'erro': 'rota não encontrada'})
+                return
+            try:
+                tamanho = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                tamanho = -1
+            if tamanho < 0:
+                self._responder(400, {'erro': 'Content-Length inválido'})
+                return
+            if tamanho > TAMANHO_MAXIMO_CORPO:
+                self._responder(413, {'erro': 'corpo da requisição grande demais'})
+                return
+            try:
+                cenarios = json.loads(self.rfile.read(tamanho) or b'null')
+            except ValueError as e:
+                self._responder(400, {'erro': f'JSON inválido: {e}'})
+                return
+            if not isinstance(cenarios, (dict, list)) or (isinstance(cenarios, list) and not all(isinstance(c, dict) for c in cenarios)):
+                self._responder(400, {'erro': 'envie um objeto ou uma lista de objetos'})
+                return
+            lista = [cenarios] if isinstance(cenarios, dict) else cenarios
+            for numero, cenario in enumerate(lista):
+                erro = _erro_cenario(cenario)
+                if erro is not None:
+                    self._responder(400, {'erro': f'cenário {numero}: {erro}'})
+                    return
+
+            try:
+                versao, catalogo = catalogo_compartilhado.atual()
+                metricas.contar('orcamentos_http', len(lista))
+                with metricas.medir('orcamento_http'):
+                    resultado = calcular_lote(catalogo, pd.DataFrame(lista, index=range(len(lista))))
+                registros = resultado.to_dict(orient='records')
+                orcamentos = registros[0] if isinstance(cenarios, dict) else registros
+            except Exception:
+                # Um erro inesperado vira uma resposta JSON, em vez de derrubar a conexão sem resposta
+                logger.exception("Erro ao calcular orçamentos")
+                self._responder(500, {'erro': 'erro interno ao calcular os orçamentos'})
+                return
+            self._responder(200, {'versao': versao, 'orcamentos': orcamentos})
+
+        def log_message(self, formato, *args):
+            logger.info("%s - %s", self.address_string(), formato % args)
+
+    return Handler
+
+
+def servir(file_path, host='127.0.0.1', porta=8000):
+    servidor = ThreadingHTTPServer((host, porta), _criar_handler(CatalogoCompartilhado(file_path)))
+    logger.info("Servindo orçamentos de %s em http://%s:%s", file_path, host, porta)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
@@ -0,0 +1,274 @@
+"""Snapshot binário (Feather) das abas já limpas da planilha de viagem.
+
+O parse do XLSX pelo openpyxl é a etapa mais lenta do app. Aqui os quatro
+DataFrames tipados são gravados uma única vez em arquivos Feather sem
+compressão, chaveados pelo mtime e pelo hash do conteúdo da planilha. Os
+workers seguintes apenas mapeiam esses arquivos em memória.
+
+Quando a planilha muda, só as abas alteradas são lidas de novo: cada aba
+tem uma impressão digital tirada dos CRCs das partes do arquivo XLSX (que é
+um zip), sem descompactar nada; as abas com a mesma impressão são
+reaproveitadas do snapshot anterior.
+"""
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from planejador import historico
+from planejador.dados import ABAS, Problema, ler_planilha
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do snapshot; incrementar quando a limpeza dos dados mudar
+FORMATO_SNAPSHOT = 9
+
+# Diretório (ao lado da planilha) onde os snapshots são gravados
+DIRETORIO_CACHE = '.cache_viagem'
+
+# Quantos snapshots antigos manter além do atual (leitores em andamento ainda podem usá-los)
+SNAPSHOTS_ANTIGOS_MANTIDOS = 1
+
+# Células inválidas encontradas na leitura de cada aba, gravadas junto com a versão
+ARQUIVO_PROBLEMAS = 'problemas.json'
+
+_TAMANHO_BLOCO_HASH = 1024 * 1024
+
+_NS_PLANILHA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_RELACOES = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PACOTE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Partes compartilhadas por todas as abas: strings e estilos (formatos de data) mudam o conteúdo lido
+_PARTES_COMPARTILHADAS = ('xl/sharedStrings.xml', 'xl/styles.xml')
+
+
+def hash_arquivo(file_path):
+    # SHA-256 do conteúdo da planilha, lido em blocos para não carregar o arquivo inteiro
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(_TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _caminho_parte(alvo):
+    # Alvos relativos são resolvidos a partir de xl/; os absolutos começam com "/"
+    if alvo.startswith('/'):
+        return alvo.lstrip('/')
+    return posixpath.normpath(posixpath.join('xl', alvo))
+
+
+def impressoes_abas(file_path):
+    # Impressão digital de cada aba: CRC da parte XML da aba + CRCs das partes compartilhadas.
+    # Devolve None quando o arquivo não é um XLSX legível (nesse caso todas as abas são relidas).
+    try:
+        with zipfile.ZipFile(file_path) as pacote:
+            partes = {info.filename: info.CRC for info in pacote.infolist()}
+            workbook = ElementTree.fromstring(pacote.read('xl/workbook.xml'))
+            relacoes = ElementTree.fromstring(pacote.read('xl/_rels/workbook.xml.rels'))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return None
+
+    alvos = {
+        relacao.get('Id'): _caminho_parte(relacao.get('Target'))
+        for relacao in relacoes.iter(f'{_NS_PACOTE}Relationship')
+    }
+    parte_por_aba = {
+        aba.get('name'): alvos.get(aba.get(f'{_NS_RELACOES}id'))
+        for aba in workbook.iter(f'{_NS_PLANILHA}sheet')
+    }
+    compartilhadas = '-'.join(f"{partes.get(parte, 0):08x}" for parte in _PARTES_COMPARTILHADAS)
+
+    impressoes = {}
+    for chave, nome in ABAS.items():
+        parte = parte_por_aba.get(nome)
+        if parte not in partes:
+            return None
+        impressoes[chave] = f"{partes[parte]:08x}-{compartilhadas}"
+    return impressoes
+
+
+def diretorio_snapshots(file_path):
+    pasta, nome = os.path.split(os.path.abspath(file_path))
+    return os.path.join(pasta, DIRETORIO_CACHE, os.path.splitext(nome)[0])
+
+
+def _ler_manifesto(caminho_manifesto):
+    try:
+        with open(caminho_manifesto, encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if manifesto.get('formato') != FORMATO_SNAPSHOT:
+        return None
+    return manifesto
+
+
+def _gravar_json_atomico(caminho, conteudo):
+    # Grava em arquivo temporário e troca com os.replace para que leitores nunca vejam JSON parcial
+    fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def _tipo_texto(tipo_arrow):
+    # Mantém os textos nos buffers Arrow (string[pyarrow]) em vez de convertê-los em objetos Python
+    if tipo_arrow in (pa.string(), pa.large_string()):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+def _ler_abas(pasta_versao, chaves):
+    # memory_map=True: as páginas vêm do cache do sistema operacional, compartilhadas entre processos.
+    # split_blocks=True evita consolidar as colunas em blocos novos: colunas numéricas sem nulos e os textos
+    # apontam direto para o arquivo mapeado (somente leitura), sem cópia
+    return {
+        chave: feather.read_table(os.path.join(pasta_versao, f'{chave}.feather'), memory_map=True)
+        .to_pandas(types_mapper=_tipo_texto, split_blocks=True)
+        for chave in chaves
+    }
+
+
+def _ler_snapshot(pasta_versao):
+    return tuple(_ler_abas(pasta_versao, ABAS).values())
+
+
+def _ler_problemas(pasta_versao):
+    # {chave: [dict do Problema, ...]}; snapshots sem o arquivo não têm problemas registrados
+    try:
+        with open(os.path.join(pasta_versao, ARQUIVO_PROBLEMAS), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_snapshot(file_path, pasta_base, sha256, impressoes, manifesto_anterior):
+    # Devolve (pasta da versão, abas que precisaram ser lidas da planilha).
+    # O nome da pasta (a versão dos dados) inclui o formato: um snapshot de formato antigo nunca é reaproveitado
+    pasta_versao = os.path.join(pasta_base, f'{FORMATO_SNAPSHOT}-{sha256[:16]}')
+    if os.path.isdir(pasta_versao):
+        return pasta_versao, []
+
+    # Abas com a mesma impressão digital da versão anterior são reaproveitadas sem novo parse
+    reaproveitaveis = {}
+    if manifesto_anterior and impressoes and manifesto_anterior.get('impressoes'):
+        pasta_anterior = os.path.join(pasta_base, manifesto_anterior['versao'])
+        for chave in ABAS:
+            arquivo_anterior = os.path.join(pasta_anterior, f'{chave}.feather')
+            if manifesto_anterior['impressoes'].get(chave) == impressoes[chave] and os.path.isfile(arquivo_anterior):
+                reaproveitaveis[chave] = arquivo_anterior
+    alteradas = [chave for chave in ABAS if chave not in reaproveitaveis]
+
+    # Grava tudo em uma pasta temporária e a renomeia de uma vez (outro worker pode estar gravando também)
+    temporaria = tempfile.mkdtemp(dir=pasta_base, prefix='.tmp-')
+    try:
+        os.chmod(temporaria, 0o755)
+        problemas = {}
+        if reaproveitaveis:
+            anteriores = _ler_problemas(pasta_anterior)
+            problemas.update((chave, anteriores.get(chave, [])) for chave in reaproveitaveis)
+        for chave, arquivo_anterior in reaproveitaveis.items():
+            shutil.copyfile(arquivo_anterior, os.path.join(temporaria, f'{chave}.feather'))
+        abas, problemas_lidos = ler_planilha(file_path, alteradas)
+        for chave, df in abas.items():
+            df.reset_index(drop=True).to_feather(os.path.join(temporaria, f'{chave}.feather'), compression='uncompressed')
+        problemas.update((chave, [problema._asdict() for problema in lista]) for chave, lista in problemas_lidos.items())
+        _gravar_json_atomico(os.path.join(temporaria, ARQUIVO_PROBLEMAS), {chave: problemas.get(chave, []) for chave in ABAS})
+        os.rename(temporaria, pasta_versao)
+    except OSError:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        if not os.path.isdir(pasta_versao):
+            raise
+    return pasta_versao, alteradas
+
+
+def _registrar_historico(file_path, pasta_versao, versao_anterior, alteradas, mtime_ns):
+    # Acrescenta a versão ao histórico de preços. Se a versão anterior do snapshot já está no histórico, só as
+    # abas relidas podem ter mudado; senão (histórico novo ou atrasado) todas as abas são comparadas.
+    # Uma falha no histórico não impede o uso da planilha
+    versao = os.path.basename(pasta_versao)
+    try:
+        registrada = historico.versao_registrada(file_path)
+        if registrada == versao:
+            return
+        chaves = alteradas if registrada is not None and registrada == versao_anterior else list(ABAS)
+        chaves = [chave for chave in chaves if chave in historico.ABAS_HISTORICO]
+        historico.registrar_versao(file_path, versao, _ler_abas(pasta_versao, chaves), pd.Timestamp(mtime_ns))
+    except Exception:
+        logger.exception("Falha ao registrar a versão %s no histórico de preços de %s", versao, file_path)
+
+
+def _remover_snapshots_antigos(pasta_base, versao_atual):
+    versoes = [
+        os.path.join(pasta_base, nome) for nome in os.listdir(pasta_base)
+        if nome != versao_atual and not nome.startswith('.') and os.path.isdir(os.path.join(pasta_base, nome))
+    ]
+    versoes.sort(key=os.path.getmtime, reverse=True)
+    for pasta in versoes[SNAPSHOTS_ANTIGOS_MANTIDOS:]:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def atualizar_snapshot(file_path):
+    # Garante que o snapshot corresponde à planilha atual.
+    # Devolve (versão dos dados, abas que foram lidas da planilha nesta chamada).
+    pasta_base = diretorio_snapshots(file_path)
+    caminho_manifesto = os.path.join(pasta_base, 'manifesto.json')
+    estado = os.stat(file_path)
+    manifesto = _ler_manifesto(caminho_manifesto)
+
+    # Caminho rápido: mesmo mtime e tamanho, nem é preciso recalcular o hash
+    if manifesto and manifesto['mtime_ns'] == estado.st_mtime_ns and manifesto['tamanho'] == estado.st_size:
+        if os.path.isdir(os.path.join(pasta_base, manifesto['versao'])):
+            _registrar_historico(file_path, os.path.join(pasta_base, manifesto['versao']), manifesto['versao'], [], estado.st_mtime_ns)
+            return manifesto['versao'], []
+
+    sha256 = hash_arquivo(file_path)
+    os.makedirs(pasta_base, exist_ok=True)
+    impressoes = impressoes_abas(file_path)
+
+    if manifesto and manifesto['sha256'] == sha256 and os.path.isdir(os.path.join(pasta_base, manifesto['versao'])):
+        # Arquivo apenas "tocado" (mtime mudou, conteúdo igual): atualiza o manifesto e reaproveita o snapshot
+        pasta_versao, alteradas = os.path.join(pasta_base, manifesto['versao']), []
+    else:
+        pasta_versao, alteradas = _gravar_snapshot(file_path, pasta_base, sha256, impressoes, manifesto)
+
+    versao = os.path.basename(pasta_versao)
+    _gravar_json_atomico(caminho_manifesto, {
+        'formato': FORMATO_SNAPSHOT,
+        'planilha': os.path.basename(file_path),
+        'mtime_ns': estado.st_mtime_ns,
+        'tamanho': estado.st_size,
+        'sha256': sha256,
+        'versao': versao,
+        'impressoes': impressoes,
+    })
+    _registrar_historico(file_path, pasta_versao, manifesto and manifesto['versao'], alteradas, estado.st_mtime_ns)
+    _remover_snapshots_antigos(pasta_base, versao)
+    return versao, alteradas
+
+
+def ler_versao(file_path, versao):
+    # Lê (hotéis, aluguel de carro, atrações, passagens) de uma versão já gravada do snapshot
+    return _ler_snapshot(os.path.join(diretorio_snapshots(file_path), versao))
+
+
+def ler_problemas(file_path, versao):
+    # Problemas de leitura (Problema) de uma versão já gravada, na ordem das abas
+    problemas = _ler_problemas(os.path.join(diretorio_snapshots(file_path), versao))
+    return tuple(Problema(**problema) for chave in ABAS for problema in problemas.get(chave, []))
+
+
+def carregar_planilha(file_path):
+    # Devolve (hotéis, aluguel de carro, atrações, passagens) a partir do snapshot sempre que possível
+    versao, _ = atualizar_snapshot(file_path)
+    return ler_versao(file_path, versao)
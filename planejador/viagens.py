@@ -0,0 +1,102 @@
+"""Registro das viagens: várias planilhas no mesmo formato da Viagem.xlsx.
+
+A descoberta só lista arquivos (sem abrir nenhuma planilha), então o custo
+de inicialização não cresce com o número de viagens. Os dados de uma viagem
+(snapshot e observador da planilha) só são preparados no primeiro acesso, e
+no máximo MAXIMO_VIAGENS_CARREGADAS ficam ativas ao mesmo tempo: a menos
+usada recentemente tem o observador parado.
+"""
+import glob
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from planejador.observador import ObservadorPlanilha
+
+# Planilha principal (fica na raiz do projeto) e pasta com as demais viagens (uma planilha por viagem)
+PLANILHA_PADRAO = 'Viagem.xlsx'
+DIRETORIO_VIAGENS = 'viagens'
+
+# Quantas viagens mantêm dados e observador ativos ao mesmo tempo
+MAXIMO_VIAGENS_CARREGADAS = int(os.environ.get('VIAGEM_MAXIMO_CARREGADAS', 4))
+
+Viagem = namedtuple('Viagem', ['id', 'nome', 'caminho'])
+
+
+def _nome_viagem(caminho):
+    # "gramado_2026-07.xlsx" -> "gramado 2026-07"
+    return os.path.splitext(os.path.basename(caminho))[0].replace('_', ' ')
+
+
+def descobrir_viagens(planilhas=(PLANILHA_PADRAO,), diretorio=DIRETORIO_VIAGENS):
+    # Devolve {id: Viagem} na ordem: planilhas avulsas que existem, depois as da pasta em ordem alfabética
+    caminhos = [caminho for caminho in planilhas if caminho and os.path.isfile(caminho)]
+    if diretorio and os.path.isdir(diretorio):
+        # Arquivos temporários do Excel (~$Viagem.xlsx) ficam de fora
+        caminhos += sorted(caminho for caminho in glob.glob(os.path.join(diretorio, '*.xlsx')) if not os.path.basename(caminho).startswith('~$'))
+
+    viagens = {}
+    for caminho in caminhos:
+        id_viagem = os.path.splitext(os.path.basename(caminho))[0]
+        if id_viagem in viagens:
+            # Mesmo nome em pastas diferentes: o caminho relativo desempata
+            id_viagem = os.path.splitext(os.path.relpath(caminho))[0]
+        if id_viagem not in viagens:
+            viagens[id_viagem] = Viagem(id_viagem, _nome_viagem(caminho), caminho)
+    return viagens
+
+
+class RegistroViagens:
+    def __init__(self, planilhas=(PLANILHA_PADRAO,), diretorio=DIRETORIO_VIAGENS, maximo_carregadas=MAXIMO_VIAGENS_CARREGADAS):
+        self.planilhas = tuple(planilhas)
+        self.diretorio = diretorio
+        self.maximo_carregadas = maximo_carregadas
+        # _lock protege só os dicionários; a carga de cada viagem é serializada pelo lock da própria viagem
+        self._lock = threading.Lock()
+        self._locks_viagens = {}
+        # id da viagem -> observador, da menos para a mais usada recentemente
+        self._observadores = OrderedDict()
+        self.viagens = {}
+        self.atualizar()
+
+    def atualizar(self):
+        # Relista as planilhas (barato: só nomes de arquivos), para que novas viagens apareçam sem reiniciar o app
+        self.viagens = descobrir_viagens(self.planilhas, self.diretorio)
+        return self.viagens
+
+    def observador(self, id_viagem):
+        # Observador da planilha da viagem, criado (snapshot atualizado, thread iniciada) no primeiro acesso
+        with self._lock:
+            observador = self._usar(id_viagem)
+            if observador is not None:
+                return observador
+            lock_viagem = self._locks_viagens.setdefault(id_viagem, threading.Lock())
+
+        # A leitura do snapshot fica fora de _lock: viagens já carregadas continuam respondendo enquanto isso
+        with lock_viagem:
+            with self._lock:
+                observador = self._usar(id_viagem)
+            if observador is not None:
+                return observador
+            observador = ObservadorPlanilha(self.viagens[id_viagem].caminho).iniciar()
+            with self._lock:
+                self._observadores[id_viagem] = observador
+                antigos = []
+                while len(self._observadores) > self.maximo_carregadas:
+                    antigos.append(self._observadores.popitem(last=False)[1])
+
+        # parar() espera a thread do observador terminar; feito sem lock nenhum
+        for antigo in antigos:
+            antigo.parar()
+        return observador
+
+    def _usar(self, id_viagem):
+        # Chamado com _lock: marca a viagem como a mais usada recentemente, se já estiver carregada
+        observador = self._observadores.get(id_viagem)
+        if observador is not None:
+            self._observadores.move_to_end(id_viagem)
+        return observador
+
+    def carregadas(self):
+        with self._lock:
+            return list(self._observadores)
@@ -0,0 +1,93 @@
+"""Catálogo pequeno, lido de uma planilha montada no próprio teste.
+
+Passa pelo mesmo caminho do app (dados.ler_planilha e catalogo.montar_catalogo),
+com preços em reais, em dólar (convertidos) e numa moeda sem cotação (NaN).
+"""
+import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from planejador.cambio import Cambio
+from planejador.catalogo import montar_catalogo
+from planejador.dados import ABAS, ler_planilha
+
+CAMBIO = Cambio('teste', 'teste', {'BRL': 1.0, 'USD': 5.0})
+
+JULHO = datetime.datetime(2026, 7, 10)
+
+
+def _dia(dias):
+    return JULHO + datetime.timedelta(days=dias)
+
+
+def _passagem(sentido, companhia, origem, destino, horarios, preco, bagagem, passageiros, moeda='BRL'):
+    chave = f"{sentido} | {companhia} | {origem} - {horarios[0]} → {destino} - {horarios[1]}"
+    return [sentido, companhia, origem, destino, chave, preco, bagagem, preco + bagagem, passageiros, (preco + bagagem) * passageiros, moeda]
+
+
+ABAS_TESTE = {
+    'hoteis': (
+        ['Nome do Hotel', 'Link do Booking', 'Distância do Centro (km)', 'Chegada', 'Partida', 'Tipo do Preço',
+         'Preço por Período (R$)', 'Hóspedes', 'Preço por Hóspede (R$)', 'Moeda'],
+        [
+            ['Pousada Central', 'https://example.com/a', 0.5, _dia(0), _dia(3), 'Total', 900, 2, 450, 'BRL'],
+            ['Hotel Serra', 'https://example.com/b', 4.0, _dia(0), _dia(2), 'Total', 520, 4, 130, 'BRL'],
+            ['Chalé Vale', 'https://example.com/c', 8.0, _dia(0), _dia(3), 'Total', 120, 2, 60, 'USD'],
+            ['Hostel Praça', 'https://example.com/d', 1.0, _dia(0), _dia(2), 'Total', 300, 1, 300, 'BRL'],
+            ['Hotel Sem Cotação', 'https://example.com/e', 0.2, _dia(0), _dia(2), 'Total', 50, 2, 25, 'XYZ'],
+            ['Hotel Sem Datas', 'https://example.com/f', 0.1, None, None, 'Total', 10, 2, 5, 'BRL'],
+        ],
+    ),
+    'aluguel_carro': (
+        ['Tipo do Carro', 'Locadora', 'Preço por Dia (R$)', 'Dias', 'Passageiros', 'Preço por Período (R$)',
+         'Preço por Passageiro (R$)', 'Moeda'],
+        [
+            ['Compacto', 'Movida', 50, 3, 4, 150, 37.5, 'BRL'],
+            ['Sedan', 'Localiza', 80, 4, 5, 320, 64, 'BRL'],
+            ['SUV', 'Movida', 120, 2, 7, 240, 34.29, 'BRL'],
+            ['Mini', 'Unidas', 30, 3, 2, 90, 45, 'BRL'],
+            ['Econômico', 'Unidas', 10, 2, 4, 20, 5, 'USD'],
+            ['Luxo', 'Localiza', 10, 3, 5, 30, 6, 'XYZ'],
+        ],
+    ),
+    'atracoes': (
+        ['Atrações', 'Valor (R$)', 'Quantidade', 'Valor Total (R$)', 'Moeda'],
+        [
+            ['Parque', 100, 2, 200, 'BRL'],
+            ['Museu', 40, 0, 0, 'BRL'],
+            ['Passeio de Barco', 10, 1, 10, 'USD'],
+            ['Teleférico', 25, 1, 25, 'XYZ'],
+        ],
+    ),
+    'passagens': (
+        ['Sentido', 'Companhia', 'Origem', 'Destino', 'Sentido + Companhia + Origem + Destino', 'Preço (R$)',
+         'Preço da Bagagem (R$)', 'Total (R$)', 'Passageiros', 'Valor Total (R$)', 'Moeda'],
+        [
+            _passagem('Ida', 'Gol', 'GIG', 'POA', ('06:00', '08:00'), 450, 50, 2),
+            _passagem('Ida', 'Azul', 'GIG', 'POA', ('09:00', '11:00'), 400, 20, 1),
+            _passagem('Ida', 'Latam', 'GRU', 'POA', ('07:00', '08:30'), 280, 20, 2),
+            _passagem('Ida', 'Gol', 'GIG', 'POA', ('12:00', '14:00'), 90, 10, 2, 'XYZ'),
+            _passagem('Volta', 'Gol', 'POA', 'GIG', ('18:00', '20:00'), 400, 50, 2),
+            _passagem('Volta', 'Azul', 'POA', 'GIG', ('19:00', '21:00'), 360, 20, 2),
+            _passagem('Volta', 'Latam', 'POA', 'GRU', ('20:00', '21:30'), 130, 10, 1, 'USD'),
+        ],
+    ),
+}
+
+
+@pytest.fixture(scope='session')
+def catalogo(tmp_path_factory):
+    planilha = Workbook()
+    planilha.remove(planilha.active)
+    for chave, (cabecalho, linhas) in ABAS_TESTE.items():
+        aba = planilha.create_sheet(ABAS[chave])
+        aba.append(cabecalho)
+        for linha in linhas:
+            aba.append(linha)
+    caminho = tmp_path_factory.mktemp('planilha') / 'Viagem.xlsx'
+    planilha.save(caminho)
+
+    dfs, problemas = ler_planilha(caminho)
+    assert not any(problemas.values()), problemas
+    return montar_catalogo(*(dfs[chave] for chave in ABAS), cambio=CAMBIO)
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from planejador.motor import COLUNAS_CENARIO, COLUNAS_ORCAMENTO, Selecao, calcular_lote, calcular_orcamento
+
+IDA_GOL = 'Ida | Gol | GIG - 06:00 → POA - 08:00'
+IDA_SEM_COTACAO = 'Ida | Gol | GIG - 12:00 → POA - 14:00'
+VOLTA_AZUL = 'Volta | Azul | POA - 19:00 → GIG - 21:00'
+VOLTA_DOLAR = 'Volta | Latam | POA - 20:00 → GRU - 21:30'
+
+CENARIOS = [
+    {},
+    {'hotel': 'Pousada Central', 'passagem_ida': IDA_GOL, 'passagem_volta': VOLTA_AZUL, 'carro_tipo': 'Sedan', 'carro_locadora': 'Localiza'},
+    {'hotel': 'Chalé Vale', 'passagem_volta': VOLTA_DOLAR, 'carro_tipo': 'Econômico', 'carro_locadora': 'Unidas'},
+    {'hotel': 'Hotel Inexistente', 'passagem_ida': 'Ida | Nenhuma | XXX - 00:00 → YYY - 01:00', 'carro_tipo': 'Sedan', 'carro_locadora': 'Movida'},
+    # Linhas numa moeda sem cotação: ficam fora do total, como não encontradas
+    {'hotel': 'Hotel Sem Cotação', 'passagem_ida': IDA_SEM_COTACAO, 'carro_tipo': 'Luxo', 'carro_locadora': 'Localiza'},
+    {'hotel': 'Hostel Praça', 'quantidades': {'Parque': 1, 'Museu': '3', 'Teleférico': 4}},
+    {'quantidades': {'Parque': 'dois', 'Museu': None, 'Cinema': 2}},
+    {'passagem_ida': IDA_GOL, 'quantidades': {}},
+]
+
+
+def _selecao(cenario):
+    carro = (cenario['carro_tipo'], cenario['carro_locadora']) if cenario.get('carro_tipo') else None
+    return Selecao(cenario.get('hotel'), cenario.get('passagem_ida'), cenario.get('passagem_volta'), carro, cenario.get('quantidades'))
+
+
+def _tipos(nao_encontrados):
+    # "hotel: X" (calcular_orcamento) e "hotel" (calcular_lote) viram "hotel"; as atrações mantêm o nome
+    tipos = []
+    for item in nao_encontrados:
+        tipo = item if item.startswith(('atração:', 'quantidade inválida:')) else item.split(':')[0]
+        tipos.append('passagem' if tipo.startswith('passagem') else tipo)
+    return sorted(tipos)
+
+
+def test_lote_igual_ao_orcamento_de_cada_cenario(catalogo):
+    lote = calcular_lote(catalogo, pd.DataFrame(CENARIOS, index=range(len(CENARIOS))))
+
+    assert len(lote) == len(CENARIOS)
+    for cenario, (_, linha) in zip(CENARIOS, lote.iterrows()):
+        orcamento = calcular_orcamento(catalogo, _selecao(cenario))
+        esperado = [orcamento.hotel, orcamento.passagens, orcamento.atracoes, orcamento.carro, orcamento.total]
+        assert linha[COLUNAS_ORCAMENTO].tolist() == pytest.approx(esperado, abs=0.005), cenario
+        lote_nao_encontrados = linha['nao_encontrados'].split(';') if linha['nao_encontrados'] else []
+        assert _tipos(lote_nao_encontrados) == _tipos(orcamento.nao_encontrados), cenario
+
+
+def test_precos_convertidos_e_sem_cotacao(catalogo):
+    lote = calcular_lote(catalogo, pd.DataFrame(CENARIOS[1:6]))
+
+    # Pousada 900 + Gol 500 + Azul 380 + Sedan 320 + atrações da planilha (Parque 2 x 100, barco 1 x US$ 10)
+    assert lote.loc[0, 'Total (R$)'] == pytest.approx(900 + 500 + 380 + 320 + 250)
+    # Chalé US$ 120, volta US$ 140 e carro US$ 20, a R$ 5,00
+    assert lote.loc[1, COLUNAS_ORCAMENTO[:2]].tolist() == pytest.approx([600, 700])
+    assert lote.loc[3, COLUNAS_ORCAMENTO[:4]].tolist() == pytest.approx([0, 0, 250, 0])
+    assert lote.loc[3, 'nao_encontrados'] == 'hotel;passagem_ida;carro'
+    # Teleférico está numa moeda sem cotação: a quantidade não muda o total
+    assert lote.loc[4, 'Atrações (R$)'] == pytest.approx(100 + 3 * 40 + 50)
+
+
+def test_quantidades_invalidas_e_desconhecidas(catalogo):
+    lote = calcular_lote(catalogo, pd.DataFrame([CENARIOS[6]]))
+
+    # "dois" não é número: fica a quantidade da planilha; Museu vazio também
+    assert lote.loc[0, 'Atrações (R$)'] == pytest.approx(250)
+    assert sorted(lote.loc[0, 'nao_encontrados'].split(';')) == ['atração: Cinema', 'quantidade inválida: Parque']
+
+
+@pytest.mark.parametrize('colunas', [[], COLUNAS_CENARIO, COLUNAS_CENARIO + ['quantidades', 'id']])
+def test_lote_vazio(catalogo, colunas):
+    lote = calcular_lote(catalogo, pd.DataFrame(columns=colunas))
+
+    assert lote.empty
+    assert set(COLUNAS_ORCAMENTO + ['nao_encontrados']) <= set(lote.columns)
+
+
+def test_lote_mantem_o_id(catalogo):
+    cenarios = pd.DataFrame([{'id': 'b', 'hotel': 'Hotel Serra'}, {'id': 'a'}], index=[7, 3])
+    lote = calcular_lote(catalogo, cenarios)
+
+    assert lote['id'].tolist() == ['b', 'a']
+    assert lote['Hotel (R$)'].tolist() == [520, 0]
@@ -0,0 +1,79 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from planejador.otimizador import Restricoes, sugerir_viagens
+
+RESTRICOES = [
+    Restricoes(),
+    Restricoes(passageiros=2),
+    Restricoes(passageiros=2, custo_atracoes=250.0, folga_dias_carro=0),
+    Restricoes(distancia_maxima=5.0, incluir_carro=False),
+    Restricoes(orcamento_maximo=1700.0),
+    Restricoes(peso_distancia=100.0),
+    Restricoes(peso_distancia=100.0, orcamento_maximo=2000.0),
+    Restricoes(orcamento_maximo=100.0),
+]
+
+
+def _forca_bruta(catalogo, restricoes):
+    # (pontuação, total, hotel, ida, volta, carro) de todas as combinações válidas, da menor pontuação para a maior
+    hoteis, carros, passagens = catalogo.hoteis, catalogo.aluguel_carro, catalogo.passagens
+    precos_hoteis = hoteis['Preço por Período (R$)'].to_numpy(dtype=float)
+    precos_carros = carros['Preço por Período (R$)'].to_numpy(dtype=float)
+    totais = passagens['Total (R$)'].to_numpy(dtype=float)
+
+    def hotel_valido(i):
+        noites = hoteis['Noites'].iat[i]
+        return (
+            noites > 0 and not np.isnan(precos_hoteis[i])
+            and (restricoes.distancia_maxima is None or hoteis['Distância do Centro (km)'].iat[i] <= restricoes.distancia_maxima)
+            and hoteis['Hóspedes'].iat[i] >= restricoes.passageiros
+        )
+
+    def passagem_valida(i, sentido):
+        return passagens['sentido'].iat[i] == sentido and not np.isnan(totais[i]) and passagens['Passageiros'].iat[i] >= restricoes.passageiros
+
+    validos = [i for i in range(len(carros)) if not np.isnan(precos_carros[i]) and carros['Passageiros'].iat[i] >= restricoes.passageiros]
+    opcoes_carro = validos if restricoes.incluir_carro else [None]
+    idas = [i for i in range(len(passagens)) if passagem_valida(i, 'Ida')]
+    voltas = [i for i in range(len(passagens)) if passagem_valida(i, 'Volta')]
+
+    viagens = []
+    for hotel, ida, volta, carro in itertools.product(filter(hotel_valido, range(len(hoteis))), idas, voltas, opcoes_carro):
+        if (passagens['origem'].iat[ida], passagens['destino'].iat[ida]) != (passagens['destino'].iat[volta], passagens['origem'].iat[volta]):
+            continue
+        noites = hoteis['Noites'].iat[hotel]
+        if carro is not None and not noites <= carros['Dias'].iat[carro] <= noites + restricoes.folga_dias_carro:
+            continue
+        total = precos_hoteis[hotel] + totais[ida] + totais[volta] + restricoes.custo_atracoes
+        total += 0.0 if carro is None else precos_carros[carro]
+        if restricoes.orcamento_maximo is not None and total > restricoes.orcamento_maximo:
+            continue
+        pontuacao = total + restricoes.peso_distancia * hoteis['Distância do Centro (km)'].iat[hotel]
+        viagens.append((pontuacao, total, hotel, ida, volta, -1 if carro is None else carro))
+    return sorted(viagens)
+
+
+@pytest.mark.parametrize('k', [1, 5, 100])
+@pytest.mark.parametrize('restricoes', RESTRICOES)
+def test_sugestoes_iguais_a_forca_bruta(catalogo, restricoes, k):
+    esperadas = _forca_bruta(catalogo, restricoes)
+    sugestoes = sugerir_viagens(catalogo, restricoes, k)
+
+    assert len(sugestoes) == min(k, len(esperadas))
+    # Empates podem sair em outra ordem: compara as pontuações e confere que cada combinação é válida e tem o total certo
+    assert sugestoes['Pontuação'].tolist() == pytest.approx([viagem[0] for viagem in esperadas[:k]])
+    combinacoes = {viagem[2:]: viagem[:2] for viagem in esperadas}
+    for _, sugestao in sugestoes.iterrows():
+        chave = tuple(sugestao[['posicao_hotel', 'posicao_ida', 'posicao_volta', 'posicao_carro']])
+        assert chave in combinacoes
+        assert sugestao['Total (R$)'] == pytest.approx(combinacoes[chave][1])
+
+
+def test_forca_bruta_cobre_os_casos(catalogo):
+    # As restrições acima precisam de combinações para comparar (e de pelo menos um caso vazio)
+    quantidades = [len(_forca_bruta(catalogo, restricoes)) for restricoes in RESTRICOES]
+    assert all(quantidades[:-1]) and quantidades[-1] == 0
+    assert quantidades[1] < quantidades[0]